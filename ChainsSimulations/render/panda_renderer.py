@@ -12,6 +12,7 @@ from direct.task import Task
 import numpy as np
 from typing import List, Callable, Optional
 from ChainsSimulations.fisicas.cadenas import Chain
+from ParticleSimulation.Camera import planos_frustum, dentro_frustum, vista_proyeccion_panda
 
 
 class PandaRenderer(ShowBase):
@@ -51,6 +52,11 @@ class PandaRenderer(ShowBase):
         self.frame_count = 0
         self.fps_text = None
         
+        # Frustum culling state: visibility of each chain node last frame
+        self.link_radius = 0.1
+        self.chain_visible = np.zeros(0, dtype=bool)
+        self.stats = {"visible": 0, "culled": 0}
+        
     def setup_camera(self):
         """Configure camera position and orientation."""
         self.disableMouse()
@@ -82,6 +88,7 @@ class PandaRenderer(ShowBase):
         """
         # Clear existing chain nodes
         self.clear_chain_visualization()
+        self.link_radius = link_radius
         
         # Create sphere for each link
         for i, link in enumerate(chain.links):
@@ -97,17 +104,36 @@ class PandaRenderer(ShowBase):
             
             sphere.reparentTo(self.render)
             self.chain_nodes.append(sphere)
+        
+        self.chain_visible = np.ones(len(self.chain_nodes), dtype=bool)
     
     def update_chain_visualization(self, chain: Chain):
         """
         Update positions of chain link visuals.
         
+        Links outside the camera frustum are hidden and skipped; nodes are
+        only hidden or shown when their visibility changes.
+        
         Args:
             chain: Chain object with updated positions
         """
-        for i, link in enumerate(chain.links):
-            if i < len(self.chain_nodes):
-                self.chain_nodes[i].setPos(Vec3(*link.position))
+        count = min(len(chain.links), len(self.chain_nodes))
+        if count == 0:
+            return
+        positions = np.array([link.position for link in chain.links[:count]], dtype=float)
+        visible = dentro_frustum(planos_frustum(vista_proyeccion_panda(self)), positions, self.link_radius)
+        
+        for i in np.flatnonzero(visible & ~self.chain_visible[:count]):
+            self.chain_nodes[i].show()
+        for i in np.flatnonzero(~visible & self.chain_visible[:count]):
+            self.chain_nodes[i].hide()
+        self.chain_visible[:count] = visible
+        
+        for i in np.flatnonzero(visible):
+            self.chain_nodes[i].setPos(Vec3(*positions[i]))
+        
+        self.stats["visible"] = int(np.count_nonzero(visible))
+        self.stats["culled"] = count - self.stats["visible"]
         
         # Update connections
         self.update_connections(chain)
@@ -199,6 +225,7 @@ class PandaRenderer(ShowBase):
         for node in self.chain_nodes:
             node.removeNode()
         self.chain_nodes.clear()
+        self.chain_visible = np.zeros(0, dtype=bool)
         
         if self.connection_node:
             self.connection_node.removeNode()
@@ -0,0 +1,274 @@
+import numpy as np
+
+# Bits por eje de las llaves de Morton, 3 * 21 = 63 caben en un uint64
+BITS = 21
+
+# Partículas cuyos grupos recorren el árbol a la vez
+BLOQUE = 4096
+
+# Parejas máximas de cada tramo de la suma directa contra las hojas. Las
+# partículas en el mismo punto no se pueden separar y quedan en una sola hoja
+# del último nivel sin importar `hoja`, así la memoria no crece con N^2
+PAREJAS = 1 << 20
+
+def _expandir_bits(v:np.array) -> np.array:
+    """
+    Separa los 21 bits bajos de `v` dejando dos ceros entre cada uno
+    """
+    v = v.astype(np.uint64) & np.uint64(0x1FFFFF)
+    v = (v | v << np.uint64(32)) & np.uint64(0x1F00000000FFFF)
+    v = (v | v << np.uint64(16)) & np.uint64(0x1F0000FF0000FF)
+    v = (v | v << np.uint64(8)) & np.uint64(0x100F00F00F00F00F)
+    v = (v | v << np.uint64(4)) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | v << np.uint64(2)) & np.uint64(0x1249249249249249)
+    return v
+
+def morton(pos:np.array, minimo:np.array, lado:float) -> np.array:
+    """
+    Llaves de Morton de las posiciones dentro del cubo [minimo, minimo + lado)
+
+    Args:
+        - pos (np.array) : Posiciones (N, 3)
+        - minimo (np.array) : Esquina inferior del cubo
+        - lado (float) : Lado del cubo
+
+    Returns:
+        - np.array: Llaves (N,) uint64, ordenarlas agrupa las partículas por celda
+    """
+    escala = (1 << BITS) / lado
+    celdas = np.clip(((pos - minimo) * escala).astype(np.int64), 0, (1 << BITS) - 1)
+    return (_expandir_bits(celdas[:, 0]) << np.uint64(2)) \
+        | (_expandir_bits(celdas[:, 1]) << np.uint64(1)) \
+        | _expandir_bits(celdas[:, 2])
+
+def _rangos(inicio:np.array, fin:np.array) -> tuple:
+    """
+    Expande los rangos [inicio, fin) en (índice del rango, valor) para cada elemento
+    """
+    cuentas = fin - inicio
+    total = cuentas.sum()
+    fila = np.repeat(np.arange(len(inicio)), cuentas)
+    desfase = np.arange(total) - np.repeat(np.cumsum(cuentas) - cuentas, cuentas)
+    return fila, inicio[fila] + desfase
+
+class Octree:
+    """
+    Octree construido por niveles a partir de las llaves de Morton ordenadas
+
+    Cada nodo es un rango contiguo [inicio, fin) de las partículas ordenadas,
+    con su masa total, su centro de masa y el lado de su celda. Los nodos de
+    cada nivel se obtienen en una sola pasada sobre el arreglo con
+    np.add.reduceat, no hay recursión ni objetos por nodo
+    """
+    def __init__(self, pos:np.array, m:np.array, hoja:int=8):
+        """
+        Args:
+            - pos (np.array) : Posiciones (N, 3)
+            - m (np.array) : Masas (N,), positivas
+            - hoja (int) : Los nodos con a lo sumo `hoja` partículas no se dividen
+        """
+        minimo = pos.min(axis=0)
+        lado = float((pos.max(axis=0) - minimo).max()) * (1.0 + 1e-9) or 1.0
+        llaves = morton(pos, minimo, lado)
+
+        self.orden = np.argsort(llaves, kind="stable")
+        llaves = llaves[self.orden]
+        self.pos = pos[self.orden].astype(np.float64)
+        self.m = m[self.orden].astype(np.float64)
+        n = len(pos)
+        momento = self.pos * self.m[:, None]
+
+        niveles = []
+        inicios = np.array([0])
+        for nivel in range(BITS + 1):
+            if nivel > 0:
+                ids = llaves >> np.uint64(3 * (BITS - nivel))
+                inicios = np.flatnonzero(np.concatenate(([True], ids[1:] != ids[:-1])))
+            fines = np.append(inicios[1:], n)
+            masa = np.add.reduceat(self.m, inicios)
+            centro = np.add.reduceat(momento, inicios, axis=0) / masa[:, None]
+            ultimo = nivel == BITS or bool(np.all(fines - inicios <= hoja))
+            niveles.append((inicios, fines, masa, centro, lado / (1 << nivel)))
+            if ultimo:
+                break
+
+        # Nodos de todos los niveles en arreglos planos
+        desfases = np.cumsum([0] + [len(nv[0]) for nv in niveles])
+        self.inicio = np.concatenate([nv[0] for nv in niveles])
+        self.fin = np.concatenate([nv[1] for nv in niveles])
+        self.masa = np.concatenate([nv[2] for nv in niveles])
+        self.centro = np.concatenate([nv[3] for nv in niveles])
+        self.lado = np.concatenate([np.full(len(nv[0]), nv[4]) for nv in niveles])
+        self.hoja = (self.fin - self.inicio) <= hoja
+        self.hoja[desfases[-2]:] = True
+
+        # Hijos de cada nodo: los nodos del nivel siguiente cuyo rango cae dentro del suyo
+        self.hijo_inicio = np.zeros(len(self.inicio), dtype=np.int64)
+        self.hijo_fin = np.zeros(len(self.inicio), dtype=np.int64)
+        for nivel in range(len(niveles) - 1):
+            a, b = desfases[nivel], desfases[nivel + 1]
+            siguientes = niveles[nivel + 1][0]
+            self.hijo_inicio[a:b] = b + np.searchsorted(siguientes, self.inicio[a:b], side="left")
+            self.hijo_fin[a:b] = b + np.searchsorted(siguientes, self.fin[a:b], side="left")
+
+def aceleraciones_barnes_hut(
+        pos:np.array,
+        m:np.array,
+        G:float=1.0,
+        theta:float=0.5,
+        suavizado:float=1.0,
+        hoja:int=8,
+        grupo:int=32,
+        bloque:int=BLOQUE
+        ) -> np.array:
+    """
+    Aceleración gravitacional de cada partícula por las demás con Barnes-Hut
+
+    El árbol se recorre por grupos: los nodos con a lo sumo `grupo`
+    partículas recorren el árbol una sola vez con su esfera envolvente. Se
+    mantiene una frontera de parejas (grupo, nodo) vectorizada: los nodos
+    lejanos (lado / distancia < theta, medida desde el borde de la esfera del
+    grupo) se aproximan por su centro de masa, las hojas se suman
+    directamente y los demás nodos se reemplazan por sus hijos. Los grupos se
+    procesan en bloques de unas `bloque` partículas, y las sumas contra las
+    hojas en tramos de unas PAREJAS parejas, para acotar la memoria
+
+    Args:
+        - pos (np.array) : Posiciones (N, 3)
+        - m (np.array) : Masas (N,)
+        - G (float) : Constante gravitacional
+        - theta (float) : Ángulo de apertura, 0 equivale a la suma directa
+        - suavizado (float) : Longitud de suavizado del potencial
+        - hoja (int) : Partículas máximas por hoja
+        - grupo (int) : Partículas máximas por grupo del recorrido
+        - bloque (int) : Partículas por bloque del recorrido
+
+    Returns:
+        - np.array: Aceleraciones (N, 3) en float64
+    """
+    n = len(pos)
+    if n < 2:
+        return np.zeros((n, 3))
+
+    arbol = Octree(pos, m, hoja)
+    eps2 = suavizado * suavizado
+    theta2 = theta * theta
+    # Las interacciones trabajan por coordenada (3, N): las columnas de un
+    # arreglo (N, 3) no son contiguas y cada operación sobre ellas es más lenta
+    pos_t = np.ascontiguousarray(arbol.pos.T)
+    centro_t = np.ascontiguousarray(arbol.centro.T)
+    a = np.zeros((3, n))
+
+    # Grupos: los nodos más altos con a lo sumo `grupo` partículas (o hojas)
+    grupos = []
+    nodos = np.zeros(1, dtype=np.int64)
+    while len(nodos):
+        cuentas = arbol.fin[nodos] - arbol.inicio[nodos]
+        listo = (cuentas <= grupo) | arbol.hoja[nodos]
+        grupos.append(nodos[listo])
+        nodos = _rangos(arbol.hijo_inicio[nodos[~listo]], arbol.hijo_fin[nodos[~listo]])[1]
+    grupos = np.sort(np.concatenate(grupos))
+    grupos = grupos[np.argsort(arbol.inicio[grupos], kind="stable")]
+    g_inicio, g_fin = arbol.inicio[grupos], arbol.fin[grupos]
+
+    # Esfera envolvente de cada grupo, centrada en su centro geométrico
+    g_centro = np.add.reduceat(arbol.pos, g_inicio, axis=0) / (g_fin - g_inicio)[:, None]
+    dueno = np.repeat(np.arange(len(grupos)), g_fin - g_inicio)
+    g_radio = np.maximum.reduceat(np.linalg.norm(arbol.pos - g_centro[dueno], axis=1), g_inicio)
+
+    def sumar(a_bloque, i, fuente_t, fuente_m, primero):
+        """
+        Suma en `a_bloque` (3, B) la atracción de las fuentes (3, K) con masas
+        (K,) sobre las partículas `i` (índices del arreglo ordenado)
+        """
+        d = fuente_t - pos_t[:, i]
+        r2 = np.einsum("ij,ij->j", d, d)
+        r2 += eps2
+        if eps2 == 0.0:
+            r2[r2 == 0.0] = np.inf
+        peso = fuente_m / (r2 * np.sqrt(r2))
+        i = i - primero
+        for eje in range(3):
+            a_bloque[eje] += np.bincount(i, d[eje] * peso, a_bloque.shape[1])
+
+    cortes = np.searchsorted(g_inicio, np.arange(0, n, bloque))
+    for desde, hasta in zip(cortes, np.append(cortes[1:], len(grupos))):
+        if desde == hasta:
+            continue
+        primero, ultimo = g_inicio[desde], g_fin[hasta - 1]
+        a_bloque = a[:, primero:ultimo]
+
+        # Frontera inicial: cada grupo del bloque con la raíz
+        gi = np.arange(desde, hasta)
+        nodo = np.zeros(len(gi), dtype=np.int64)
+
+        while len(gi):
+            d = arbol.centro[nodo] - g_centro[gi]
+            distancia = np.sqrt(np.einsum("ij,ij->i", d, d)) - g_radio[gi]
+            # Un nodo que contiene al grupo nunca se aproxima, así se excluye la propia partícula
+            contiene = (arbol.inicio[nodo] <= g_inicio[gi]) & (g_inicio[gi] < arbol.fin[nodo])
+            lejos = (distancia > 0.0) & (arbol.lado[nodo] ** 2 < theta2 * distancia * distancia) & ~contiene
+
+            if lejos.any():
+                fila, i = _rangos(g_inicio[gi[lejos]], g_fin[gi[lejos]])
+                k = nodo[lejos][fila]
+                sumar(a_bloque, i, centro_t[:, k], arbol.masa[k], primero)
+
+            hojas = ~lejos & arbol.hoja[nodo]
+            if hojas.any():
+                # Todas las partículas del grupo contra todas las de la hoja,
+                # en tramos de partículas del grupo de unas PAREJAS parejas
+                g_h, k_h = gi[hojas], nodo[hojas]
+                fila, i = _rangos(g_inicio[g_h], g_fin[g_h])
+                k = k_h[fila]
+                cuentas = arbol.fin[k] - arbol.inicio[k]
+                previas = np.cumsum(cuentas) - cuentas
+                tramos = np.unique(np.searchsorted(previas, np.arange(0, previas[-1] + cuentas[-1], PAREJAS)))
+                for t_inicio, t_fin in zip(tramos, np.append(tramos[1:], len(i))):
+                    fila, j = _rangos(arbol.inicio[k[t_inicio:t_fin]], arbol.fin[k[t_inicio:t_fin]])
+                    i_t = i[t_inicio:t_fin][fila]
+                    distinta = i_t != j
+                    j = j[distinta]
+                    sumar(a_bloque, i_t[distinta], pos_t[:, j], arbol.m[j], primero)
+
+            abrir = ~lejos & ~arbol.hoja[nodo]
+            fila, nodo = _rangos(arbol.hijo_inicio[nodo[abrir]], arbol.hijo_fin[nodo[abrir]])
+            gi = gi[abrir][fila]
+
+    resultado = np.empty((n, 3))
+    resultado[arbol.orden] = G * a.T
+    return resultado
+
+def aceleraciones_directas(
+        pos:np.array,
+        m:np.array,
+        G:float=1.0,
+        suavizado:float=1.0,
+        bloque:int=1 << 22
+        ) -> np.array:
+    """
+    Aceleración gravitacional por suma directa O(N^2), por bloques de filas
+    para que cada bloque tenga a lo sumo `bloque` parejas
+
+    Args:
+        - pos (np.array) : Posiciones (N, 3)
+        - m (np.array) : Masas (N,)
+        - G (float) : Constante gravitacional
+        - suavizado (float) : Longitud de suavizado del potencial
+        - bloque (int) : Parejas por bloque
+
+    Returns:
+        - np.array: Aceleraciones (N, 3) en float64
+    """
+    n = len(pos)
+    pos = pos.astype(np.float64)
+    m = m.astype(np.float64)
+    a = np.empty((n, 3))
+    filas = max(1, bloque // max(n, 1))
+    for inicio in range(0, n, filas):
+        fin = min(inicio + filas, n)
+        d = pos[None, :, :] - pos[inicio:fin, None, :]
+        r2 = np.einsum("ijk,ijk->ij", d, d) + suavizado * suavizado
+        r2[np.arange(fin - inicio), np.arange(inicio, fin)] = np.inf
+        a[inicio:fin] = np.einsum("ij,ijk->ik", m / (r2 * np.sqrt(r2)), d)
+    return G * a
@@ -0,0 +1,47 @@
+import numpy as np
+
+def frontera(
+        y:np.array,
+        e:np.array,
+        limites:list,
+        generador:np.random.Generator,
+        impulso:float=10.0
+        ) -> int:
+    """
+    Aplica la colisión con los limites del mundo a un lote de partículas.
+    Las partículas fuera de la caja se llevan a la pared, su velocidad en
+    ese eje se refleja escalada por el coeficiente de restitución y se le
+    suma un impulso aleatorio uniforme en [-impulso, impulso)
+
+    El estado se modifica en el sitio
+
+    Args:
+        - y (np.array) : Estados (..., 6) [x, y, z, vx, vy, vz]
+        - e (np.array) : Coeficientes de restitución con forma y.shape[:-1]
+                         o un escalar
+        - limites (list) : Limites del mundo [xmin, xmax, ymin, ymax, zmin, zmax]
+        - generador (np.random.Generator) : Generador de los impulsos aleatorios
+        - impulso (float) : Amplitud del impulso aleatorio
+
+    Returns:
+        - int: Número de choques contra las paredes (partícula y eje)
+    """
+    limites = np.asarray(limites, dtype=y.dtype).reshape(3, 2)
+    minimos, maximos = limites[:, 0], limites[:, 1]
+
+    pos = y[..., :3]
+    vel = y[..., 3:]
+
+    choques = (pos < minimos) | (pos > maximos)
+    indices = np.nonzero(choques)
+    n_choques = len(indices[0])
+    if n_choques == 0:
+        return 0
+
+    np.clip(pos, minimos, maximos, out=pos)
+
+    e_choque = np.broadcast_to(e, choques.shape[:-1])[indices[:-1]]
+    kick = generador.uniform(-impulso, impulso, n_choques)
+    vel[indices] = -e_choque * vel[indices] + kick
+
+    return n_choques
@@ -0,0 +1,212 @@
+import numpy as np
+
+def perspectiva(fovy:float, aspecto:float, cerca:float, lejos:float) -> np.array:
+    """
+    Matriz de proyección equivalente a gluPerspective
+
+    Args:
+        - fovy (float) : Ángulo de visión vertical en grados
+        - aspecto (float) : Ancho / alto de la ventana
+        - cerca, lejos (float) : Planos de recorte
+
+    Returns:
+        - np.array: Matriz (4, 4) para vectores columna
+    """
+    f = 1.0 / np.tan(np.radians(fovy) / 2.0)
+    return np.array([
+        [f / aspecto, 0.0, 0.0, 0.0],
+        [0.0, f, 0.0, 0.0],
+        [0.0, 0.0, (lejos + cerca) / (cerca - lejos), 2.0 * lejos * cerca / (cerca - lejos)],
+        [0.0, 0.0, -1.0, 0.0],
+    ])
+
+def mirar(ojo, centro, arriba) -> np.array:
+    """
+    Matriz de vista equivalente a gluLookAt
+
+    Args:
+        - ojo (list) : Posición de la cámara
+        - centro (list) : Punto al que mira
+        - arriba (list) : Dirección hacia arriba
+
+    Returns:
+        - np.array: Matriz (4, 4) para vectores columna
+    """
+    ojo = np.asarray(ojo, dtype=np.float64)
+    f = np.asarray(centro, dtype=np.float64) - ojo
+    f /= np.linalg.norm(f)
+    s = np.cross(f, arriba)
+    s /= np.linalg.norm(s)
+    u = np.cross(s, f)
+
+    matriz = np.identity(4)
+    matriz[0, :3] = s
+    matriz[1, :3] = u
+    matriz[2, :3] = -f
+    matriz[:3, 3] = -matriz[:3, :3] @ ojo
+    return matriz
+
+def rotacion(angulo:float, eje) -> np.array:
+    """
+    Matriz de rotación equivalente a glRotatef
+
+    Args:
+        - angulo (float) : Ángulo en grados
+        - eje (list) : Eje de rotación
+
+    Returns:
+        - np.array: Matriz (4, 4) para vectores columna
+    """
+    x, y, z = np.asarray(eje, dtype=np.float64) / np.linalg.norm(eje)
+    c, s = np.cos(np.radians(angulo)), np.sin(np.radians(angulo))
+    k = 1.0 - c
+
+    matriz = np.identity(4)
+    matriz[:3, :3] = [
+        [x * x * k + c, x * y * k - z * s, x * z * k + y * s],
+        [y * x * k + z * s, y * y * k + c, y * z * k - x * s],
+        [z * x * k - y * s, z * y * k + x * s, z * z * k + c],
+    ]
+    return matriz
+
+def planos_frustum(matriz:np.array) -> np.array:
+    """
+    Planos del volumen de visión de una matriz de proyección por vista
+    (método de Gribb y Hartmann). Un punto p está dentro si para los seis
+    planos n·p + d >= 0
+
+    Args:
+        - matriz (np.array) : Matriz (4, 4) para vectores columna
+
+    Returns:
+        - np.array: Planos (6, 4) normalizados como (nx, ny, nz, d), en orden
+                    izquierdo, derecho, inferior, superior, cercano y lejano
+    """
+    planos = np.array([
+        matriz[3] + matriz[0],
+        matriz[3] - matriz[0],
+        matriz[3] + matriz[1],
+        matriz[3] - matriz[1],
+        matriz[3] + matriz[2],
+        matriz[3] - matriz[2],
+    ])
+    return planos / np.linalg.norm(planos[:, :3], axis=1, keepdims=True)
+
+def vista_proyeccion_panda(base) -> np.array:
+    """
+    Matriz del mundo al espacio de recorte de la cámara por defecto de un
+    ShowBase de Panda3D, lista para planos_frustum. Panda3D usa vectores
+    fila (clip = p * M), por eso se transpone. No importa Panda3D, solo usa
+    los métodos del objeto recibido
+
+    Args:
+        - base (ShowBase) : Aplicación de Panda3D con `render`, `cam` y `camLens`
+
+    Returns:
+        - np.array: Matriz (4, 4) para vectores columna
+    """
+    mat = base.render.getMat(base.cam) * base.camLens.getProjectionMat()
+    return np.array([[mat.getCell(fila, col) for col in range(4)] for fila in range(4)]).T
+
+def dentro_frustum(planos:np.array, posiciones:np.array, radios=0.0) -> np.array:
+    """
+    Prueba todas las esferas contra los planos en una sola operación
+
+    Args:
+        - planos (np.array) : Planos (6, 4) de planos_frustum
+        - posiciones (np.array) : Centros (N, 3)
+        - radios (np.array | float) : Radios (N,), una esfera que toca el
+                                      volumen cuenta como visible
+
+    Returns:
+        - np.array: Máscara (N,) de las esferas visibles
+    """
+    distancias = posiciones @ planos[:, :3].T + planos[:, 3]
+    return np.all(distancias >= -np.reshape(radios, (-1, 1)), axis=1)
+
+class Camara:
+    """
+    Cámara de la simulación: la misma proyección y vista que usaba Render con
+    gluPerspective, gluLookAt y glRotatef, pero calculadas con NumPy para
+    poder transformar todas las partículas a la vez
+    """
+    def __init__(
+            self,
+            ancho:int=800,
+            alto:int=600,
+            fovy:float=45.0,
+            cerca:float=1.0,
+            lejos:float=6000.0,
+            ojo=(0.0, 0.0, 4000.0)
+            ):
+        """
+        Args:
+            - ancho, alto (int) : Tamaño de la ventana en pixeles
+            - fovy (float) : Ángulo de visión vertical en grados
+            - cerca, lejos (float) : Planos de recorte
+            - ojo (list) : Posición de la cámara, mira al origen
+        """
+        self.ancho = ancho
+        self.alto = alto
+        self.fovy = fovy
+        self.cerca = cerca
+        self.lejos = lejos
+        self.ojo = ojo
+        self.angulo_x = 0.0
+        self.angulo_y = 0.0
+
+    def proyeccion(self) -> np.array:
+        return perspectiva(self.fovy, self.ancho / self.alto, self.cerca, self.lejos)
+
+    def vista(self) -> np.array:
+        return (
+            mirar(self.ojo, (0.0, 0.0, 0.0), (0.0, 1.0, 0.0))
+            @ rotacion(self.angulo_x, (1, 0, 0))
+            @ rotacion(self.angulo_y, (0, 1, 0))
+        )
+
+    def matriz(self) -> np.array:
+        """
+        Matriz de proyección por vista, lleva puntos del mundo al espacio de recorte
+        """
+        return self.proyeccion() @ self.vista()
+
+    def visibles(self, posiciones:np.array, radios=0.0) -> np.array:
+        """
+        Máscara (N,) de las esferas que quedan dentro del volumen de visión
+        """
+        return dentro_frustum(planos_frustum(self.matriz()), posiciones, radios)
+
+    @property
+    def pixeles_por_unidad(self) -> float:
+        """
+        Pixeles que ocupa una unidad del mundo a distancia 1 de la cámara
+        """
+        return 0.5 * self.alto / np.tan(np.radians(self.fovy) / 2.0)
+
+    def profundidad(self, posiciones:np.array) -> np.array:
+        """
+        Distancia de cada punto a la cámara a lo largo de la dirección de vista
+
+        Args:
+            - posiciones (np.array) : Puntos (N, 3)
+
+        Returns:
+            - np.array: Profundidades (N,), negativas detrás de la cámara
+        """
+        vista = self.vista()
+        return -(posiciones @ vista[2, :3] + vista[2, 3])
+
+    def tamano_pixeles(self, posiciones:np.array, radios:np.array) -> np.array:
+        """
+        Diámetro aproximado en pixeles de cada esfera en pantalla
+
+        Args:
+            - posiciones (np.array) : Centros (N, 3)
+            - radios (np.array) : Radios (N,)
+
+        Returns:
+            - np.array: Diámetros (N,), cero para esferas detrás de la cámara
+        """
+        w = self.profundidad(posiciones)
+        return np.where(w > 0.0, 2.0 * radios * self.pixeles_por_unidad / np.maximum(w, 1e-9), 0.0)
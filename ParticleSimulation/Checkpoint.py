@@ -0,0 +1,260 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from ParticleSimulation import Forces
+from ParticleSimulation.Precision import Precision
+from ParticleSimulation.Solvers import Solvers
+
+# Formato del archivo:
+#   MAGIA (8 bytes) | largo del encabezado (uint64 little endian) | encabezado JSON
+#   | arreglos crudos, cada uno alineado a ALINEACION bytes
+# El encabezado guarda la configuración del sistema y, por cada arreglo, su
+# tipo, forma y posición en el archivo, así se cargan con np.memmap sin copiar
+MAGIA = b"PSIMCHK1"
+ALINEACION = 64
+VERSION = 1
+
+# Arreglos del sistema que se guardan, en este orden
+ARREGLOS = ("_y", "_F", "_m", "_e", "_color", "_edad", "_vida")
+
+# Únicas funciones y clases que un punto de control puede nombrar. Al cargar,
+# cualquier otro nombre del encabezado es un error: el archivo no elige qué
+# código se importa ni qué se llama
+SOLVERS = (
+    Solvers.euler, Solvers.runge_kutta_4, Solvers.verlet, Solvers.dormand_prince,
+    Solvers.euler_lote, Solvers.runge_kutta_4_lote, Solvers.verlet_lote, Solvers.dormand_prince_lote,
+)
+GENERADORES = (np.random.PCG64, np.random.PCG64DXSM, np.random.MT19937, np.random.Philox, np.random.SFC64)
+CAMPOS = (Forces.Gravedad, Forces.Arrastre, Forces.Viento, Forces.Atractor, Forces.Vortice,
+          Forces.GravedadMutua)
+
+# Tipos de los atributos de campos y emisores que se pueden guardar
+ESCALARES = (bool, int, float, str, type(None), np.bool_, np.integer, np.floating)
+
+def _alinear(posicion:int) -> int:
+    return -(-posicion // ALINEACION) * ALINEACION
+
+def _nombre(objeto) -> dict:
+    return {"modulo": objeto.__module__, "nombre": objeto.__qualname__}
+
+def _objetos() -> tuple:
+    """
+    Campos de fuerza y emisores que se pueden guardar. Emitters importa
+    System, que importa este módulo, por eso se importa al usarlo
+    """
+    from ParticleSimulation.Emitters import Emisor
+    return (*CAMPOS, Emisor)
+
+def _resolver(nombre:dict, permitidos:tuple):
+    """
+    Busca entre `permitidos` la función o clase con el módulo y el nombre
+    calificado dados, por ejemplo Solvers.runge_kutta_4. Cualquier otro
+    nombre es un ValueError
+    """
+    for objeto in permitidos:
+        if _nombre(objeto) == {"modulo": nombre.get("modulo"), "nombre": nombre.get("nombre")}:
+            return objeto
+    raise ValueError(f"Punto de control con un nombre no permitido: {nombre.get('modulo')}.{nombre.get('nombre')}")
+
+def _a_json(valor):
+    if isinstance(valor, np.ndarray):
+        return {"arreglo": valor.tolist(), "dtype": valor.dtype.str}
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, tuple):
+        return [_a_json(v) for v in valor]
+    return valor
+
+def _de_json(valor):
+    if isinstance(valor, dict) and "arreglo" in valor:
+        return np.array(valor["arreglo"], dtype=valor["dtype"])
+    return valor
+
+def _guardable(valor) -> bool:
+    if isinstance(valor, ESCALARES):
+        return True
+    if isinstance(valor, np.ndarray):
+        return valor.dtype.kind in "biuf"
+    if isinstance(valor, (tuple, list)):
+        return all(_guardable(v) for v in valor)
+    return False
+
+def _objeto_a_json(objeto) -> dict:
+    """
+    Campos de fuerza y emisores: su clase y sus atributos, que deben ser
+    números, textos, tuplas y arreglos numéricos. Si no, ValueError con el
+    nombre del atributo
+    """
+    clase = type(objeto)
+    if clase not in _objetos():
+        raise ValueError(f"{clase.__qualname__} no se puede guardar en un punto de control")
+    for atributo, valor in vars(objeto).items():
+        if not _guardable(valor):
+            raise ValueError(f"El atributo {clase.__qualname__}.{atributo} ({type(valor).__name__}) "
+                             "no se puede guardar en un punto de control")
+    return {**_nombre(clase), "atributos": {k: _a_json(v) for k, v in vars(objeto).items()}}
+
+def _objeto_de_json(datos:dict):
+    clase = _resolver(datos, _objetos())
+    objeto = clase.__new__(clase)
+    objeto.__dict__.update({k: _de_json(v) for k, v in datos["atributos"].items()})
+    return objeto
+
+def guardar(sistema, ruta:str):
+    """
+    Escribe el estado del sistema en un solo archivo binario. Se escribe
+    primero a un archivo temporal que luego reemplaza a `ruta`, así un
+    sistema cargado desde `ruta` (que la tiene mapeada) no se corrompe
+
+    Solo se guardan los solvers de SOLVERS, los generadores de GENERADORES,
+    los campos de CAMPOS y los emisores, con ValueError para lo demás. Todo
+    se valida antes de abrir el archivo temporal
+
+    Args:
+        - sistema (System) : Sistema a guardar
+        - ruta (str) : Archivo de destino
+    """
+    for objeto, permitidos in ((sistema.solver, SOLVERS), (type(sistema.rng.bit_generator), GENERADORES)):
+        if objeto not in permitidos:
+            raise ValueError(f"{objeto.__qualname__} no se puede guardar en un punto de control")
+
+    # Con capacidad fija se guardan todas las filas para no reservar al cargar
+    filas = sistema.capacidad if sistema.capacidad_fija else sistema.n
+    precision = sistema.precision
+    encabezado = {
+        "version": VERSION,
+        "n": sistema.n,
+        "capacidad": sistema.capacidad if sistema.capacidad_fija else None,
+        "dtype": sistema.dtype.str,
+        "dt": sistema.dt,
+        "time": sistema.time,
+        "pasos": sistema.pasos,
+        "solver": _nombre(sistema.solver),
+        "limites": _a_json(sistema.limites),
+        "colisiones": sistema.colisiones,
+        "precision": [precision.modo, precision.decimales, precision.paso],
+        "rtol": sistema.rtol,
+        "atol": sistema.atol,
+        "tolerancia_pared": sistema.tolerancia_pared,
+        "h": sistema.h,
+        "contadores": {nombre: getattr(sistema, nombre) for nombre in
+                       ("pasos_aceptados", "pasos_rechazados", "contactos", "choques_pared",
+                        "muertas", "rechazadas")},
+        "rng": {**_nombre(type(sistema.rng.bit_generator)), "estado": sistema.rng.bit_generator.state},
+        "campos": [_objeto_a_json(campo) for campo in sistema.campos],
+        "emisores": [_objeto_a_json(emisor) for emisor in sistema.emisores],
+        "arreglos": {},
+    }
+
+    # Las posiciones dependen del largo del encabezado, que depende de las
+    # posiciones: se reservan 20 dígitos por número para calcularlo una vez
+    arreglos = {nombre: getattr(sistema, nombre)[:filas] for nombre in ARREGLOS}
+    for nombre, arreglo in arreglos.items():
+        encabezado["arreglos"][nombre] = {"dtype": arreglo.dtype.str, "forma": arreglo.shape,
+                                          "posicion": 10 ** 19}
+    posicion = _alinear(len(MAGIA) + 8 + len(json.dumps(encabezado).encode("utf-8")))
+    for nombre, arreglo in arreglos.items():
+        encabezado["arreglos"][nombre]["posicion"] = posicion
+        posicion = _alinear(posicion + arreglo.nbytes)
+    texto = json.dumps(encabezado).encode("utf-8")
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(MAGIA)
+        archivo.write(struct.pack("<Q", len(texto)))
+        archivo.write(texto)
+        for nombre, arreglo in arreglos.items():
+            archivo.seek(encabezado["arreglos"][nombre]["posicion"])
+            archivo.write(np.ascontiguousarray(arreglo).data)
+        archivo.truncate(posicion)
+    os.replace(temporal, ruta)
+
+def leer_encabezado(ruta:str) -> dict:
+    """
+    Lee solo el encabezado JSON de un punto de control
+
+    Args:
+        - ruta (str) : Archivo del punto de control
+
+    Returns:
+        - dict: Encabezado
+    """
+    with open(ruta, "rb") as archivo:
+        if archivo.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"{ruta} no es un punto de control de System")
+        largo, = struct.unpack("<Q", archivo.read(8))
+        encabezado = json.loads(archivo.read(largo).decode("utf-8"))
+    if encabezado["version"] != VERSION:
+        raise ValueError(f"Versión de punto de control no soportada: {encabezado['version']}")
+    return encabezado
+
+def cargar(clase, ruta:str, backend:str="numpy"):
+    """
+    Reconstruye un sistema desde un punto de control. Los arreglos se mapean
+    en modo copia al escribir ("c"): no se leen ni se copian al cargar, el
+    sistema operativo trae cada página del archivo la primera vez que se usa
+    y la copia a memoria propia la primera vez que se escribe. El archivo no
+    se modifica nunca
+
+    El solver, el generador y las clases de los campos y emisores se buscan
+    solo entre los nombres permitidos (SOLVERS, GENERADORES, CAMPOS y
+    Emisor), y los atributos de los campos y emisores se restauran sin
+    llamar a su constructor. Aun así, un punto de control solo debería
+    cargarse si viene de una fuente de confianza. Un nombre no permitido es
+    un ValueError
+
+    Args:
+        - clase (type) : System o una subclase
+        - ruta (str) : Archivo del punto de control
+        - backend (str) : Backend del sistema cargado, ver System
+
+    Returns:
+        - System: Sistema con el estado, el generador, los campos y los emisores guardados
+    """
+    encabezado = leer_encabezado(ruta)
+    sistema = clase(
+        _resolver(encabezado["solver"], SOLVERS),
+        encabezado["dt"],
+        _de_json(encabezado["limites"]),
+        colisiones=encabezado["colisiones"],
+        precision=Precision(*encabezado["precision"]),
+        dtype=np.dtype(encabezado["dtype"]),
+        rtol=encabezado["rtol"],
+        atol=encabezado["atol"],
+        tolerancia_pared=encabezado["tolerancia_pared"],
+        capacidad=0 if encabezado["capacidad"] is not None else None,
+        backend=backend,
+    )
+    generador = _resolver(encabezado["rng"], GENERADORES)()
+    generador.state = encabezado["rng"]["estado"]
+    sistema.rng = np.random.Generator(generador)
+
+    sistema.time = encabezado["time"]
+    sistema.pasos = encabezado["pasos"]
+    sistema.h = encabezado["h"]
+    for nombre, valor in encabezado["contadores"].items():
+        setattr(sistema, nombre, valor)
+    sistema.campos = [_objeto_de_json(campo) for campo in encabezado["campos"]]
+    sistema.emisores = [_objeto_de_json(emisor) for emisor in encabezado["emisores"]]
+
+    # El sistema se creó con capacidad mínima, los arreglos se cambian por
+    # los del archivo y los de trabajo se reservan con la capacidad cargada
+    n = encabezado["n"]
+    filas = n
+    for nombre, datos in encabezado["arreglos"].items():
+        forma = tuple(datos["forma"])
+        filas = forma[0]
+        arreglo = np.memmap(ruta, dtype=datos["dtype"], mode="c", offset=datos["posicion"], shape=forma) \
+            if filas else np.zeros(forma, dtype=datos["dtype"])
+        setattr(sistema, nombre, arreglo)
+    sistema._a = np.zeros((filas, 3), dtype=sistema.dtype)
+    if sistema.backend == "numba":
+        sistema._conteo = np.zeros(filas, dtype=np.int64)
+    sistema.capacidad = filas
+    sistema._buffers = None
+    sistema.n = n
+    sistema._vistas = [None] * n
+    return sistema
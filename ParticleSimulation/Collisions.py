@@ -0,0 +1,183 @@
+import numpy as np
+
+# Desplazamientos a las celdas vecinas que se revisan desde cada celda. Solo
+# la mitad de las 26 vecinas, la otra mitad la revisa la celda vecina, así
+# cada pareja aparece una sola vez
+_VECINAS = np.array([
+    (dx, dy, dz)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+    if (dx, dy, dz) > (0, 0, 0)
+])
+
+# Número máximo de parejas candidatas que se procesan a la vez
+MAX_PAREJAS = 1 << 21
+
+def radio(masa:np.array) -> np.array:
+    """
+    Radio de una partícula a partir de su masa (radio = masa^(1/3) * 2)
+
+    Args:
+        - masa (np.array) : Masas de las partículas
+
+    Returns:
+        - np.array: Radios
+    """
+    return np.cbrt(masa) * 2.0
+
+def parejas_vecinas(pos:np.array, tam_celda:float, max_parejas:int=MAX_PAREJAS):
+    """
+    Fase amplia de colisiones con una rejilla uniforme. Las partículas se
+    ordenan por la llave de su celda y las vecinas de cada celda se buscan
+    con np.searchsorted, el costo crece casi linealmente con N
+
+    Args:
+        - pos (np.array) : Posiciones (N, 3)
+        - tam_celda (float) : Lado de la celda, debe ser al menos el
+                              diámetro de la partícula más grande
+        - max_parejas (int) : Tamaño máximo de cada lote de parejas
+
+    Yields:
+        - (np.array, np.array): Índices (i, j) de parejas candidatas, cada
+                                pareja aparece una sola vez
+    """
+    n = len(pos)
+    if n < 2:
+        return
+
+    celdas = np.floor(pos / tam_celda).astype(np.int64)
+    # Se deja una celda vacía alrededor para que las vecinas no se solapen
+    celdas -= celdas.min(axis=0) - 1
+    dims = celdas.max(axis=0) + 2
+    llaves = (celdas[:, 0] * dims[1] + celdas[:, 1]) * dims[2] + celdas[:, 2]
+
+    orden = np.argsort(llaves, kind="stable")
+    llaves = llaves[orden]
+    rangos = np.arange(n)
+
+    # Parejas dentro de la misma celda: cada partícula con las que le siguen
+    fin_celda = np.searchsorted(llaves, llaves, side="right")
+    yield from _expandir(orden, rangos + 1, fin_celda, max_parejas)
+
+    # Parejas con las celdas vecinas
+    for dx, dy, dz in _VECINAS:
+        vecina = llaves + (dx * dims[1] + dy) * dims[2] + dz
+        inicio = np.searchsorted(llaves, vecina, side="left")
+        fin = np.searchsorted(llaves, vecina, side="right")
+        yield from _expandir(orden, inicio, fin, max_parejas)
+
+def _expandir(orden:np.array, inicio:np.array, fin:np.array, max_parejas:int):
+    """
+    Convierte rangos [inicio, fin) del arreglo ordenado en parejas de índices,
+    en lotes de a lo sumo `max_parejas`
+    """
+    cuentas = fin - inicio
+    tiene = np.flatnonzero(cuentas > 0)
+    if len(tiene) == 0:
+        return
+
+    acumulado = np.cumsum(cuentas[tiene])
+    cortes = np.searchsorted(acumulado, np.arange(max_parejas, acumulado[-1], max_parejas))
+    for lote in np.split(tiene, np.unique(cortes)):
+        if len(lote) == 0:
+            continue
+        c = cuentas[lote]
+        total = c.sum()
+        i = np.repeat(lote, c)
+        desfase = np.arange(total) - np.repeat(np.cumsum(c) - c, c)
+        j = np.repeat(inicio[lote], c) + desfase
+        yield orden[i], orden[j]
+
+def resolver_contactos(
+        y:np.array,
+        m:np.array,
+        e:np.array,
+        r:np.array,
+        i:np.array,
+        j:np.array,
+        generador:np.random.Generator,
+        correccion:float=0.8
+        ) -> int:
+    """
+    Resuelve los contactos esfera-esfera entre las parejas (i, j). Las parejas
+    que se acercan reciben un impulso a lo largo de la normal con el promedio
+    de sus coeficientes de restitución, y las esferas que se solapan se
+    separan en proporción al inverso de su masa
+
+    El estado se modifica en el sitio
+
+    Args:
+        - y (np.array) : Estados (N, 6)
+        - m (np.array) : Masas (N,)
+        - e (np.array) : Coeficientes de restitución (N,)
+        - r (np.array) : Radios (N,)
+        - i, j (np.array) : Índices de las parejas candidatas
+        - generador (np.random.Generator) : Normales para esferas coincidentes
+        - correccion (float) : Fracción del solapamiento que se corrige por paso
+
+    Returns:
+        - int: Número de contactos
+    """
+    d = y[j, :3] - y[i, :3]
+    dist2 = np.einsum("ij,ij->i", d, d)
+    suma_r = r[i] + r[j]
+
+    contacto = dist2 < suma_r * suma_r
+    if not contacto.any():
+        return 0
+    i, j, d, dist2, suma_r = i[contacto], j[contacto], d[contacto], dist2[contacto], suma_r[contacto]
+
+    # Esferas en el mismo punto: normal aleatoria
+    dist = np.sqrt(dist2)
+    coincide = dist == 0.0
+    if coincide.any():
+        normal = generador.normal(size=(coincide.sum(), 3))
+        d[coincide] = normal / np.linalg.norm(normal, axis=1, keepdims=True)
+        dist[coincide] = 1.0
+    n = d / dist[:, None]
+
+    w_i, w_j = 1.0 / m[i], 1.0 / m[j]
+    w = w_i + w_j
+
+    # Impulso normal solo si las esferas se acercan
+    vn = np.einsum("ij,ij->i", y[j, 3:] - y[i, 3:], n)
+    impulso = np.where(vn < 0.0, -(1.0 + 0.5 * (e[i] + e[j])) * vn / w, 0.0)
+
+    # Separación de las esferas solapadas
+    dist[coincide] = 0.0
+    separacion = correccion * (suma_r - dist) / w
+
+    indices = np.concatenate((i, j))
+    n_total = len(y)
+    for eje in range(3):
+        dv = impulso * n[:, eje]
+        dx = separacion * n[:, eje]
+        y[:, 3 + eje] += np.bincount(indices, np.concatenate((-dv * w_i, dv * w_j)), n_total)
+        y[:, eje] += np.bincount(indices, np.concatenate((-dx * w_i, dx * w_j)), n_total)
+
+    return len(i)
+
+def colisiones(y:np.array, m:np.array, e:np.array, generador:np.random.Generator) -> int:
+    """
+    Detecta y resuelve los contactos entre todas las partículas
+
+    Args:
+        - y (np.array) : Estados (N, 6)
+        - m (np.array) : Masas (N,)
+        - e (np.array) : Coeficientes de restitución (N,)
+        - generador (np.random.Generator) : Generador aleatorio del sistema
+
+    Returns:
+        - int: Número de contactos resueltos
+    """
+    if len(y) < 2:
+        return 0
+
+    r = radio(m)
+    tam_celda = 2.0 * r.max()
+    # Las parejas se buscan con las posiciones del inicio de la fase
+    pos = y[:, :3].copy()
+
+    contactos = 0
+    for i, j in parejas_vecinas(pos, tam_celda):
+        contactos += resolver_contactos(y, m, e, r, i, j, generador)
+    return contactos
@@ -0,0 +1,101 @@
+import numpy as np
+
+from ParticleSimulation.System import System
+
+def _vector(v) -> np.array:
+    return np.asarray(v, dtype=np.float64).reshape(3)
+
+class Emisor:
+    """
+    Fuente de partículas con vida limitada, como una fuente o un chorro
+
+    En cada paso calcula cuántas partículas le tocan según su tasa, sortea
+    todas sus propiedades a la vez con el generador del sistema y las agrega
+    en un solo lote. Si el sistema tiene capacidad fija y no caben todas, las
+    que sobran se cuentan en `System.rechazadas`. Se registra con
+    System.agregar_emisor
+    """
+    def __init__(
+            self,
+            posicion,
+            tasa:float,
+            velocidad=(0.0, 0.0, 0.0),
+            dispersion:float=0.0,
+            masa=(1.0, 1.0),
+            vida=(1.0, 1.0),
+            radio:float=0.0,
+            color=(1.0, 1.0, 1.0),
+            coef_restitucion:float=1.0
+            ):
+        """
+        Args:
+            - posicion (list) : Centro del emisor
+            - tasa (float) : Partículas por segundo de simulación
+            - velocidad (list) : Velocidad media de salida
+            - dispersion (float) : Desviación estándar de cada componente de la velocidad
+            - masa (tuple) : Rango (min, max) de las masas, uniforme
+            - vida (tuple) : Rango (min, max) del tiempo de vida, uniforme
+            - radio (float) : Radio de la esfera de la que salen las partículas, 0 es un punto
+            - color (list) : Color de las partículas
+            - coef_restitucion (float) : Coeficiente de restitución de las partículas
+        """
+        self.posicion = _vector(posicion)
+        self.tasa = tasa
+        self.velocidad = _vector(velocidad)
+        self.dispersion = dispersion
+        self.masa = masa
+        self.vida = vida
+        self.radio = radio
+        self.color = _vector(color)
+        self.coef_restitucion = coef_restitucion
+
+        self.activo = True
+        self.emitidas = 0
+        self._acumulado = 0.0   # Fracción de partícula que quedó del paso anterior
+
+    def cantidad(self, dt:float) -> int:
+        """
+        Partículas que corresponden a un paso de duración dt. La parte
+        fraccionaria se guarda para el siguiente paso, así la tasa media es exacta
+        """
+        self._acumulado += self.tasa * dt
+        k = int(self._acumulado)
+        self._acumulado -= k
+        return k
+
+    def emitir(self, sistema:System, dt:float):
+        """
+        Agrega al sistema las partículas de un paso
+
+        Args:
+            - sistema (System) : Sistema al que se agregan
+            - dt (float) : Duración del paso
+        """
+        if not self.activo:
+            return
+        k = self.cantidad(dt)
+        if sistema.capacidad_fija:
+            libres = sistema.capacidad - sistema.n
+            sistema.rechazadas += max(k - libres, 0)
+            k = min(k, libres)
+        if k <= 0:
+            return
+
+        rng = sistema.rng
+        x0 = np.broadcast_to(self.posicion, (k, 3))
+        if self.radio > 0.0:
+            # Puntos uniformes dentro de la esfera
+            direccion = rng.normal(size=(k, 3))
+            direccion /= np.linalg.norm(direccion, axis=1, keepdims=True)
+            x0 = x0 + (self.radio * np.cbrt(rng.random(k)))[:, None] * direccion
+
+        v0 = self.velocidad + self.dispersion * rng.normal(size=(k, 3))
+        masa = rng.uniform(self.masa[0], self.masa[1], k)
+        vida = rng.uniform(self.vida[0], self.vida[1], k)
+
+        sistema.agregar_particulas(x0, v0, masa, self.coef_restitucion, self.color, vida)
+        self.emitidas += k
+
+    def __repr__(self):
+        return (f"Emisor(posicion={self.posicion!r}, tasa={self.tasa!r}, "
+                f"velocidad={self.velocidad!r}, vida={self.vida!r})")
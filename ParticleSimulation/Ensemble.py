@@ -0,0 +1,293 @@
+import numpy as np
+from time import perf_counter
+
+from ParticleSimulation.Boundary import frontera
+from ParticleSimulation.Forces import CampoFuerza, Gravedad
+from ParticleSimulation.Scenes import ESCENAS, LIMITES
+from ParticleSimulation.Solvers import Solvers
+from ParticleSimulation.System import System
+
+def energia(ensamble:"Ensamble") -> np.array:
+    """
+    Energía mecánica de cada réplica: cinética más la potencial de su
+    gravedad (U = -m g·x)
+
+    Returns:
+        - np.array: Energías (K,)
+    """
+    y = ensamble.y
+    especifica = 0.5 * np.einsum("knj,knj->kn", y[..., 3:], y[..., 3:])
+    especifica -= np.einsum("knj,kj->kn", y[..., :3], ensamble.g)
+    return np.einsum("kn,kn->k", ensamble.m, especifica)
+
+def centro_masa(ensamble:"Ensamble") -> np.array:
+    """
+    Centro de masa de cada réplica
+
+    Returns:
+        - np.array: Posiciones (K, 3)
+    """
+    m = ensamble.m
+    return (m[:, None, :] @ ensamble.y[..., :3])[:, 0] / m.sum(axis=1)[:, None]
+
+class Ensamble:
+    """
+    K réplicas independientes de un mismo sistema de N partículas, avanzadas
+    juntas con las mismas operaciones sobre arreglos:
+        - y (K, N, 6) : Estado de cada partícula de cada réplica
+        - F (K, N, 3) : Fuerza acumulada
+        - m (K, N)    : Masas
+        - e (K, N)    : Coeficientes de restitución
+        - g (K, 3)    : Gravedad de cada réplica
+
+    Los métodos por lotes de Solvers y Boundary.frontera trabajan sobre
+    estados (..., 6), y los campos de fuerza por partícula se evalúan sobre
+    las K * N partículas juntas, así que un paso del ensamble cuesta lo mismo
+    en Python que un paso de un solo System. Los parámetros por réplica se
+    difunden por el primer eje. Todas las réplicas sacan sus impulsos de frontera del
+    mismo generador, que es independiente de las semillas de cada réplica
+
+    Después de cada paso se calculan la media y la varianza entre réplicas
+    de cada observable registrado (energía y centro de masa por defecto) y
+    se agregan a `series`, sin guardar las trayectorias
+    """
+    def __init__(
+            self,
+            solver:callable,
+            dt:float,
+            x0:np.array,
+            v0:np.array,
+            masa:np.array,
+            limites:list|None=None,
+            gravedad=(0.0, -980.0, 0.0),
+            coef_restitucion=1.0,
+            semilla:int|list|None=None,
+            dtype=np.float64
+            ):
+        """
+        Args:
+            - solver (function) : Método de Solvers, simple o por lotes. Dormand-Prince
+                                  avanza con paso fijo, sin control de error
+            - dt (float) : Delta de tiempo
+            - x0 (np.array) : Posiciones iniciales (K, N, 3)
+            - v0 (np.array) : Velocidades iniciales (K, N, 3) o (N, 3)
+            - masa (np.array) : Masas (K, N) o (N,)
+            - limites (list | None) : Limites del mundo [xmin, xmax, ymin, ymax, zmin, zmax]
+            - gravedad (np.array) : Aceleración (3,) o una por réplica (K, 3)
+            - coef_restitucion (np.array) : Escalar, uno por réplica (K, 1) o (K, N)
+            - semilla (int | list | None) : Semilla del generador de los impulsos de frontera
+            - dtype : Tipo de dato del estado, np.float32 o np.float64
+        """
+        self.metodo_lote = Solvers.lote(solver)
+        if self.metodo_lote is None:
+            raise ValueError("El ensamble necesita un método de Solvers con versión por lotes")
+
+        x0 = np.asarray(x0, dtype=dtype)
+        if x0.ndim != 3 or x0.shape[-1] != 3:
+            raise ValueError(f"Se esperaban posiciones (K, N, 3), no {x0.shape}")
+        K, N = x0.shape[:2]
+        self.K = K
+        self.N = N
+        self.solver = solver
+        self.dt = dt
+        self.limites = limites
+        self.dtype = np.dtype(dtype)
+        self.rng = np.random.default_rng(semilla)
+        self.time = 0.0
+        self.pasos = 0
+        self.choques_pared = 0
+
+        self.y = np.empty((K, N, 6), dtype=dtype)
+        self.y[..., :3] = x0
+        self.y[..., 3:] = v0
+        self.F = np.zeros((K, N, 3), dtype=dtype)
+        self.m = np.array(np.broadcast_to(masa, (K, N)), dtype=dtype)
+        self.e = self._por_replica(coef_restitucion)
+        self.g = np.array(np.broadcast_to(gravedad, (K, 3)), dtype=dtype)
+
+        self._a = np.empty((K, N, 3), dtype=dtype)
+        self._buffers = Solvers.buffers(self.metodo_lote, (K, N, 6), dtype)
+
+        # Campos de fuerza por partícula, se evalúan sobre todas las réplicas a la vez
+        self.campos:list[CampoFuerza] = []
+        self.observadores:list[callable] = []
+
+        # Observables por réplica y series de su media y varianza entre réplicas
+        self.observables = {}
+        self.series = {}
+        self.agregar_observable("energia", energia)
+        self.agregar_observable("centro_masa", centro_masa)
+
+        self.tiempos = {"campos": 0.0, "integracion": 0.0, "frontera": 0.0, "estadisticas": 0.0}
+
+    def _por_replica(self, valor) -> np.array:
+        """
+        Difunde un parámetro escalar, (K, 1) o (K, N) a (K, N). Un arreglo
+        (K,) o (N,) se rechaza, no dice a qué eje corresponde
+        """
+        valor = np.asarray(valor, dtype=self.dtype)
+        if valor.ndim not in (0, 2) or valor.shape not in ((), (self.K, 1), (self.K, self.N)):
+            raise ValueError(f"Se esperaba un escalar, ({self.K}, 1) o ({self.K}, {self.N}), no {valor.shape}")
+        return np.array(np.broadcast_to(valor, (self.K, self.N)), dtype=self.dtype)
+
+    @classmethod
+    def desde_escena(
+            cls,
+            escena:int,
+            solver:callable,
+            dt:float,
+            nParticles:float,
+            semillas:list,
+            gravedad=None,
+            coef_restitucion=None,
+            dtype=np.float64
+            ) -> "Ensamble":
+        """
+        Ensamble de una escena de ejemplo, una réplica por semilla. Cada
+        réplica tiene las condiciones iniciales que tendría System con esa
+        semilla
+
+        Args:
+            - escena (int) : Número de la escena (1, 2 o 3)
+            - solver (function) : Método numérico de Solvers
+            - dt (float) : Delta de tiempo
+            - nParticles (float) : Multiplicador de partículas, 1.0 son 1000
+            - semillas (list) : Una semilla por réplica
+            - gravedad (np.array | None) : (3,) o (K, 3), None usa la de la escena
+            - coef_restitucion (np.array | None) : Escalar, (K, 1) o (K, N), None usa los de la escena
+            - dtype : Tipo de dato del estado
+
+        Returns:
+            - Ensamble: Ensamble con K = len(semillas) réplicas
+        """
+        sistemas = []
+        for semilla in semillas:
+            sistema = System(solver, dt, LIMITES, semilla=semilla, dtype=dtype)
+            ESCENAS[escena](sistema, nParticles)
+            sistemas.append(sistema)
+
+        y = np.stack([sistema.y for sistema in sistemas])
+        e = np.stack([sistema.e for sistema in sistemas])
+        return cls(
+            solver, dt, y[..., :3], y[..., 3:], np.stack([sistema.m for sistema in sistemas]),
+            LIMITES, (0.0, -980.0, 0.0) if gravedad is None else gravedad,
+            e if coef_restitucion is None else coef_restitucion,
+            semilla=list(semillas), dtype=dtype,
+        )
+
+    def agregar_campo(self, campo:CampoFuerza):
+        """
+        Registra un campo de fuerza que se aplica a cada réplica. La gravedad
+        uniforme conviene darla en `gravedad`, que se aplica a todas las
+        réplicas a la vez y puede ser distinta en cada una. Solo se admiten
+        campos por partícula (CampoFuerza.por_particula), los que acoplan
+        partículas como GravedadMutua mezclarían las réplicas
+
+        Args:
+            - campo (CampoFuerza) : Campo a registrar
+        """
+        if isinstance(campo, Gravedad):
+            self.g += campo.g
+            return
+        if not campo.por_particula:
+            raise ValueError(f"El ensamble no admite {type(campo).__name__}, acopla las partículas")
+        self.campos.append(campo)
+
+    def agregar_observable(self, nombre:str, funcion:callable):
+        """
+        Registra un observable: funcion(ensamble) -> np.array (K, ...) con un
+        valor por réplica. Después de cada paso se agrega a series[nombre]
+        su media y su varianza entre réplicas
+
+        Args:
+            - nombre (str) : Nombre de la serie
+            - funcion (function) : Observable por réplica
+        """
+        self.observables[nombre] = funcion
+        self.series[nombre] = {"media": [], "varianza": []}
+
+    def agregar_observador(self, observador:callable):
+        """
+        Registra una función que se llama como observador(ensamble) al final de cada paso
+        """
+        self.observadores.append(observador)
+
+    def aplicar_fuerzas(self, fuerzas:np.array):
+        """
+        Suma fuerzas a las partículas de todas las réplicas. Las fuerzas se
+        difunden a (K, N, 3): (3,) a todas, (N, 3) igual en cada réplica,
+        (K, 1, 3) una por réplica o (K, N, 3)
+
+        Args:
+            - fuerzas (np.array) : Fuerzas con forma difundible a (K, N, 3)
+        """
+        self.F += fuerzas
+
+    def _derivada(self, y:np.array, out:np.array):
+        out[..., :3] = y[..., 3:]
+        out[..., 3:] = self._a
+
+    @property
+    def media(self) -> np.array:
+        """
+        Media entre réplicas del estado actual (N, 6)
+        """
+        return self.y.mean(axis=0)
+
+    @property
+    def varianza(self) -> np.array:
+        """
+        Varianza entre réplicas del estado actual (N, 6)
+        """
+        return self.y.var(axis=0)
+
+    def aplicar_posiciones(self):
+        """
+        Avanza todas las réplicas un paso
+        """
+        inicio = perf_counter()
+        # Los campos por partícula ven las K réplicas como K * N partículas
+        y, m, F = self.y.reshape(-1, 6), self.m.reshape(-1), self.F.reshape(-1, 3)
+        for campo in self.campos:
+            campo.aplicar(y, m, F)
+        t_campos = perf_counter()
+
+        np.divide(self.F, self.m[..., None], out=self._a)
+        self._a += self.g[:, None, :]
+        self.metodo_lote(self._derivada, self.y, self.dt, self.y, self._buffers)
+        self.F[...] = 0.0
+        t_integracion = perf_counter()
+
+        if self.limites is not None:
+            self.choques_pared += frontera(self.y, self.e, self.limites, self.rng)
+        t_frontera = perf_counter()
+
+        for nombre, funcion in self.observables.items():
+            valores = funcion(self)
+            self.series[nombre]["media"].append(valores.mean(axis=0))
+            self.series[nombre]["varianza"].append(valores.var(axis=0))
+        t_estadisticas = perf_counter()
+
+        self.tiempos["campos"] = t_campos - inicio
+        self.tiempos["integracion"] = t_integracion - t_campos
+        self.tiempos["frontera"] = t_frontera - t_integracion
+        self.tiempos["estadisticas"] = t_estadisticas - t_frontera
+
+        self.time += self.dt
+        self.pasos += 1
+        for observador in self.observadores:
+            observador(self)
+
+    def serie(self, nombre:str) -> tuple:
+        """
+        Media y varianza entre réplicas de un observable en cada paso
+
+        Returns:
+            - (np.array, np.array): Arreglos (pasos, ...) de la media y la varianza
+        """
+        datos = self.series[nombre]
+        return np.array(datos["media"]), np.array(datos["varianza"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.y, self.F, self.m, self.e, self.g, self._a, self._buffers))
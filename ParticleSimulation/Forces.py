@@ -0,0 +1,180 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from ParticleSimulation.BarnesHut import aceleraciones_barnes_hut, aceleraciones_directas
+
+class CampoFuerza(ABC):
+    """
+    Campo de fuerza que actúa sobre todas las partículas de un System
+
+    Cada campo se evalúa con operaciones sobre los arreglos completos y suma
+    su fuerza en el arreglo compartido F (N, 3). Los campos se registran con
+    System.agregar_campo y se evalúan al inicio de cada paso. Las subclases
+    deben definir `aplicar`, si no fallan al construirse
+
+    `por_particula` indica que la fuerza de cada partícula depende solo de
+    su propio estado y masa, así el campo se puede evaluar sobre varias
+    réplicas juntas (ver Ensemble). Los campos que acoplan partículas lo
+    ponen en False
+    """
+    por_particula = True
+
+    @abstractmethod
+    def aplicar(self, y:np.array, m:np.array, F:np.array):
+        """
+        Suma la fuerza del campo en F, en el sitio
+
+        Args:
+            - y (np.array) : Estados (N, 6)
+            - m (np.array) : Masas (N,)
+            - F (np.array) : Fuerzas acumuladas (N, 3)
+        """
+
+    def __repr__(self):
+        atributos = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({atributos})"
+
+def _vector(v) -> np.array:
+    return np.asarray(v, dtype=np.float64).reshape(3)
+
+class Gravedad(CampoFuerza):
+    """
+    Gravedad uniforme dada como aceleración, F = m * g
+    """
+    def __init__(self, g=(0.0, -980.0, 0.0)):
+        """
+        Args:
+            - g (list) : Aceleración [gx, gy, gz]
+        """
+        self.g = _vector(g)
+
+    def aplicar(self, y, m, F):
+        F += m[:, None] * self.g
+
+class Arrastre(CampoFuerza):
+    """
+    Arrastre del medio, lineal y cuadrático en la velocidad:
+        F = -(lineal + cuadratico * |v|) * v
+    """
+    def __init__(self, lineal:float=0.0, cuadratico:float=0.0):
+        """
+        Args:
+            - lineal (float) : Coeficiente del término lineal
+            - cuadratico (float) : Coeficiente del término cuadrático
+        """
+        self.lineal = lineal
+        self.cuadratico = cuadratico
+
+    def aplicar(self, y, m, F):
+        v = y[:, 3:]
+        if self.cuadratico == 0.0:
+            F -= self.lineal * v
+            return
+        rapidez = np.sqrt(np.einsum("ij,ij->i", v, v))
+        F -= (self.lineal + self.cuadratico * rapidez)[:, None] * v
+
+class Viento(CampoFuerza):
+    """
+    Viento uniforme: arrastre lineal respecto a la velocidad del aire,
+        F = coeficiente * (viento - v)
+    """
+    def __init__(self, velocidad, coeficiente:float=1.0):
+        """
+        Args:
+            - velocidad (list) : Velocidad del viento [vx, vy, vz]
+            - coeficiente (float) : Coeficiente de arrastre
+        """
+        self.velocidad = _vector(velocidad)
+        self.coeficiente = coeficiente
+
+    def aplicar(self, y, m, F):
+        F += self.coeficiente * (self.velocidad - y[:, 3:])
+
+class Atractor(CampoFuerza):
+    """
+    Atractor puntual tipo gravitacional, suavizado para no divergir en el centro:
+        F = intensidad * m * d / (|d|^2 + suavizado^2)^(3/2),  d = centro - x
+    Con intensidad negativa repele
+    """
+    def __init__(self, centro, intensidad:float, suavizado:float=10.0):
+        """
+        Args:
+            - centro (list) : Posición del atractor
+            - intensidad (float) : Constante del atractor (G * M)
+            - suavizado (float) : Distancia de suavizado
+        """
+        self.centro = _vector(centro)
+        self.intensidad = intensidad
+        self.suavizado = suavizado
+
+    def aplicar(self, y, m, F):
+        d = self.centro - y[:, :3]
+        r2 = np.einsum("ij,ij->i", d, d) + self.suavizado * self.suavizado
+        F += (self.intensidad * m / (r2 * np.sqrt(r2)))[:, None] * d
+
+class Vortice(CampoFuerza):
+    """
+    Vórtice alrededor de un eje que pasa por `centro`. La fuerza es
+    tangencial, con un núcleo suave de radio `nucleo`:
+        F = intensidad * m * (eje x r) / (|r|^2 + nucleo^2)
+    donde r es la distancia perpendicular al eje
+    """
+    def __init__(self, centro, eje=(0.0, 1.0, 0.0), intensidad:float=1.0, nucleo:float=50.0):
+        """
+        Args:
+            - centro (list) : Punto del eje
+            - eje (list) : Dirección del eje, el giro sigue la regla de la mano derecha
+            - intensidad (float) : Intensidad del vórtice
+            - nucleo (float) : Radio del núcleo
+        """
+        self.centro = _vector(centro)
+        self.eje = _vector(eje) / np.linalg.norm(eje)
+        self.intensidad = intensidad
+        self.nucleo = nucleo
+
+    def aplicar(self, y, m, F):
+        r = y[:, :3] - self.centro
+        r -= (r @ self.eje)[:, None] * self.eje
+        r2 = np.einsum("ij,ij->i", r, r) + self.nucleo * self.nucleo
+        F += (self.intensidad * m / r2)[:, None] * np.cross(self.eje, r)
+
+class GravedadMutua(CampoFuerza):
+    """
+    Gravitación entre todas las partículas del sistema. Por defecto con un
+    octree de Barnes-Hut, O(N log N), ver BarnesHut.aceleraciones_barnes_hut
+    """
+    por_particula = False
+
+    def __init__(
+            self,
+            G:float=1.0,
+            theta:float=0.7,
+            suavizado:float=1.0,
+            directa:bool=False,
+            hoja:int=8,
+            grupo:int=32
+            ):
+        """
+        Args:
+            - G (float) : Constante gravitacional
+            - theta (float) : Ángulo de apertura, más pequeño es más preciso y más lento
+            - suavizado (float) : Longitud de suavizado, evita fuerzas enormes en encuentros cercanos
+            - directa (bool) : Usa la suma directa O(N^2) en vez del octree
+            - hoja (int) : Partículas máximas por hoja del octree
+            - grupo (int) : Partículas máximas por grupo del recorrido del octree
+        """
+        self.G = G
+        self.theta = theta
+        self.suavizado = suavizado
+        self.directa = directa
+        self.hoja = hoja
+        self.grupo = grupo
+
+    def aplicar(self, y, m, F):
+        if self.directa:
+            a = aceleraciones_directas(y[:, :3], m, self.G, self.suavizado)
+        else:
+            a = aceleraciones_barnes_hut(y[:, :3], m, self.G, self.theta, self.suavizado,
+                                         self.hoja, self.grupo)
+        F += m[:, None] * a
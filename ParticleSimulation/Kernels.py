@@ -0,0 +1,187 @@
+import numpy as np
+
+from ParticleSimulation.Solvers import Solvers
+
+try:
+    import numba
+    from numba import prange
+except ImportError:
+    numba = None
+    prange = range
+
+# Núcleos compilados con Numba que avanzan el sistema partícula por partícula.
+# Numba es opcional: sin él DISPONIBLE es False y System usa NumPy
+DISPONIBLE = numba is not None
+
+# Diferencia máxima por paso, relativa al estado, frente a la versión con
+# NumPy. Los núcleos repiten las operaciones de Solvers y Boundary en el mismo
+# orden, la única diferencia es el redondeo de lo que el compilador fusione
+TOLERANCIA = {np.dtype(np.float64): 1e-12, np.dtype(np.float32): 1e-6}
+
+EULER, RUNGE_KUTTA_4, VERLET = 0, 1, 2
+_METODOS = {
+    Solvers.euler_lote: EULER,
+    Solvers.runge_kutta_4_lote: RUNGE_KUTTA_4,
+    Solvers.verlet_lote: VERLET,
+}
+
+def _compilar(funcion):
+    if numba is None:
+        return funcion
+    return numba.njit(parallel=True, cache=True)(funcion)
+
+def soportado(solver:callable) -> bool:
+    """
+    Si el método numérico tiene un núcleo compilado
+
+    Args:
+        - solver (function) : Método simple o por lotes de Solvers
+    """
+    return Solvers.lote(solver) in _METODOS
+
+@_compilar
+def _avanzar(y, F, m, metodo, dt, medio, sexto, con_limites, limites, conteo):
+    for i in prange(y.shape[0]):
+        choques = 0
+        for j in range(3):
+            x = y[i, j]
+            v = y[i, j + 3]
+            a = F[i, j] / m[i]
+
+            if metodo == 0:
+                x_nueva = x + v * dt
+                v_nueva = v + a * dt
+            elif metodo == 1:
+                # Mismas etapas que Solvers.runge_kutta_4_lote, con la
+                # aceleración fija durante el paso
+                suma_x = v
+                suma_v = a
+                k_x = a * medio + v
+                suma_x += k_x
+                suma_x += k_x
+                suma_v += a
+                suma_v += a
+                k_x = a * medio + v
+                suma_x += k_x
+                suma_x += k_x
+                suma_v += a
+                suma_v += a
+                k_x = a * dt + v
+                suma_x += k_x
+                suma_v += a
+                suma_x *= sexto
+                suma_v *= sexto
+                x_nueva = x + suma_x
+                v_nueva = v + suma_v
+            else:
+                # Velocity Verlet, como Solvers.verlet_lote
+                x_nueva = a * medio
+                x_nueva += v
+                x_nueva *= dt
+                x_nueva += x
+                v_nueva = v + a * medio
+                v_nueva += a * medio
+
+            y[i, j] = x_nueva
+            y[i, j + 3] = v_nueva
+            F[i, j] = 0.0
+            if con_limites and (x_nueva < limites[j, 0] or x_nueva > limites[j, 1]):
+                choques += 1
+        conteo[i] = choques
+
+@_compilar
+def _contar(y, limites, conteo):
+    for i in prange(y.shape[0]):
+        choques = 0
+        for j in range(3):
+            if y[i, j] < limites[j, 0] or y[i, j] > limites[j, 1]:
+                choques += 1
+        conteo[i] = choques
+
+@_compilar
+def _rebotar(y, e, limites, conteo, desplazamientos, impulsos):
+    for i in prange(y.shape[0]):
+        if conteo[i] == 0:
+            continue
+        k = desplazamientos[i]
+        for j in range(3):
+            x = y[i, j]
+            if x < limites[j, 0]:
+                y[i, j] = limites[j, 0]
+            elif x > limites[j, 1]:
+                y[i, j] = limites[j, 1]
+            else:
+                continue
+            y[i, j + 3] = -e[i] * y[i, j + 3] + impulsos[k]
+            k += 1
+
+def avanzar(
+        metodo_lote:callable,
+        y:np.array,
+        F:np.array,
+        m:np.array,
+        dt:float,
+        limites:list|None,
+        conteo:np.array
+        ):
+    """
+    Avanza el sistema un paso en el sitio y deja F en cero. Un solo
+    recorrido paralelo por partícula calcula F / m, integra, limpia la
+    fuerza y, con limites, cuenta en `conteo` los choques de cada partícula
+    contra las paredes, que luego aplica `frontera`. No reserva arreglos
+    intermedios como la versión con NumPy
+
+    Args:
+        - metodo_lote (function) : Método por lotes de Solvers con núcleo
+        - y (np.array) : Estados (N, 6)
+        - F (np.array) : Fuerzas acumuladas (N, 3)
+        - m (np.array) : Masas (N,)
+        - dt (float) : Delta de tiempo
+        - limites (list | None) : Limites del mundo, None no cuenta choques
+        - conteo (np.array) : Arreglo (N,) int64 para los choques
+    """
+    tipo = y.dtype.type
+    con_limites = limites is not None
+    limites = np.asarray(limites if con_limites else np.zeros(6), dtype=y.dtype).reshape(3, 2)
+    _avanzar(y, F, m, _METODOS[metodo_lote], tipo(dt), tipo(dt / 2), tipo(dt / 6),
+             con_limites, limites, conteo)
+
+def frontera(
+        y:np.array,
+        e:np.array,
+        limites:list,
+        generador:np.random.Generator,
+        conteo:np.array,
+        contados:bool=False,
+        impulso:float=10.0
+        ) -> int:
+    """
+    Misma colisión con los limites del mundo que Boundary.frontera, en dos
+    pasadas: conteo de choques por partícula y aplicación de los rebotes.
+    Los impulsos salen del generador en un solo llamado y cada partícula
+    toma los suyos desde la suma acumulada de los conteos, así son los
+    mismos que reparte Boundary.frontera en el orden de np.nonzero
+
+    Args:
+        - y (np.array) : Estados (N, 6)
+        - e (np.array) : Coeficientes de restitución (N,)
+        - limites (list) : Limites del mundo [xmin, xmax, ymin, ymax, zmin, zmax]
+        - generador (np.random.Generator) : Generador de los impulsos aleatorios
+        - conteo (np.array) : Arreglo (N,) int64 de choques por partícula
+        - contados (bool) : Si `avanzar` ya llenó `conteo` con el estado actual
+        - impulso (float) : Amplitud del impulso aleatorio
+
+    Returns:
+        - int: Número de choques contra las paredes (partícula y eje)
+    """
+    limites = np.asarray(limites, dtype=y.dtype).reshape(3, 2)
+    if not contados:
+        _contar(y, limites, conteo)
+    desplazamientos = np.cumsum(conteo)
+    n_choques = int(desplazamientos[-1]) if len(desplazamientos) else 0
+    if n_choques == 0:
+        return 0
+    desplazamientos -= conteo
+    impulsos = generador.uniform(-impulso, impulso, n_choques)
+    _rebotar(y, e, limites, conteo, desplazamientos, impulsos)
+    return n_choques
@@ -0,0 +1,306 @@
+import multiprocessing as mp
+import weakref
+from multiprocessing import shared_memory
+from time import perf_counter
+
+import numpy as np
+
+from ParticleSimulation.Boundary import frontera
+from ParticleSimulation.Precision import Precision
+from ParticleSimulation.Solvers import Solvers
+
+# Arreglos del sistema que leen o escriben los procesos de trabajo
+COMPARTIDOS = ("_y", "_a", "_e")
+
+# Desbalance (máximo / promedio de partículas por franja) que dispara un nuevo reparto
+DESBALANCE = 1.25
+
+def _adjuntar(segmentos:dict, abiertos:dict) -> dict:
+    """
+    Abre en el proceso de trabajo los segmentos de memoria compartida que
+    cambiaron desde el paso anterior (el sistema los cambia al crecer)
+
+    Args:
+        - segmentos (dict) : nombre del arreglo -> (nombre del segmento, forma, dtype)
+        - abiertos (dict) : nombre del arreglo -> (segmento, arreglo), se actualiza
+
+    Returns:
+        - dict: nombre del arreglo -> np.array sobre la memoria compartida
+    """
+    for nombre, (segmento, forma, dtype) in segmentos.items():
+        actual = abiertos.get(nombre)
+        if actual is not None and actual[0].name == segmento:
+            continue
+        if actual is not None:
+            actual[0].close()
+        memoria = shared_memory.SharedMemory(name=segmento)
+        abiertos[nombre] = (memoria, np.ndarray(forma, dtype=dtype, buffer=memoria.buf))
+    return {nombre: arreglo for nombre, (_, arreglo) in abiertos.items()}
+
+def _trabajador(conexion, solver:callable, precision:tuple, dtype, semilla, impulso:float):
+    """
+    Ciclo de un proceso de trabajo. Avanza las partículas de su franja: las
+    copia a arreglos locales contiguos, las integra, aplica la frontera y
+    las devuelve a los arreglos compartidos
+
+    Órdenes que recibe por `conexion`:
+        - ("paso", fase, dt, limites, segmentos, inicio, fin) : fase es
+          "integrar", "frontera" o "completo" (las dos). Responde con
+          (segundos, choques)
+        - None : Termina
+    """
+    precision = Precision(*precision)
+    generador = np.random.default_rng(semilla)
+    metodo_lote = Solvers.lote(solver)
+    abiertos = {}
+    capacidad = 0
+    y = np.empty((0, 6), dtype=dtype)
+    a = np.empty((0, 3), dtype=dtype)
+    e = np.empty(0, dtype=dtype)
+    trabajo = None
+
+    while True:
+        orden = conexion.recv()
+        if orden is None:
+            break
+        _, fase, dt, limites, segmentos, inicio, fin = orden
+        arreglos = _adjuntar(segmentos, abiertos)
+        inicio_paso = perf_counter()
+
+        indices = arreglos["_indices"][inicio:fin]
+        k = len(indices)
+        if k == 0:
+            # Franja vacía, por ejemplo con menos partículas que procesos
+            conexion.send((perf_counter() - inicio_paso, 0))
+            continue
+        if k > capacidad:
+            capacidad = max(k, 2 * capacidad)
+            y = np.empty((capacidad, 6), dtype=dtype)
+            a = np.empty((capacidad, 3), dtype=dtype)
+            e = np.empty(capacidad, dtype=dtype)
+            trabajo = None if metodo_lote is None else Solvers.buffers(metodo_lote, (capacidad, 6), dtype)
+
+        y_local = np.take(arreglos["_y"], indices, axis=0, out=y[:k])
+        choques = 0
+
+        if fase in ("integrar", "completo"):
+            a_local = np.take(arreglos["_a"], indices, axis=0, out=a[:k])
+
+            def derivada(estado, out=None):
+                if out is None:
+                    out = np.empty_like(estado)
+                out[:, :3] = estado[:, 3:]
+                out[:, 3:] = a_local
+                if precision.etapa is not None:
+                    precision.etapa(out)
+                return out
+
+            if metodo_lote is not None:
+                metodo_lote(derivada, y_local, dt, y_local, trabajo[:, :k])
+            else:
+                y_local[:] = solver(derivada, y_local, dt)
+
+        if fase in ("frontera", "completo") and limites is not None:
+            e_local = np.take(arreglos["_e"], indices, out=e[:k])
+            choques = frontera(y_local, e_local, limites, generador, impulso)
+
+        arreglos["_y"][indices] = y_local
+        conexion.send((perf_counter() - inicio_paso, choques))
+
+    for memoria, _ in abiertos.values():
+        memoria.close()
+    conexion.close()
+
+def _liberar(segmentos:dict, retirados:list, procesos:list, conexiones:list):
+    """
+    Detiene los procesos y libera la memoria compartida. Se registra con
+    weakref.finalize para que corra aunque no se llame a Dominios.cerrar
+    """
+    for conexion in conexiones:
+        try:
+            conexion.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+    for proceso in procesos:
+        proceso.join(timeout=5)
+        if proceso.is_alive():
+            proceso.terminate()
+    for memoria in segmentos.values():
+        memoria.close()
+        memoria.unlink()
+    for memoria in retirados:
+        memoria.close()
+    segmentos.clear()
+    retirados.clear()
+    procesos.clear()
+    conexiones.clear()
+
+class Dominios:
+    """
+    Descomposición del sistema en franjas a lo largo de x, cada una avanzada
+    por un proceso de trabajo
+
+    Los arreglos que necesitan los procesos (estado, aceleración y
+    restitución) viven en memoria compartida, así ningún paso copia el
+    sistema entre procesos: cada proceso recibe solo el rango de su franja
+    dentro de `_indices`, la lista de partículas ordenada por franja.
+
+    Al inicio de cada paso se recalcula la franja de cada partícula con su
+    posición x. Las que cruzaron un corte pasan a la lista del proceso
+    vecino (`traspasos` las cuenta). Las filas del sistema no se reordenan,
+    así los índices de las partículas, las vistas `Particula` y el Grabador
+    siguen valiendo. Si una franja queda con más de DESBALANCE veces el
+    promedio de partículas, los cortes se mueven a los cuantiles de x. Si
+    aun así no se equilibran, porque muchas partículas tienen la misma x y
+    los cuantiles coinciden, las partículas se reparten por su rango en x
+
+    Los impulsos aleatorios de la frontera salen de un generador por proceso,
+    derivado de la semilla del sistema, así una simulación con la misma
+    semilla y el mismo número de procesos es reproducible, pero no da los
+    mismos impulsos que la versión de un proceso
+    """
+    def __init__(self, procesos:int, solver:callable, precision:Precision, dtype, semilla:int|None):
+        """
+        Args:
+            - procesos (int) : Número de procesos de trabajo (franjas)
+            - solver (function) : Método numérico de Solvers, no adaptativo
+            - precision (Precision) : Política de redondeo del sistema
+            - dtype : Tipo de dato del estado
+            - semilla (int | None) : Semilla del sistema
+        """
+        if Solvers.lote(solver) is Solvers.dormand_prince_lote:
+            raise ValueError("El solver adaptativo no se puede repartir entre procesos")
+        self.procesos = procesos
+        self.solver = solver
+        self.precision = precision
+        self.dtype = np.dtype(dtype)
+        self.semillas = np.random.SeedSequence(semilla).spawn(procesos)
+
+        self.cortes = None              # Cortes internos en x (procesos - 1,)
+        self.conteos = np.zeros(procesos, dtype=np.int64)
+        self.traspasos = 0              # Partículas que pasaron a otra franja
+        self.repartos = 0               # Veces que se movieron los cortes
+
+        self._franja = np.zeros(0, dtype=np.intp)   # Franja de cada partícula
+        self._inicio = np.zeros(procesos + 1, dtype=np.int64)
+        self._segmentos = {}
+        self._retirados = []
+        self._procesos = []
+        self._conexiones = []
+        self._finalizador = weakref.finalize(self, _liberar, self._segmentos, self._retirados,
+                                             self._procesos, self._conexiones)
+
+    def compartido(self, nombre:str, arreglo:np.array) -> np.array:
+        """
+        Copia un arreglo a un segmento nuevo de memoria compartida. El
+        segmento anterior con el mismo nombre se desenlaza pero sigue mapeado
+        hasta cerrar, puede haber arreglos que todavía lo usen (por ejemplo
+        la copia que hace System._reservar). Con `capacidad` fija en el
+        sistema esto no pasa nunca
+
+        Args:
+            - nombre (str) : Nombre del arreglo en el sistema ("_y", ...)
+            - arreglo (np.array) : Contenido inicial
+
+        Returns:
+            - np.array: Arreglo sobre la memoria compartida
+        """
+        memoria = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+        nuevo = np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=memoria.buf)
+        nuevo[...] = arreglo
+        anterior = self._segmentos.pop(nombre, None)
+        if anterior is not None:
+            anterior.unlink()
+            self._retirados.append(anterior)
+        self._segmentos[nombre] = memoria
+        return nuevo
+
+    def _iniciar(self):
+        contexto = mp.get_context("spawn")
+        precision = (self.precision.modo, self.precision.decimales, self.precision.paso)
+        for semilla in self.semillas:
+            local, remota = contexto.Pipe()
+            proceso = contexto.Process(
+                target=_trabajador,
+                args=(remota, self.solver, precision, self.dtype, semilla, 10.0),
+                daemon=True,
+            )
+            proceso.start()
+            remota.close()
+            self._procesos.append(proceso)
+            self._conexiones.append(local)
+
+    def _cortes_cuantiles(self, x:np.array) -> np.array:
+        return np.quantile(x, np.arange(1, self.procesos) / self.procesos)
+
+    def repartir(self, sistema):
+        """
+        Asigna cada partícula a su franja según su x actual y reconstruye la
+        lista `_indices` si alguna cambió de franja
+
+        Args:
+            - sistema (System) : Sistema dueño de los arreglos
+        """
+        n = sistema.n
+        x = sistema.y[:, 0]
+        if self.cortes is None:
+            if sistema.limites is not None:
+                xmin, xmax = np.asarray(sistema.limites, dtype=np.float64).reshape(3, 2)[0]
+                self.cortes = xmin + (xmax - xmin) * np.arange(1, self.procesos) / self.procesos
+            else:
+                self.cortes = self._cortes_cuantiles(x)
+
+        limite = DESBALANCE * n / self.procesos
+        franja = np.searchsorted(self.cortes, x)
+        conteos = np.bincount(franja, minlength=self.procesos)
+        if n >= self.procesos and conteos.max() > limite:
+            self.cortes = self._cortes_cuantiles(x)
+            franja = np.searchsorted(self.cortes, x)
+            conteos = np.bincount(franja, minlength=self.procesos)
+            self.repartos += 1
+            if conteos.max() > limite:
+                # Los cuantiles coinciden: partes iguales por rango en x, las empatadas por índice
+                franja = np.empty(n, dtype=np.intp)
+                franja[np.argsort(x, kind="stable")] = np.arange(n) * self.procesos // n
+                conteos = np.bincount(franja, minlength=self.procesos)
+
+        if len(self._franja) == n:
+            cambios = np.count_nonzero(franja != self._franja)
+            if cambios == 0:
+                return
+            self.traspasos += cambios
+
+        # Orden estable por franja: dentro de cada franja los índices quedan
+        # crecientes y las lecturas de los procesos recorren la memoria en orden
+        sistema._indices[:n] = np.argsort(franja, kind="stable")
+        self._franja = franja
+        self.conteos = conteos
+        self._inicio[1:] = np.cumsum(conteos)
+
+    def paso(self, sistema, fase:str, dt:float) -> tuple:
+        """
+        Avanza las franjas en paralelo y espera a que terminen
+
+        Args:
+            - sistema (System) : Sistema dueño de los arreglos
+            - fase (str) : "integrar", "frontera" o "completo"
+            - dt (float) : Delta de tiempo
+
+        Returns:
+            - (float, int): Segundos del proceso más lento y choques contra las paredes
+        """
+        if not self._procesos:
+            self._iniciar()
+        segmentos = {nombre: (memoria.name, getattr(sistema, nombre).shape, getattr(sistema, nombre).dtype)
+                     for nombre, memoria in self._segmentos.items()}
+        for i, conexion in enumerate(self._conexiones):
+            conexion.send(("paso", fase, dt, sistema.limites, segmentos,
+                           int(self._inicio[i]), int(self._inicio[i + 1])))
+        respuestas = [conexion.recv() for conexion in self._conexiones]
+        return max(r[0] for r in respuestas), sum(r[1] for r in respuestas)
+
+    def cerrar(self):
+        """
+        Detiene los procesos de trabajo y libera la memoria compartida
+        """
+        self._finalizador()
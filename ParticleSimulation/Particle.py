@@ -1,5 +1,32 @@
 import numpy as np
-from random import random as rng
+
+from ParticleSimulation.Boundary import frontera
+from ParticleSimulation.Precision import Precision
+
+# Generador de los impulsos de frontera para partículas sueltas
+_generador = np.random.default_rng()
+
+class _Atributo:
+    """
+    Atributo de partícula que vive en la propia partícula mientras está
+    suelta y en los arreglos del sistema cuando pertenece a uno
+    """
+    def __set_name__(self, owner, nombre):
+        self.nombre = nombre
+        self.privado = "_" + nombre
+
+    def __get__(self, particula, owner=None):
+        if particula is None:
+            return self
+        if particula._sistema is None:
+            return getattr(particula, self.privado)
+        return getattr(particula._sistema, self.nombre)[particula._idx]
+
+    def __set__(self, particula, valor):
+        if particula._sistema is None:
+            setattr(particula, self.privado, valor)
+        else:
+            getattr(particula._sistema, self.nombre)[particula._idx] = valor
 
 class Particula:
     """
@@ -23,11 +50,59 @@ class Particula:
         - color (list)   : Color del objeto
         - coef_restitucion (float) : Coeficiente de restitución (0.0 a 1.0)
         """
-        self.y = np.concatenate((x0,v0))     # [x, y, z, vx, vy, vz]
+        self._sistema = None
+        self._idx = None
+
+        self.y = np.concatenate((x0,v0)).astype(float)     # [x, y, z, vx, vy, vz]
         self.m = masa
         self.F = np.array([0.0, 0.0, 0.0])
         self.e = coef_restitucion  # Coeficiente de restitución
         self.color = color
+
+    # Estado de la partícula (propio o vista sobre el System)
+    y = _Atributo()
+    m = _Atributo()
+    F = _Atributo()
+    e = _Atributo()
+    color = _Atributo()
+
+    @classmethod
+    def _vista(cls, sistema, idx:int):
+        """
+        Crea una partícula que es una vista sobre la fila `idx` de un sistema,
+        sin copiar su estado
+
+        Args:
+            - sistema (System) : Sistema dueño de los arreglos
+            - idx (int) : Índice de la partícula dentro del sistema
+        """
+        particula = cls.__new__(cls)
+        particula._vincular(sistema, idx)
+        return particula
+
+    def _vincular(self, sistema, idx:int):
+        """
+        Enlaza la partícula a la fila `idx` del sistema. A partir de aquí
+        sus atributos leen y escriben directamente en los arreglos del sistema
+
+        Args:
+            - sistema (System) : Sistema dueño de los arreglos
+            - idx (int) : Índice de la partícula dentro del sistema
+        """
+        self._sistema = sistema
+        self._idx = idx
+
+    def _desvincular(self):
+        """
+        Suelta la partícula de su sistema conservando una copia de su estado
+        actual, por ejemplo cuando el sistema la elimina al cumplir su vida
+        """
+        valores = {nombre: np.array(getattr(self, nombre), dtype=float)
+                   for nombre in ("y", "m", "F", "e", "color")}
+        self._sistema = None
+        self._idx = None
+        for nombre, valor in valores.items():
+            setattr(self, nombre, valor if valor.ndim else float(valor))
     
     def __str__(self):
         return f"Partícula: <{self.y[0]}, {self.y[1]}, {self.y[2]}>"
@@ -40,40 +115,7 @@ class Particula:
             - limites (np.array) : Lista de los limites del mundo 
                                 [xmin, xmax, ymin, ymax, zmin, zmax]
         """
-        x, y, z, vx, vy, vz = self.y
-        xmin, xmax, ymin, ymax, zmin, zmax = limites
-        
-        # Eje X
-        if x < xmin:
-            x = xmin
-            vx *= -self.e
-            vx = vx + (20 * rng() - 10.0 )
-        elif x > xmax:
-            x = xmax
-            vx *= -self.e
-            vx = vx + (20 * rng() - 10.0 )
-
-        # Eje Y
-        if y < ymin:
-            y = ymin
-            vy *= -self.e
-            vy = vy + (20 * rng() - 10.0 )
-        elif y > ymax:
-            y = ymax
-            vy *= -self.e
-            vy = vy + (20 * rng() - 10.0 )
-        
-        # Eje Z
-        if z < zmin:
-            z = zmin
-            vz *= -self.e
-            vz = vz + (20 * rng() - 10.0 )
-        elif z > zmax:
-            z = zmax
-            vz *= -self.e
-            vz = vz + (20 * rng() - 10.0 )
-        
-        self.y = np.array([x,y,z,vx,vy,vz])
+        frontera(self.y, self.e, limites, _generador)
 
     def _derivada(self, y):
         """
@@ -86,7 +128,6 @@ class Particula:
            - np.array: Derivada [vx, vy, vz, ax, ay, az]
         """
         v = np.array([y[3], y[4], y[5]])
-        v = np.round(v, decimals=2)
         a = self.F / self.m  # aceleración
         return np.concatenate((v,a))
     
@@ -99,7 +140,7 @@ class Particula:
         """
         self.F = np.sum(forces, axis=0)
     
-    def step(self, metodo_numerico:callable, limites:np.array, dt:float):
+    def step(self, metodo_numerico:callable, limites:np.array, dt:float, precision:Precision=None):
         """
         Solucionador de la velocidad y la posición de la partícula según
         la fuerza obtenida y el método numérico proporcionado
@@ -110,12 +151,20 @@ class Particula:
             - limites (np.array) : Lista de los limites del mundo 
                                    [xmin, xmax, ymin, ymax, zmin, zmax]
             - dt (float) : Delta de tiempo
+            - precision (Precision) : Política de redondeo, por defecto no se redondea
         """
-        
-        self.y = metodo_numerico(self._derivada, self.y, dt)
+        derivada = self._derivada
+        if precision is not None and precision.etapa is not None:
+            def derivada(y):
+                dy = self._derivada(y)
+                precision.etapa(dy)
+                return dy
+
+        self.y = metodo_numerico(derivada, self.y, dt)
         self.F = np.array([0.0, 0.0, 0.0])
         
         if limites is not None:
             self._frontera(limites)
 
-        self.y = np.round(self.y, decimals=2)
\ No newline at end of file
+        if precision is not None and precision.salida is not None:
+            precision.salida(self.y)
\ No newline at end of file
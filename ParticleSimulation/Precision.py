@@ -0,0 +1,58 @@
+import numpy as np
+
+class Precision:
+    """
+    Política de precisión numérica de la simulación
+
+    Modos:
+        - "ninguna" : No se redondea nada (por defecto)
+        - "salida"  : Se redondea el estado a `decimales` al final de cada paso
+        - "rejilla" : Se cuantiza el estado a múltiplos de `paso` al final de cada paso
+        - "clase"   : Comportamiento de clase, se redondea a `decimales` cada
+                      etapa del método numérico y el estado al final del paso
+
+    Los ganchos `etapa` y `salida` son None cuando el modo no los usa, así
+    el ciclo principal solo paga por el redondeo que se eligió
+    """
+    MODOS = ("ninguna", "salida", "rejilla", "clase")
+
+    def __init__(self, modo:str="ninguna", decimales:int=2, paso:float=0.01):
+        """
+        Args:
+            - modo (str) : Uno de Precision.MODOS
+            - decimales (int) : Decimales de los modos "salida" y "clase"
+            - paso (float) : Separación de la rejilla del modo "rejilla"
+        """
+        if modo not in Precision.MODOS:
+            raise ValueError(f"Modo de precisión desconocido: {modo}")
+        if modo == "rejilla" and paso <= 0:
+            raise ValueError("El paso de la rejilla debe ser mayor a cero")
+
+        self.modo = modo
+        self.decimales = decimales
+        self.paso = paso
+
+        self.etapa = self._redondear if modo == "clase" else None
+        if modo in ("salida", "clase"):
+            self.salida = self._redondear
+        elif modo == "rejilla":
+            self.salida = self._cuantizar
+        else:
+            self.salida = None
+
+    def __repr__(self):
+        return f"Precision({self.modo!r}, decimales={self.decimales}, paso={self.paso})"
+
+    def _redondear(self, y:np.array):
+        """
+        Redondea `y` en el sitio a `self.decimales` decimales
+        """
+        np.round(y, decimals=self.decimales, out=y)
+
+    def _cuantizar(self, y:np.array):
+        """
+        Lleva `y` en el sitio al múltiplo de `self.paso` más cercano
+        """
+        y /= self.paso
+        np.rint(y, out=y)
+        y *= self.paso
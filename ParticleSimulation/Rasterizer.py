@@ -0,0 +1,189 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from ParticleSimulation.System import System
+from ParticleSimulation.Camera import Camara
+from ParticleSimulation.Collisions import radio as radio_particula
+
+# Radio máximo en pixeles de una partícula, las más cercanas se recortan a él
+RADIO_MAXIMO = 64
+
+def _discos(k:int) -> tuple:
+    """
+    Desplazamientos (dx, dy) del cuadrado de lado 2k + 1 centrado en cero
+    """
+    d = np.arange(-k, k + 1)
+    dx, dy = np.meshgrid(d, d)
+    return dx.ravel(), dy.ravel()
+
+_DESPLAZAMIENTOS = [_discos(k) for k in range(RADIO_MAXIMO + 1)]
+
+def escribir_png(ruta:str, imagen:np.array):
+    """
+    Escribe una imagen RGB (alto, ancho, 3) uint8 como PNG, solo con zlib
+
+    Args:
+        - ruta (str) : Archivo de salida
+        - imagen (np.array) : Pixeles (alto, ancho, 3) en uint8
+    """
+    alto, ancho, _ = imagen.shape
+    # Cada fila empieza con el byte de filtro 0 (sin filtro)
+    filas = np.empty((alto, 1 + 3 * ancho), dtype=np.uint8)
+    filas[:, 0] = 0
+    filas[:, 1:] = imagen.reshape(alto, -1)
+
+    def bloque(tipo:bytes, datos:bytes) -> bytes:
+        return struct.pack(">I", len(datos)) + tipo + datos + struct.pack(">I", zlib.crc32(tipo + datos))
+
+    with open(ruta, "wb") as archivo:
+        archivo.write(b"\x89PNG\r\n\x1a\n")
+        archivo.write(bloque(b"IHDR", struct.pack(">IIBBBBB", ancho, alto, 8, 2, 0, 0, 0)))
+        archivo.write(bloque(b"IDAT", zlib.compress(filas.tobytes(), 6)))
+        archivo.write(bloque(b"IEND", b""))
+
+class Rasterizador:
+    """
+    Dibuja las partículas de un System en una imagen sin OpenGL
+
+    Usa la misma cámara que Render (Camara) y pinta cada partícula como un
+    disco sombreado como esfera. Todos los fragmentos se generan a la vez y
+    en cada pixel se queda el más cercano a la cámara
+    """
+    def __init__(self, camara:Camara|None=None, fondo=(0, 0, 0)):
+        """
+        Args:
+            - camara (Camara) : Cámara, por defecto la misma vista inicial de Render
+            - fondo (list) : Color de fondo RGB en [0, 1]
+        """
+        self.camara = Camara() if camara is None else camara
+        self.fondo = np.asarray(fondo, dtype=np.float32)
+
+    def dibujar(self, posiciones:np.array, radios:np.array, colores:np.array) -> np.array:
+        """
+        Args:
+            - posiciones (np.array) : Centros (N, 3)
+            - radios (np.array) : Radios (N,)
+            - colores (np.array) : Colores RGB (N, 3) en [0, 1]
+
+        Returns:
+            - np.array: Imagen (alto, ancho, 3) uint8
+        """
+        ancho, alto = self.camara.ancho, self.camara.alto
+        imagen = np.empty((alto * ancho, 3), dtype=np.float32)
+        imagen[:] = self.fondo
+
+        # Espacio de recorte y coordenadas de pantalla, la fila 0 es la de arriba
+        matriz = self.camara.matriz()
+        clip = posiciones @ matriz[:, :3].T + matriz[:, 3]
+        w = clip[:, 3]
+        visibles = (w > self.camara.cerca) & (w < self.camara.lejos)
+        w = np.where(visibles, w, 1.0)
+        px = (clip[:, 0] / w + 1.0) * 0.5 * ancho
+        py = (1.0 - clip[:, 1] / w) * 0.5 * alto
+        # Las partículas de menos de un pixel se dibujan con un pixel de radio, no desaparecen
+        r = np.maximum(radios * self.camara.pixeles_por_unidad / w, 1.0)
+
+        # Se descartan las que quedan completamente fuera de la imagen
+        visibles &= (px + r >= 0) & (px - r < ancho) & (py + r >= 0) & (py - r < alto)
+        indices = np.flatnonzero(visibles)
+        k = np.minimum(np.ceil(r[indices]), RADIO_MAXIMO).astype(np.int64)
+
+        pixeles, profundidades, tonos, duenos = [], [], [], []
+        # Las partículas se agrupan por tamaño del cuadrado que las cubre
+        for radio in np.unique(k):
+            grupo = indices[k == radio]
+            dx, dy = _DESPLAZAMIENTOS[radio]
+            cx, cy = np.floor(px[grupo]), np.floor(py[grupo])
+            x = cx[:, None] + dx
+            y = cy[:, None] + dy
+            rg = np.minimum(r[grupo], RADIO_MAXIMO)[:, None]
+            d2 = ((x + 0.5 - px[grupo, None]) ** 2 + (y + 0.5 - py[grupo, None]) ** 2) / (rg * rg)
+
+            dentro = (d2 <= 1.0) & (x >= 0) & (x < ancho) & (y >= 0) & (y < alto)
+            fila, columna = np.nonzero(dentro)
+            z = np.sqrt(1.0 - d2[fila, columna])
+            pixeles.append((y[fila, columna] * ancho + x[fila, columna]).astype(np.int64))
+            # Profundidad del punto de la esfera que se ve en ese pixel
+            profundidades.append(w[grupo[fila]] - radios[grupo[fila]] * z)
+            tonos.append(0.25 + 0.75 * z)
+            duenos.append(grupo[fila])
+
+        if pixeles:
+            pixeles = np.concatenate(pixeles)
+            profundidades = np.concatenate(profundidades)
+            tonos = np.concatenate(tonos)
+            duenos = np.concatenate(duenos)
+
+            # En cada pixel gana el fragmento más cercano. Los bits de un float32
+            # positivo se ordenan igual que su valor, así pixel y profundidad
+            # caben en una sola llave int64 y basta un solo ordenamiento
+            bits = np.maximum(profundidades, 0.0).astype(np.float32).view(np.int32)
+            orden = np.argsort((pixeles << 32) | bits)
+            pixeles = pixeles[orden]
+            primero = np.empty(len(orden), dtype=bool)
+            primero[0] = True
+            np.not_equal(pixeles[1:], pixeles[:-1], out=primero[1:])
+            ganadores = orden[primero]
+            imagen[pixeles[primero]] = colores[duenos[ganadores]] * tonos[ganadores, None]
+
+        return (np.clip(imagen, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8).reshape(alto, ancho, 3)
+
+    def dibujar_sistema(self, sistema:System) -> np.array:
+        """
+        Imagen del estado actual de un System
+        """
+        return self.dibujar(sistema.y[:, :3], radio_particula(sistema.m), sistema.color)
+
+class ExportadorCuadros:
+    """
+    Observador de System que guarda un cuadro cada `cada` pasos
+
+    Los cuadros se guardan como cuadro_00000.png, ... o, con formato "raw",
+    como bytes RGB uint8 (alto, ancho, 3) sin encabezado
+    """
+    def __init__(
+            self,
+            sistema:System,
+            carpeta:str,
+            cada:int=1,
+            formato:str="png",
+            rasterizador:Rasterizador|None=None
+            ):
+        """
+        Args:
+            - sistema (System) : Sistema a exportar
+            - carpeta (str) : Carpeta de salida, se crea si no existe
+            - cada (int) : Se exporta un cuadro cada `cada` pasos
+            - formato (str) : "png" o "raw"
+            - rasterizador (Rasterizador) : Rasterizador a usar, por defecto uno nuevo
+        """
+        if formato not in ("png", "raw"):
+            raise ValueError(f"Formato de cuadro desconocido: {formato}")
+        if cada < 1:
+            raise ValueError("cada debe ser mayor a cero")
+
+        self.carpeta = carpeta
+        self.cada = cada
+        self.formato = formato
+        self.rasterizador = Rasterizador() if rasterizador is None else rasterizador
+        self.cuadros = 0
+        self._llamadas = 0
+
+        os.makedirs(carpeta, exist_ok=True)
+        sistema.agregar_observador(self)
+
+    def __call__(self, sistema:System):
+        self._llamadas += 1
+        if self._llamadas % self.cada != 0:
+            return
+
+        imagen = self.rasterizador.dibujar_sistema(sistema)
+        ruta = os.path.join(self.carpeta, f"cuadro_{self.cuadros:05d}.{self.formato}")
+        if self.formato == "png":
+            escribir_png(ruta, imagen)
+        else:
+            imagen.tofile(ruta)
+        self.cuadros += 1
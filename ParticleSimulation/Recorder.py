@@ -0,0 +1,185 @@
+import json
+import queue
+import threading
+
+import numpy as np
+
+from ParticleSimulation.System import System
+
+class Grabador:
+    """
+    Graba la trayectoria de un System en un archivo .npy mapeado en memoria
+
+    Se registra como observador del sistema y copia el estado (N, 6) cada
+    `cada` pasos. Las copias se hacen en buffers reservados de antemano y un
+    hilo de fondo las escribe en el archivo, así el ciclo de simulación no
+    espera al disco. Solo espera si el hilo se atrasa más de `max_pendientes`
+    cuadros.
+
+    Archivos que genera, con ruta "trayectoria.npy":
+        - trayectoria.npy        : Estados (cuadros, N, 6)
+        - trayectoria.pasos.npy  : Paso del sistema de cada cuadro (cuadros,)
+        - trayectoria.json       : Metadatos, se escribe al cerrar
+
+    En modo anillo el archivo guarda solo los últimos `cuadros` cuadros y se
+    sobrescribe circularmente. Grabador.leer los devuelve en orden.
+    """
+    def __init__(
+            self,
+            sistema:System,
+            ruta:str,
+            cuadros:int,
+            cada:int=1,
+            anillo:bool=False,
+            max_pendientes:int=16
+            ):
+        """
+        Args:
+            - sistema (System) : Sistema a grabar, el número de partículas debe
+                                 mantenerse fijo durante la grabación
+            - ruta (str) : Ruta del archivo .npy
+            - cuadros (int) : Número de cuadros que caben en el archivo
+            - cada (int) : Se graba un cuadro cada `cada` pasos
+            - anillo (bool) : Si True, al llenarse se sobrescriben los cuadros más viejos
+            - max_pendientes (int) : Cuadros que pueden esperar a ser escritos
+        """
+        if cuadros < 1 or cada < 1:
+            raise ValueError("cuadros y cada deben ser mayores a cero")
+
+        self.ruta = str(ruta)
+        self.base = self.ruta[:-4] if self.ruta.endswith(".npy") else self.ruta
+        self.n = sistema.n
+        self.cuadros = cuadros
+        self.cada = cada
+        self.anillo = anillo
+        self.dt = sistema.dt
+
+        self.estados = np.lib.format.open_memmap(
+            self.ruta, mode="w+", dtype=sistema.dtype, shape=(cuadros, self.n, 6))
+        self.indices_paso = np.lib.format.open_memmap(
+            self.base + ".pasos.npy", mode="w+", dtype=np.int64, shape=(cuadros,))
+
+        # Buffers de paso entre el hilo de simulación y el de escritura
+        self._buffers = np.empty((max_pendientes, self.n, 6), dtype=sistema.dtype)
+        self._libres = queue.Queue()
+        for i in range(max_pendientes):
+            self._libres.put(i)
+        self._pendientes = queue.Queue()
+
+        self.grabados = 0       # Cuadros enviados al archivo
+        self.descartados = 0    # Cuadros que no cupieron (sin modo anillo)
+        self.esperas = 0        # Veces que la simulación esperó al hilo de escritura
+        self._llamadas = 0
+        self._cerrado = False
+
+        self._hilo = threading.Thread(target=self._escribir, name="Grabador", daemon=True)
+        self._hilo.start()
+        sistema.agregar_observador(self)
+
+    @classmethod
+    def ultimos_segundos(cls, sistema:System, ruta:str, segundos:float, cada:int=1, **kwargs):
+        """
+        Grabador en modo anillo que conserva los últimos `segundos` de simulación
+
+        Args:
+            - sistema (System) : Sistema a grabar
+            - ruta (str) : Ruta del archivo .npy
+            - segundos (float) : Tiempo de simulación a conservar
+            - cada (int) : Se graba un cuadro cada `cada` pasos
+        """
+        cuadros = max(1, int(np.ceil(segundos / (sistema.dt * cada))))
+        return cls(sistema, ruta, cuadros, cada=cada, anillo=True, **kwargs)
+
+    def __call__(self, sistema:System):
+        """
+        Observador del sistema: encola el estado actual si toca grabarlo
+        """
+        self._llamadas += 1
+        if self._cerrado or self._llamadas % self.cada != 0:
+            return
+        if sistema.n != self.n:
+            raise ValueError(f"El grabador espera {self.n} partículas y el sistema tiene {sistema.n}")
+        if not self.anillo and self.grabados >= self.cuadros:
+            self.descartados += 1
+            return
+
+        try:
+            libre = self._libres.get_nowait()
+        except queue.Empty:
+            self.esperas += 1
+            libre = self._libres.get()
+
+        self._buffers[libre] = sistema.y
+        self._pendientes.put((libre, self.grabados % self.cuadros, sistema.pasos))
+        self.grabados += 1
+
+    def _escribir(self):
+        """
+        Hilo de escritura: pasa los cuadros pendientes al archivo mapeado
+        """
+        while True:
+            tarea = self._pendientes.get()
+            if tarea is None:
+                break
+            libre, indice, paso = tarea
+            self.estados[indice] = self._buffers[libre]
+            self.indices_paso[indice] = paso
+            self._libres.put(libre)
+
+    def cerrar(self):
+        """
+        Espera a que se escriban los cuadros pendientes, vacía el archivo a
+        disco y guarda los metadatos
+        """
+        if self._cerrado:
+            return
+        self._cerrado = True
+        self._pendientes.put(None)
+        self._hilo.join()
+        self.estados.flush()
+        self.indices_paso.flush()
+
+        meta = {
+            "cuadros": self.cuadros,
+            "escritos": min(self.grabados, self.cuadros),
+            "grabados": self.grabados,
+            "inicio": self.grabados % self.cuadros if self.anillo and self.grabados > self.cuadros else 0,
+            "cada": self.cada,
+            "anillo": self.anillo,
+            "dt": self.dt,
+            "descartados": self.descartados,
+        }
+        with open(self.base + ".json", "w", encoding="utf-8") as archivo:
+            json.dump(meta, archivo, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @staticmethod
+    def leer(ruta:str):
+        """
+        Lee una grabación en orden cronológico
+
+        Args:
+            - ruta (str) : Ruta del archivo .npy
+
+        Returns:
+            - (np.array, np.array): Estados (cuadros, N, 6) y el paso de cada cuadro.
+                                    Sin modo anillo los estados son un mapa de memoria
+        """
+        ruta = str(ruta)
+        base = ruta[:-4] if ruta.endswith(".npy") else ruta
+        with open(base + ".json", encoding="utf-8") as archivo:
+            meta = json.load(archivo)
+
+        estados = np.load(ruta, mmap_mode="r")
+        pasos = np.load(base + ".pasos.npy", mmap_mode="r")
+        escritos, inicio = meta["escritos"], meta["inicio"]
+        if inicio == 0:
+            return estados[:escritos], pasos[:escritos]
+
+        orden = (np.arange(escritos) + inicio) % meta["cuadros"]
+        return estados[orden], pasos[orden]
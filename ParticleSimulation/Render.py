@@ -1,15 +1,76 @@
+import ctypes
+from time import perf_counter
+
 import numpy as np
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
+from OpenGL.GL import shaders
 
 from ParticleSimulation.System import System
+from ParticleSimulation.Collisions import radio as radio_particula
+from ParticleSimulation.Camera import Camara
+
+# Cada partícula es un punto que el shader agranda según su radio y la
+# distancia a la cámara, y el fragment shader lo recorta como un disco
+# sombreado como esfera
+_VERTEX_SHADER = """
+#version 120
+attribute vec3 posicion;
+attribute float radio;
+attribute vec3 color;
+uniform float escala;
+varying vec3 v_color;
+
+void main() {
+    gl_Position = gl_ModelViewProjectionMatrix * vec4(posicion, 1.0);
+    gl_PointSize = max(2.0 * radio * escala / gl_Position.w, 1.0);
+    v_color = color;
+}
+"""
+
+_FRAGMENT_SHADER = """
+#version 120
+varying vec3 v_color;
+
+void main() {
+    vec2 p = gl_PointCoord * 2.0 - 1.0;
+    float r2 = dot(p, p);
+    if (r2 > 1.0) discard;
+    vec3 normal = vec3(p.x, -p.y, sqrt(1.0 - r2));
+    float luz = max(dot(normal, normalize(vec3(0.4, 0.6, 1.0))), 0.0);
+    gl_FragColor = vec4(v_color * (0.25 + 0.75 * luz), 1.0);
+}
+"""
+
+# Columnas del buffer intercalado: posición (3), radio (1), color (3)
+_COLUMNAS = 7
+
+# Créditos que se dibujan en cada cuadro: (x, distancia al borde superior, texto)
+CREDITOS = (
+    (10, 30, "Hecho por:"),
+    (20, 60, "Sofia Marin"),
+    (20, 90, "Sergio Mendez"),
+    (20, 120, "Sergio Palacios"),
+)
+
+# Segundos entre actualizaciones del HUD
+INTERVALO_HUD = 0.5
+
+# Niveles de detalle de las esferas: (diámetro mínimo en pixeles, cortes, pilas).
+# Las partículas de menos de NIVELES[-1][0] pixeles se dibujan como puntos
+NIVELES = (
+    (48.0, 20, 20),
+    (16.0, 12, 10),
+    (6.0, 8, 6),
+    (2.0, 5, 4),
+)
 
 class Render:
     """
     Clase para visualizar la simulación de partículas usando OpenGL
     """
-    def __init__(self, sistema:System, ancho=800, alto=600):
+    def __init__(self, sistema:System, ancho=800, alto=600, sprites=True, buffer=None):
         """
         Inicializa el renderizador OpenGL
         
@@ -17,12 +78,38 @@ class Render:
             - sistema (System): Sistema de partículas a visualizar
             - ancho (int): Ancho de la ventana
             - alto (int): Alto de la ventana
+            - sprites (bool): Dibuja todas las partículas en una sola llamada
+                              con point sprites. Si es False o los shaders no
+                              compilan se dibuja una esfera por partícula
+            - buffer (BufferTriple): Si se da, las partículas se leen de la
+                                     última instantánea publicada en él en vez
+                                     de leer el sistema directamente
         """
         self.sistema = sistema
+        self.buffer = buffer
         self.ancho = ancho
         self.alto = alto
-        self.angulo_x = 0
-        self.angulo_y = 0
+        self.camara = Camara(ancho, alto)
+
+        self.sprites = sprites
+        self._programa = None
+        self._vbo = None
+        self._capacidad_vbo = 0
+        self._datos = np.empty((0, _COLUMNAS), dtype=np.float32)
+        self._esferas = None
+        self._instantanea = None
+
+        # Partículas dibujadas y descartadas por estar fuera de la vista en el último cuadro
+        self.dibujadas = 0
+        self.ocultas = 0
+
+        # Textos compilados en listas de OpenGL y estado del HUD
+        self.hud = True
+        self._texto_fijo = None
+        self._lista_hud = None
+        self._cuadros = 0
+        self._marca_hud = perf_counter()
+        self._paso_hud = None
         
     def inicializar(self):
         """
@@ -39,21 +126,65 @@ class Render:
         glutDisplayFunc(self.dibujar)
         glutIdleFunc(None)
         glutKeyboardFunc(self.teclado)
+
+        self._crear_esferas()
+        self._texto_fijo = glGenLists(2)
+        self._lista_hud = self._texto_fijo + 1
+        self._compilar_texto(self._texto_fijo, [(x, self.alto - y, texto) for x, y, texto in CREDITOS]
+                             + [(10, 10, "Mover la camara con W-A-S-D, H oculta el HUD")])
+        self._compilar_texto(self._lista_hud, [])
+        if self.sprites:
+            self._inicializar_sprites()
+
+    def _crear_esferas(self):
+        """
+        Teselaciones de la esfera unitaria de cada nivel de detalle, guardadas
+        en listas de OpenGL consecutivas a partir de self._esferas
+        """
+        self._esferas = glGenLists(len(NIVELES))
+        quadric = gluNewQuadric()
+        for nivel, (_, cortes, pilas) in enumerate(NIVELES):
+            glNewList(self._esferas + nivel, GL_COMPILE)
+            gluSphere(quadric, 1.0, cortes, pilas)
+            glEndList()
+        gluDeleteQuadric(quadric)
+
+    def _inicializar_sprites(self):
+        """
+        Compila los shaders de los point sprites y crea el buffer de vértices.
+        Si algo falla se usa el dibujo clásico con esferas
+        """
+        try:
+            self._programa = shaders.compileProgram(
+                shaders.compileShader(_VERTEX_SHADER, GL_VERTEX_SHADER),
+                shaders.compileShader(_FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+            )
+        except Exception as e:
+            print(f"Point sprites no disponibles, se dibujan esferas: {e}")
+            self.sprites = False
+            return
+
+        self._atributos = {
+            nombre: glGetAttribLocation(self._programa, nombre)
+            for nombre in ("posicion", "radio", "color")
+        }
+        self._escala = glGetUniformLocation(self._programa, "escala")
+        self._vbo = glGenBuffers(1)
+        glEnable(GL_VERTEX_PROGRAM_POINT_SIZE)
+        glEnable(GL_POINT_SPRITE)
         
     def configurar_camara(self):
         """
         Configura la cámara y la proyección
         """
+        # Las matrices se calculan en Camara para que el nivel de detalle use
+        # exactamente la misma transformación que OpenGL. OpenGL las espera
+        # por columnas, de ahí la transpuesta
         glMatrixMode(GL_PROJECTION)
-        glLoadIdentity()
-        gluPerspective(45, self.ancho / self.alto, 1.0, 6000.0)
-        
+        glLoadMatrixf(self.camara.proyeccion().T.astype(np.float32))
+
         glMatrixMode(GL_MODELVIEW)
-        glLoadIdentity()
-        gluLookAt(0, 0, 4000, 0, 0, 0, 0, 1, 0)
-        
-        glRotatef(self.angulo_x, 1, 0, 0)
-        glRotatef(self.angulo_y, 0, 1, 0)
+        glLoadMatrixf(self.camara.vista().T.astype(np.float32))
     
     def dibujar_caja(self):
         """
@@ -108,6 +239,89 @@ class Render:
         
         glEnd()
     
+    def datos_particulas(self):
+        """
+        Datos de dibujo de todas las partículas en float32, el formato que
+        recibe OpenGL. Si el sistema ya guarda float32 no hay conversión
+
+        Returns:
+            - (np.array, np.array, np.array): Posiciones (N, 3), radios (N,)
+                                              y colores (N, 3)
+        """
+        if self.buffer is not None:
+            instantanea = self._instantanea = self.buffer.tomar()
+            return instantanea.posiciones, instantanea.radios, instantanea.colores
+
+        posiciones = self.sistema.y[:, :3].astype(np.float32, copy=False)
+        radios = radio_particula(self.sistema.m).astype(np.float32, copy=False)
+        colores = self.sistema.color.astype(np.float32, copy=False)
+        return posiciones, radios, colores
+
+    def datos_visibles(self):
+        """
+        Como datos_particulas, pero solo con las partículas que quedan dentro
+        del volumen de visión de la cámara. Todas se prueban contra los seis
+        planos en una sola operación
+
+        Returns:
+            - (np.array, np.array, np.array): Posiciones, radios y colores visibles
+        """
+        posiciones, radios, colores = self.datos_particulas()
+        visibles = self.camara.visibles(posiciones, radios)
+        self.dibujadas = int(np.count_nonzero(visibles))
+        self.ocultas = len(visibles) - self.dibujadas
+        if self.ocultas == 0:
+            return posiciones, radios, colores
+        return posiciones[visibles], radios[visibles], colores[visibles]
+
+    def _llenar_datos(self) -> np.array:
+        """
+        Copia posiciones, radios y colores al arreglo intercalado (N, 7) que
+        se sube al buffer de vértices. El arreglo se reutiliza entre cuadros
+        """
+        posiciones, radios, colores = self.datos_visibles()
+        n = len(posiciones)
+        if len(self._datos) < n:
+            self._datos = np.empty((max(n, 2 * len(self._datos)), _COLUMNAS), dtype=np.float32)
+
+        datos = self._datos[:n]
+        datos[:, :3] = posiciones
+        datos[:, 3] = radios
+        datos[:, 4:] = colores
+        return datos
+
+    def dibujar_sprites(self):
+        """
+        Dibuja todas las partículas con una sola llamada a glDrawArrays. Los
+        datos se suben una vez por cuadro con GL_STREAM_DRAW
+        """
+        datos = self._llenar_datos()
+        n = len(datos)
+        if n == 0:
+            return
+
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        if n > self._capacidad_vbo:
+            self._capacidad_vbo = len(self._datos)
+            glBufferData(GL_ARRAY_BUFFER, self._datos.nbytes, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, datos.nbytes, datos)
+
+        glUseProgram(self._programa)
+        glUniform1f(self._escala, self.camara.pixeles_por_unidad)
+
+        paso = _COLUMNAS * 4
+        for nombre, tam, desfase in (("posicion", 3, 0), ("radio", 1, 12), ("color", 3, 16)):
+            lugar = self._atributos[nombre]
+            glEnableVertexAttribArray(lugar)
+            glVertexAttribPointer(lugar, tam, GL_FLOAT, GL_FALSE, paso, ctypes.c_void_p(desfase))
+
+        glDrawArrays(GL_POINTS, 0, n)
+
+        for lugar in self._atributos.values():
+            glDisableVertexAttribArray(lugar)
+        glUseProgram(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
     def dibujar_particula(self, particula):
         """
         Dibuja una partícula como una esfera
@@ -118,19 +332,51 @@ class Render:
         x, y, z = particula.y[:3]
         
         # Radio proporcional a la masa (radio = masa^(1/3) * factor_escala)
-        radio = (particula.m ** (1.0/3.0)) * 2.0
-        
+        radio = radio_particula(particula.m)
+        self._dibujar_esfera(x, y, z, radio, particula.color)
+
+    def _dibujar_esfera(self, x, y, z, radio, color, nivel=0):
+        """
+        Dibuja una esfera en (x, y, z) con la teselación de `nivel`
+        """
         glPushMatrix()
         glTranslatef(x, y, z)
-        glColor3f(particula.color[0], particula.color[1], particula.color[2])
-        
-        # Dibuja esfera usando cuadriláteros
-        quadric = gluNewQuadric()
-        gluSphere(quadric, radio, 20, 20)
-        gluDeleteQuadric(quadric)
-        
+        glScalef(radio, radio, radio)
+        glColor3f(color[0], color[1], color[2])
+        glCallList(self._esferas + nivel)
         glPopMatrix()
 
+    def dibujar_esferas(self):
+        """
+        Dibuja cada partícula con la esfera del nivel de detalle que le toca
+        según su tamaño en pantalla. Las que ocupan menos de un par de pixeles
+        se dibujan todas juntas como puntos
+        """
+        posiciones, radios, colores = self.datos_visibles()
+        tamanos = self.camara.tamano_pixeles(posiciones, radios)
+
+        minimos = np.array([nivel[0] for nivel in NIVELES])
+        # Índice del nivel de cada partícula, len(NIVELES) son puntos
+        niveles = np.searchsorted(-minimos, -tamanos, side="left")
+
+        for nivel in range(len(NIVELES)):
+            indices = np.flatnonzero(niveles == nivel)
+            for (x, y, z), radio, color in zip(posiciones[indices].tolist(), radios[indices].tolist(),
+                                               colores[indices].tolist()):
+                self._dibujar_esfera(x, y, z, radio, color, nivel)
+
+        puntos = np.flatnonzero((niveles == len(NIVELES)) & (tamanos > 0.0))
+        if len(puntos) == 0:
+            return
+        glPointSize(2.0)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, np.ascontiguousarray(posiciones[puntos]))
+        glColorPointer(3, GL_FLOAT, 0, np.ascontiguousarray(colores[puntos]))
+        glDrawArrays(GL_POINTS, 0, len(puntos))
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
     def dibujar_texto(self, x, y, texto):
         """
         Dibuja texto en coordenadas de pantalla 2D
@@ -140,6 +386,21 @@ class Render:
             - y (int): Posición y en pantalla
             - texto (str): Texto a dibujar
         """
+        self._escribir_lineas([(x, y, texto)])
+
+    def _compilar_texto(self, lista, lineas, fuente=GLUT_BITMAP_HELVETICA_18):
+        """
+        Guarda las líneas de texto en una lista de OpenGL, después se dibujan
+        todas con un solo glCallList
+        """
+        glNewList(lista, GL_COMPILE)
+        self._escribir_lineas(lineas, fuente)
+        glEndList()
+
+    def _escribir_lineas(self, lineas, fuente=GLUT_BITMAP_HELVETICA_18):
+        """
+        Dibuja una lista de (x, y, texto) en coordenadas de pantalla 2D
+        """
         glMatrixMode(GL_PROJECTION)
         glPushMatrix()
         glLoadIdentity()
@@ -150,16 +411,51 @@ class Render:
         glLoadIdentity()
         
         glColor3f(1.0, 1.0, 1.0)
-        glRasterPos2f(x, y)
-        
-        for caracter in texto:
-            glutBitmapCharacter(GLUT_BITMAP_HELVETICA_18, ord(caracter))
+        for x, y, texto in lineas:
+            glRasterPos2f(x, y)
+            for caracter in texto:
+                glutBitmapCharacter(fuente, ord(caracter))
         
         glPopMatrix()
         glMatrixMode(GL_PROJECTION)
         glPopMatrix()
         glMatrixMode(GL_MODELVIEW)
     
+    def _actualizar_hud(self):
+        """
+        Cuenta el cuadro y, cada INTERVALO_HUD segundos, vuelve a compilar el
+        HUD con los FPS, los pasos/s de la simulación, el número de
+        partículas y los ms de cada fase del paso
+        """
+        self._cuadros += 1
+        ahora = perf_counter()
+        transcurrido = ahora - self._marca_hud
+        if transcurrido < INTERVALO_HUD:
+            return
+
+        if self._instantanea is not None:
+            paso, tiempos, n = self._instantanea.paso, self._instantanea.tiempos, self._instantanea.n
+        else:
+            paso, tiempos, n = self.sistema.pasos, self.sistema.tiempos, self.sistema.n
+        pasos_s = 0.0 if self._paso_hud is None else (paso - self._paso_hud) / transcurrido
+
+        lineas = [
+            f"FPS: {self._cuadros / transcurrido:.1f}",
+            f"Pasos/s: {pasos_s:.1f}",
+            f"Particulas: {n}",
+            f"Fuera de vista: {self.ocultas}",
+        ] + [f"{fase}: {1e3 * tiempo:.2f} ms" for fase, tiempo in tiempos.items()]
+        x = self.ancho - 170
+        self._compilar_texto(
+            self._lista_hud,
+            [(x, self.alto - 20 - 16 * i, texto) for i, texto in enumerate(lineas)],
+            GLUT_BITMAP_HELVETICA_12,
+        )
+
+        self._cuadros = 0
+        self._marca_hud = ahora
+        self._paso_hud = paso
+
     def dibujar(self):
         """
         Función de renderizado principal
@@ -169,14 +465,15 @@ class Render:
         self.configurar_camara()
         self.dibujar_caja()
         
-        for particula in self.sistema.particulas:
-            self.dibujar_particula(particula)
+        if self.sprites:
+            self.dibujar_sprites()
+        else:
+            self.dibujar_esferas()
         
-        self.dibujar_texto(10, self.alto - 30, "Hecho por:")
-        self.dibujar_texto(20, self.alto - 60, "Sofia Marin")
-        self.dibujar_texto(20, self.alto - 90, "Sergio Mendez")
-        self.dibujar_texto(20, self.alto - 120, "Sergio Palacios")
-        self.dibujar_texto(10, 10, "Mover la camara con W-A-S-D")
+        glCallList(self._texto_fijo)
+        self._actualizar_hud()
+        if self.hud:
+            glCallList(self._lista_hud)
         glutSwapBuffers()
     
     def teclado(self, key, x, y):
@@ -191,13 +488,15 @@ class Render:
         if key == b'q' or key == b'\x1b':  # 'q' o ESC
             glutLeaveMainLoop()
         elif key == b'w':
-            self.angulo_x += 5
+            self.camara.angulo_x += 5
         elif key == b's':
-            self.angulo_x -= 5
+            self.camara.angulo_x -= 5
         elif key == b'a':
-            self.angulo_y -= 5
+            self.camara.angulo_y -= 5
         elif key == b'd':
-            self.angulo_y += 5
+            self.camara.angulo_y += 5
+        elif key == b'h':
+            self.hud = not self.hud
     
     def actualizar_frame(self):
         """
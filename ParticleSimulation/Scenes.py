@@ -0,0 +1,151 @@
+import numpy as np
+
+from ParticleSimulation.System import System
+from ParticleSimulation.Forces import Gravedad
+
+LIMITES = [-1000, 1000, -1000, 1000, -1000, 1000]
+# Aceleración de la gravedad, igual para todas las masas
+GRAVEDAD = [0.0, -980.0, 0.0]
+
+def _cantidad(base:int, nParticles:float) -> int:
+    return int(np.round(base * nParticles, decimals=0))
+
+def _entero(rng:np.random.Generator, a:int, b:int, k:int) -> np.array:
+    """
+    Enteros uniformes en [a, b], ambos incluidos
+    """
+    return rng.integers(a, b + 1, k)
+
+# Tintes de cada grupo de partículas
+VERDE = np.array([0.0, 1.0, 0.0])
+ROJO = np.array([1.0, 0.0, 0.0])
+GRIS = np.array([1.0, 1.0, 1.0])
+AZUL = np.array([0.3, 0.3, 1.0])
+
+def _color(rng:np.random.Generator, tinte:np.array, k:int) -> np.array:
+    """
+    Colores de un grupo: el tinte escalado por una intensidad en [0.3, 1.0)
+    """
+    return (rng.random(k) * 0.7 + 0.3)[:, None] * tinte
+
+def escena_1(sistema:System, nParticles:float):
+    """
+    Cuatro chorros en cruz que salen del mismo punto
+
+    Args:
+        - sistema (System) : Sistema al que se agregan las partículas
+        - nParticles (float) : Multiplicador de partículas, 1.0 son 1000
+    """
+    rng = sistema.rng
+    k = _cantidad(250, nParticles)
+    x0 = np.array([20, 0, 20])
+    cero = np.zeros(k)
+
+    v0 = np.stack((_entero(rng, 0, 400, k), _entero(rng, 0, 200, k), cero), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, VERDE, k))
+
+    v0 = np.stack((-_entero(rng, 0, 400, k), _entero(rng, 0, 200, k), cero), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, ROJO, k))
+
+    v0 = np.stack((cero, _entero(rng, 0, 200, k), _entero(rng, 0, 100, k)), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, GRIS, k))
+
+    v0 = np.stack((cero, _entero(rng, 0, 200, k), -_entero(rng, 0, 100, k)), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, AZUL, k))
+
+def escena_2(sistema:System, nParticles:float):
+    """
+    Cuatro chorros diagonales que salen del mismo punto
+
+    Args:
+        - sistema (System) : Sistema al que se agregan las partículas
+        - nParticles (float) : Multiplicador de partículas, 1.0 son 1000
+    """
+    rng = sistema.rng
+    k = _cantidad(250, nParticles)
+    x0 = np.array([20, 0, 20])
+
+    v0 = np.stack((_entero(rng, 0, 200, k), _entero(rng, 0, 200, k), _entero(rng, 0, 200, k)), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, VERDE, k))
+
+    v0 = np.stack((-_entero(rng, 0, 100, k), _entero(rng, 0, 200, k), _entero(rng, 0, 100, k)), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, ROJO, k))
+
+    v0 = np.stack((-_entero(rng, 0, 200, k), _entero(rng, 0, 200, k), _entero(rng, 0, 200, k)), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, GRIS, k))
+
+    v0 = np.stack((_entero(rng, 0, 100, k), _entero(rng, 0, 200, k), -_entero(rng, 0, 100, k)), axis=1)
+    sistema.agregar_particulas(x0, v0, _entero(rng, 1, 1000, k), 1.0, _color(rng, AZUL, k))
+
+def escena_3(sistema:System, nParticles:float):
+    """
+    Una columna en reposo y tres chorros con distintos coeficientes de restitución
+
+    Args:
+        - sistema (System) : Sistema al que se agregan las partículas
+        - nParticles (float) : Multiplicador de partículas, 1.0 son 1000
+    """
+    rng = sistema.rng
+
+    k = _cantidad(100, nParticles)
+    sistema.agregar_particulas(
+        np.array([-100, 500, -100]), np.array([0, 0, 0]), _entero(rng, 1, 1000, k),
+        rng.random(k) * 0.5 + 0.5, _color(rng, VERDE, k)
+    )
+
+    k = _cantidad(300, nParticles)
+    v0 = np.stack((_entero(rng, 0, 400, k) - 200, _entero(rng, 0, 1000, k), _entero(rng, 0, 800, k) - 400), axis=1)
+    sistema.agregar_particulas(
+        np.array([0, 0, 0]), v0, _entero(rng, 1, 1000, k), rng.random(k) * 0.5, _color(rng, ROJO, k)
+    )
+
+    v0 = np.stack((-_entero(rng, 0, 200, k), _entero(rng, 0, 100, k), _entero(rng, 0, 200, k)), axis=1)
+    sistema.agregar_particulas(
+        np.array([100, 0, 100]), v0, _entero(rng, 1, 1000, k), 0.5, _color(rng, GRIS, k)
+    )
+
+    v0 = np.stack((_entero(rng, 0, 200, k), _entero(rng, 0, 100, k), _entero(rng, 0, 200, k)), axis=1)
+    sistema.agregar_particulas(
+        np.array([0, 0, 100]), v0, _entero(rng, 1, 1000, k), 0.5, _color(rng, AZUL, k)
+    )
+
+ESCENAS = {
+    1: escena_1,
+    2: escena_2,
+    3: escena_3,
+}
+
+def crear_sistema(
+        escena:int,
+        solver:callable,
+        dt:float,
+        nParticles:float,
+        semilla:int|None=None,
+        precision:str="ninguna",
+        dtype=np.float64,
+        paso_inicial:bool=True
+        ) -> System:
+    """
+    Construye el sistema de una de las escenas de ejemplo, con la gravedad
+    registrada como campo de fuerza
+
+    Args:
+        - escena (int) : Número de la escena (1, 2 o 3)
+        - solver (function) : Método numérico de Solvers
+        - dt (float) : Delta de tiempo
+        - nParticles (float) : Multiplicador de partículas, 1.0 son 1000
+        - semilla (int | None) : Semilla del generador aleatorio
+        - precision (str) : Política de redondeo, ver Precision
+        - dtype : Tipo de dato del estado, np.float32 o np.float64
+        - paso_inicial (bool) : Si se avanza un primer paso con el solver. Sin
+                                él el estado es el mismo para cualquier solver y dt
+
+    Returns:
+        - System: Sistema listo para simular
+    """
+    sistema = System(solver, dt, LIMITES, semilla=semilla, precision=precision, dtype=dtype)
+    sistema.agregar_campo(Gravedad(GRAVEDAD))
+    ESCENAS[escena](sistema, nParticles)
+    if paso_inicial:
+        sistema.aplicar_posiciones()
+    return sistema
@@ -1,8 +1,41 @@
 import numpy as np
 
+def _con_salida(derivada:callable) -> callable:
+    """
+    Adapta una derivada de la forma derivada(y) -> dy a la forma
+    derivada(y, out) que usan los métodos por lotes
+    """
+    def derivada_out(y, out):
+        out[...] = derivada(y)
+    return derivada_out
+
+# Tabla de Butcher de Dormand-Prince 5(4)
+_DP_A = (
+    (),
+    (1/5,),
+    (3/40, 9/40),
+    (44/45, -56/15, 32/9),
+    (19372/6561, -25360/2187, 64448/6561, -212/729),
+    (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+    (35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84),
+)
+# Diferencia entre los pesos de orden 5 y de orden 4, estima el error local
+_DP_E = (71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+
 class Solvers:
     """
     Clase para gestionar los metodos numéricos
+
+    Cada método tiene dos versiones:
+        - La versión simple (euler, runge_kutta_4, verlet) recibe
+          derivada(y) -> dy y retorna un estado nuevo
+        - La versión por lotes (euler_lote, runge_kutta_4_lote, verlet_lote)
+          recibe derivada(y, out), trabaja sobre estados (..., 6) y escribe
+          el resultado en `out` usando los buffers de trabajo del llamador,
+          sin reservar memoria. `out` puede ser el mismo arreglo `y`
+
+    Los métodos no redondean, el redondeo de cada etapa lo decide la
+    política de precisión del sistema (ver Precision)
     """
     @staticmethod
     def euler(derivada:callable, y:np.array, dt:float):
@@ -17,11 +50,7 @@ class Solvers:
         Returns:
         - np.array: Posiciones y velocidades [x, y, z, vx, vy, vz]
         """
-        y_diff = derivada(y)
-        y_diff = np.round(y_diff, decimals=2)
-        y_new = y + y_diff * dt
-
-        return y_new
+        return Solvers._simple(Solvers.euler_lote, derivada, y, dt)
 
     @staticmethod
     def runge_kutta_4(derivada:callable, y:np.array, dt:float):
@@ -32,19 +61,12 @@ class Solvers:
             - derivada (function) : Funcion que calcula la derivada
             - y (np.array) :        Estado actual [x, y, z, vx, vy, vz]
             - dt (float) :          Delta de tiempo
-            
+
         Returns:
             - np.array: Posiciones y velocidades [x, y, z, vx, vy, vz
         """
+        return Solvers._simple(Solvers.runge_kutta_4_lote, derivada, y, dt)
 
-        k1 = np.round(derivada(y), decimals=2)
-        k2 = np.round(derivada(y + k1 * dt / 2), decimals=2)
-        k3 = np.round(derivada(y + k2 * dt / 2), decimals=2)
-        k4 = np.round(derivada(y + k3 * dt), decimals=2)
-        y_new =  y + (k1 + 2*k2 + 2*k3 + k4) * dt / 6
-        
-        return y_new
-    
     @staticmethod
     def verlet(derivada, y, dt):
         """
@@ -52,25 +74,221 @@ class Solvers:
 
         Args:
             - derivada (function): Función que calcula la derivada
-            - y (np.array):        Estado actual [x, y, z, vx, vy, vz]
+            - y (np.array):        Estado actual [x, y, z, vx, vy, vz], o un
+                                   lote (N, 6) con una partícula por fila
             - dt (float):          Delta de tiempo
 
         Returns:
             - np.array: Nuevo estado [x, y, z, vx, vy, vz]
         """
-        # Extraemos velocidad y aceleración actuales
-        v = y[3:]
-        a = derivada(y)[3:]   # aceleración actual
-        
-        # Paso de posición
-        x_new = y[:3] + v * dt + 0.5 * a * dt**2
+        return Solvers._simple(Solvers.verlet_lote, derivada, y, dt)
+
+    @staticmethod
+    def dormand_prince(derivada:callable, y:np.array, dt:float):
+        """
+        Metodo Numerico de Dormand-Prince de orden 5 con paso fijo. Para
+        paso adaptativo se usa como solver de System
+
+        Args:
+            - derivada (function) : Funcion que calcula la derivada
+            - y (np.array) :        Estado actual [x, y, z, vx, vy, vz]
+            - dt (float) :          Delta de tiempo
+
+        Returns:
+            - np.array: Posiciones y velocidades [x, y, z, vx, vy, vz]
+        """
+        return Solvers._simple(Solvers.dormand_prince_lote, derivada, y, dt)
+
+    @staticmethod
+    def euler_lote(derivada:callable, y:np.array, dt:float, out:np.array, buffers:np.array):
+        """
+        Metodo Numerico de Euler por lotes
+
+        Args:
+            - derivada (function) : Funcion derivada(y, out) que escribe la derivada en out
+            - y (np.array) :        Estados actuales (..., 6)
+            - dt (float) :          Delta de tiempo
+            - out (np.array) :      Arreglo (..., 6) donde se escribe el nuevo estado
+            - buffers (np.array) :  Buffers de trabajo, ver Solvers.buffers
+        """
+        k = buffers[0]
+        derivada(y, k)
+        k *= dt
+        np.add(y, k, out=out)
+
+    @staticmethod
+    def runge_kutta_4_lote(derivada:callable, y:np.array, dt:float, out:np.array, buffers:np.array):
+        """
+        Metodo Numerico de Runge Kutta 4 por lotes
+
+        Args:
+            - derivada (function) : Funcion derivada(y, out) que escribe la derivada en out
+            - y (np.array) :        Estados actuales (..., 6)
+            - dt (float) :          Delta de tiempo
+            - out (np.array) :      Arreglo (..., 6) donde se escribe el nuevo estado
+            - buffers (np.array) :  Buffers de trabajo, ver Solvers.buffers
+        """
+        k, suma, y_etapa = buffers
+
+        # k1
+        derivada(y, k)
+        suma[...] = k
+        np.multiply(k, dt / 2, out=y_etapa)
+        y_etapa += y
+
+        # k2
+        derivada(y_etapa, k)
+        suma += k
+        suma += k
+        np.multiply(k, dt / 2, out=y_etapa)
+        y_etapa += y
+
+        # k3
+        derivada(y_etapa, k)
+        suma += k
+        suma += k
+        np.multiply(k, dt, out=y_etapa)
+        y_etapa += y
+
+        # k4
+        derivada(y_etapa, k)
+        suma += k
+
+        suma *= dt / 6
+        np.add(y, suma, out=out)
+
+    @staticmethod
+    def verlet_lote(derivada:callable, y:np.array, dt:float, out:np.array, buffers:np.array):
+        """
+        Método Numérico de Verlet (Velocity Verlet) por lotes
+
+        Args:
+            - derivada (function) : Funcion derivada(y, out) que escribe la derivada en out
+            - y (np.array) :        Estados actuales (..., 6)
+            - dt (float) :          Delta de tiempo
+            - out (np.array) :      Arreglo (..., 6) donde se escribe el nuevo estado
+            - buffers (np.array) :  Buffers de trabajo, ver Solvers.buffers
+        """
+        dy, y_temp = buffers
+        v = y[..., 3:]
+        a = dy[..., 3:]
+        x_new = y_temp[..., :3]
+
+        # Aceleración actual
+        derivada(y, dy)
+
+        # Paso de posición: x + (v + a*dt/2)*dt
+        np.multiply(a, 0.5 * dt, out=x_new)
+        x_new += v
+        x_new *= dt
+        x_new += y[..., :3]
 
         # Estado provisional para recalcular aceleración
-        y_temp = np.concatenate((x_new, v))
-        a_new = derivada(y_temp)[3:]  # nueva aceleración
-        
-        # Paso de velocidad
-        v_new = v + 0.5 * (a + a_new) * dt
-
-        # Nuevo estado completo
-        return np.concatenate((x_new, v_new))
\ No newline at end of file
+        y_temp[..., 3:] = v
+
+        # Primera mitad del paso de velocidad: v + a*dt/2
+        a *= 0.5 * dt
+        np.add(v, a, out=out[..., 3:])
+        out[..., :3] = x_new
+
+        # Segunda mitad con la nueva aceleración
+        derivada(y_temp, dy)
+        a *= 0.5 * dt
+        out[..., 3:] += a
+
+    @staticmethod
+    def dormand_prince_lote(
+            derivada:callable,
+            y:np.array,
+            dt:float,
+            out:np.array,
+            buffers:np.array,
+            error:np.array=None
+            ):
+        """
+        Metodo Numerico de Dormand-Prince 5(4) por lotes. Avanza con la
+        solución de orden 5 y, si se pide, estima el error local con la
+        diferencia contra la solución embebida de orden 4
+
+        Args:
+            - derivada (function) : Funcion derivada(y, out) que escribe la derivada en out
+            - y (np.array) :        Estados actuales (..., 6)
+            - dt (float) :          Delta de tiempo
+            - out (np.array) :      Arreglo (..., 6) donde se escribe el nuevo estado
+            - buffers (np.array) :  Buffers de trabajo, ver Solvers.buffers
+            - error (np.array) :    Arreglo (..., 6) donde se escribe la estimación
+                                    del error local, o None para omitirla
+        """
+        k = buffers[:7]
+        y_etapa, tmp = buffers[7], buffers[8]
+
+        derivada(y, k[0])
+        for i in range(1, 7):
+            y_etapa[...] = y
+            for j, a in enumerate(_DP_A[i]):
+                if a != 0.0:
+                    np.multiply(k[j], a * dt, out=tmp)
+                    y_etapa += tmp
+            derivada(y_etapa, k[i])
+
+        # La última etapa se evaluó sobre la solución de orden 5
+        if error is not None:
+            error[...] = 0.0
+            for j, e in enumerate(_DP_E):
+                if e != 0.0:
+                    np.multiply(k[j], e * dt, out=tmp)
+                    error += tmp
+        out[...] = y_etapa
+
+    @staticmethod
+    def buffers(metodo:callable, forma:tuple, dtype=np.float64) -> np.array:
+        """
+        Reserva los buffers de trabajo de un método por lotes
+
+        Args:
+            - metodo (function) : Método por lotes (euler_lote, runge_kutta_4_lote, ...)
+            - forma (tuple) :     Forma del estado, por ejemplo (N, 6)
+            - dtype :             Tipo de dato de los buffers
+
+        Returns:
+            - np.array: Arreglo (etapas, *forma)
+        """
+        etapas = {
+            Solvers.euler_lote: 1,
+            Solvers.runge_kutta_4_lote: 3,
+            Solvers.verlet_lote: 2,
+            Solvers.dormand_prince_lote: 9,
+        }
+        return np.empty((etapas[metodo], *forma), dtype=dtype)
+
+    @staticmethod
+    def lote(metodo:callable):
+        """
+        Retorna la versión por lotes de un método de Solvers
+
+        Args:
+            - metodo (function) : Método simple o por lotes de Solvers
+
+        Returns:
+            - function | None: Versión por lotes, o None si el método no es de Solvers
+        """
+        lotes = {
+            Solvers.euler: Solvers.euler_lote,
+            Solvers.runge_kutta_4: Solvers.runge_kutta_4_lote,
+            Solvers.verlet: Solvers.verlet_lote,
+            Solvers.dormand_prince: Solvers.dormand_prince_lote,
+        }
+        if metodo in lotes.values():
+            return metodo
+        return lotes.get(metodo)
+
+    @staticmethod
+    def _simple(metodo_lote:callable, derivada:callable, y:np.array, dt:float):
+        """
+        Ejecuta un método por lotes con la interfaz de los métodos simples
+        """
+        y = np.asarray(y, dtype=np.result_type(y, float))
+        out = np.empty_like(y)
+        metodo_lote(derivada=_con_salida(derivada), y=y, dt=dt, out=out,
+                    buffers=Solvers.buffers(metodo_lote, y.shape, y.dtype))
+        return out
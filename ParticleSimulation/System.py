@@ -1,54 +1,719 @@
 import numpy as np
+from time import perf_counter
 from ParticleSimulation.Particle import Particula
+from ParticleSimulation.Boundary import frontera
+from ParticleSimulation.Collisions import colisiones
+from ParticleSimulation.Solvers import Solvers
+from ParticleSimulation.Precision import Precision
+from ParticleSimulation.Forces import CampoFuerza
+from ParticleSimulation.Parallel import Dominios, COMPARTIDOS
+from ParticleSimulation import Kernels
+from ParticleSimulation import Checkpoint
 
 class System:
     """
     Clase para gestionar un sistema de múltiples partículas
+
+    El estado de todas las partículas se guarda en arreglos contiguos
+    (estructura de arreglos) para avanzar el sistema con operaciones
+    sobre el arreglo completo:
+        - y (N, 6)     : Estado [x, y, z, vx, vy, vz] de cada partícula
+        - F (N, 3)     : Fuerza acumulada sobre cada partícula
+        - m (N,)       : Masas
+        - e (N,)       : Coeficientes de restitución
+        - color (N, 3) : Colores RGB
+        - edad (N,)    : Tiempo que lleva viva cada partícula
+        - vida (N,)    : Tiempo de vida, inf para las que no mueren
+
+    Las partículas vivas ocupan siempre las primeras N filas. Cuando una
+    partícula cumple su vida, la última partícula viva pasa a su lugar, así
+    el ciclo principal solo recorre filas vivas
     """
-    def __init__(self, solver:callable, dt:float, limites=None|list):
+    def __init__(
+            self,
+            solver:callable,
+            dt:float,
+            limites:list|None=None,
+            semilla:int|None=None,
+            colisiones:bool=False,
+            precision:Precision|str="ninguna",
+            dtype=np.float64,
+            rtol:float=1e-6,
+            atol:float=1e-3,
+            tolerancia_pared:float|None=1.0,
+            capacidad:int|None=None,
+            procesos:int=1,
+            backend:str="numpy"
+            ):
         """
-        Inicializa el sistema de partículas con una lista vacía
+        Inicializa el sistema sin partículas. Los arreglos del estado se
+        reservan con `capacidad` filas, o con 16 que crecen por duplicación
 
         Args:
-            - metodo_numerico (function) : Función que implementa un método numérico.
-                                           Debe recibir (derivada, y, dt) y retornar el nuevo estado
-            - limites (np.array) : Lista de los limites del mundo 
-                                   [xmin, xmax, ymin, ymax, zmin, zmax]
-            - dt (float) : Delta de tiempo
+            - solver (function) : Método numérico de Solvers, simple o por lotes.
+                                  Un método propio debe recibir (derivada, y, dt)
+                                  y retornar el nuevo estado. Con
+                                  Solvers.dormand_prince el paso es adaptativo
+            - dt (float) : Delta de tiempo de cada llamado a aplicar_posiciones
+            - limites (list | None) : Limites del mundo [xmin, xmax, ymin, ymax, zmin, zmax],
+                                      None para un mundo sin paredes
+            - semilla (int | None) : Semilla del generador aleatorio del sistema,
+                                     hace la simulación reproducible
+            - colisiones (bool) : Activa las colisiones entre partículas, con
+                                  radio masa^(1/3) * 2
+            - precision (Precision | str) : Política de redondeo numérico, o el
+                                            nombre de uno de Precision.MODOS
+            - dtype : Tipo de dato del estado, np.float32 o np.float64. Con
+                      float32 el estado, las fuerzas y los buffers del solver
+                      ocupan la mitad de memoria
+            - rtol, atol (float) : Tolerancias relativa y absoluta del error local
+                                   con el solver adaptativo (Solvers.dormand_prince).
+                                   Sus subpasos van de h_min a h_max (10 dt)
+            - tolerancia_pared (float | None) : Con el solver adaptativo, máxima
+                                   distancia que una partícula puede atravesar una
+                                   pared en un subpaso, fuerza pasos pequeños
+                                   alrededor de los choques. None la desactiva
+            - capacidad (int | None) : Número fijo de partículas que caben en el
+                                       sistema, los arreglos se reservan una sola
+                                       vez. None los deja crecer por duplicación
+            - procesos (int) : Procesos que integran el sistema. Con más de uno
+                               el sistema se reparte en franjas a lo largo de x,
+                               ver Parallel.Dominios. Las fuerzas, las colisiones
+                               y los observadores siguen en el proceso principal
+            - backend (str) : "numpy", "numba" o "auto". Con "numba" el paso se
+                              hace con los núcleos compilados de Kernels, que dan
+                              el mismo resultado dentro de Kernels.TOLERANCIA.
+                              "auto" usa Numba si está instalado y el solver y
+                              la precisión lo permiten
         """
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(f"Tipo de dato no soportado: {self.dtype}")
+
         self.solver = solver
         self.dt = dt
         self.limites:list = limites
-        self.particulas:list[Particula] = []
         self.time = 0.00
-    
+        self.rng = np.random.default_rng(semilla)
+        self.colisiones = colisiones
+        self.contactos = 0
+        self.choques_pared = 0  # Choques contra los limites (partícula y eje) desde el inicio
+        self.precision = precision if isinstance(precision, Precision) else Precision(precision)
+
+        # Control de paso del solver adaptativo
+        self.rtol = rtol
+        self.atol = atol
+        self.tolerancia_pared = tolerancia_pared
+        self.h = dt
+        self.h_min = dt * 1e-4
+        self.h_max = dt * 10.0
+        self.pasos_aceptados = 0
+        self.pasos_rechazados = 0
+
+        # Campos de fuerza que se evalúan al inicio de cada paso
+        self.campos:list[CampoFuerza] = []
+
+        # Emisores que agregan partículas al inicio de cada paso
+        self.emisores:list = []
+        self.muertas = 0        # Partículas eliminadas al cumplir su vida
+        self.rechazadas = 0     # Partículas que un emisor no pudo agregar por falta de espacio
+
+        # Funciones que se llaman con el sistema al final de cada paso
+        self.observadores:list[callable] = []
+        self.pasos = 0
+
+        # Duración en segundos de cada fase del último paso
+        self._t_fuerzas = 0.0
+        self._t_campos = 0.0
+        self.tiempos = {"fuerzas": 0.0, "campos": 0.0, "integracion": 0.0, "colisiones": 0.0,
+                        "frontera": 0.0, "redondeo": 0.0}
+
+        self.backend = self._elegir_backend(backend, procesos)
+
+        # Procesos de trabajo, los arreglos que usan se reservan en memoria compartida
+        self._dominios = Dominios(procesos, solver, self.precision, self.dtype, semilla) if procesos > 1 else None
+
+        # Almacenamiento contiguo, crece por duplicación salvo con capacidad fija
+        self.n = 0
+        self.capacidad_fija = capacidad is not None
+        self._reservar(16 if capacidad is None else capacidad)
+        self._vistas:list[Particula|None] = []
+
+    def _elegir_backend(self, backend:str, procesos:int) -> str:
+        """
+        Valida la opción `backend` y la resuelve a "numpy" o "numba"
+        """
+        if backend not in ("numpy", "numba", "auto"):
+            raise ValueError(f"Backend desconocido: {backend}")
+        if backend == "numpy":
+            return backend
+
+        # Los núcleos no redondean las etapas ni reparten el trabajo entre procesos
+        compatible = (Kernels.soportado(self.solver) and self.precision.etapa is None
+                      and procesos == 1)
+        if backend == "auto":
+            return "numba" if Kernels.DISPONIBLE and compatible else "numpy"
+        if not Kernels.DISPONIBLE:
+            raise ImportError("El backend numba necesita el paquete numba instalado")
+        if not compatible:
+            raise ValueError("El backend numba solo admite euler, runge_kutta_4 y verlet, "
+                             "sin redondeo por etapa y con un solo proceso")
+        return backend
+
+    def _reservar(self, capacidad:int):
+        """
+        Reserva (o amplía) los arreglos del sistema conservando el estado actual
+
+        Args:
+            - capacidad (int) : Número de partículas que caben sin realocar
+        """
+        n = self.n
+        buffers = {
+            "_y": np.zeros((capacidad, 6), dtype=self.dtype),
+            "_F": np.zeros((capacidad, 3), dtype=self.dtype),
+            "_a": np.zeros((capacidad, 3), dtype=self.dtype),
+            "_m": np.ones(capacidad, dtype=self.dtype),
+            "_e": np.ones(capacidad, dtype=self.dtype),
+            "_color": np.ones((capacidad, 3), dtype=np.float32),
+            "_edad": np.zeros(capacidad, dtype=self.dtype),
+            "_vida": np.full(capacidad, np.inf, dtype=self.dtype),
+        }
+        if self._dominios is not None:
+            buffers["_indices"] = np.zeros(capacidad, dtype=np.int64)
+        if self.backend == "numba":
+            buffers["_conteo"] = np.zeros(capacidad, dtype=np.int64)
+        for nombre, nuevo in buffers.items():
+            if self._dominios is not None and (nombre in COMPARTIDOS or nombre == "_indices"):
+                nuevo = self._dominios.compartido(nombre, nuevo)
+            if hasattr(self, nombre):
+                nuevo[:n] = getattr(self, nombre)[:n]
+            setattr(self, nombre, nuevo)
+        self.capacidad = capacidad
+        self._buffers = None
+
+    # Vistas sobre las partículas activas
+    @property
+    def y(self):
+        return self._y[:self.n]
+
+    @property
+    def F(self):
+        return self._F[:self.n]
+
+    @property
+    def m(self):
+        return self._m[:self.n]
+
+    @property
+    def e(self):
+        return self._e[:self.n]
+
+    @property
+    def color(self):
+        return self._color[:self.n]
+
+    @property
+    def edad(self):
+        return self._edad[:self.n]
+
+    @property
+    def vida(self):
+        return self._vida[:self.n]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memoria reservada por los arreglos del sistema y los buffers del solver
+        """
+        total = sum(getattr(self, nombre).nbytes
+                    for nombre in ("_y", "_F", "_a", "_m", "_e", "_color", "_edad", "_vida"))
+        if self._buffers is not None:
+            total += self._buffers[1].nbytes
+        return total
+
+    @property
+    def particulas(self) -> list[Particula]:
+        """
+        Lista de partículas del sistema. Cada elemento es una vista sobre
+        los arreglos del sistema, las que no se crearon con `Particula`
+        se construyen al pedirlas
+        """
+        for i, vista in enumerate(self._vistas):
+            if vista is None:
+                self._vistas[i] = Particula._vista(self, i)
+        return self._vistas
+
+    def agregar_campo(self, campo:CampoFuerza):
+        """
+        Registra un campo de fuerza (ver Forces) que se suma a las fuerzas
+        de todas las partículas al inicio de cada paso
+
+        Args:
+            - campo (CampoFuerza) : Campo a registrar
+        """
+        self.campos.append(campo)
+
+    def agregar_emisor(self, emisor):
+        """
+        Registra un emisor (ver Emitters) que agrega partículas al inicio de cada paso
+
+        Args:
+            - emisor (Emisor) : Emisor a registrar
+        """
+        self.emisores.append(emisor)
+
+    def agregar_observador(self, observador:callable):
+        """
+        Registra una función que se llama como observador(sistema) al final
+        de cada paso, por ejemplo un Grabador
+
+        Args:
+            - observador (function) : Función a llamar después de cada paso
+        """
+        self.observadores.append(observador)
+
     def agregar_particula(self, particula: Particula):
         """
-        Agrega una partícula al sistema
-        
+        Agrega una partícula al sistema. Su estado se copia a los arreglos
+        del sistema y la partícula queda como una vista sobre ellos
+
         Args:
             - particula (Particula): Objeto de tipo Particula a agregar
         """
-        self.particulas.append(particula)
-    
-    def aplicar_fuerzas(self, fuerzas: np.array):
+        self.agregar_particulas(
+            particula.y[None, :3], particula.y[None, 3:], particula.m,
+            particula.e, particula.color
+        )
+        particula._vincular(self, self.n - 1)
+        self._vistas[-1] = particula
+
+    def agregar_particulas(
+            self,
+            x0:np.array,
+            v0:np.array,
+            masa:np.array,
+            coef_restitucion:np.array=1.0,
+            color:np.array=(1.0, 1.0, 1.0),
+            vida:np.array=np.inf
+            ):
+        """
+        Agrega un lote de partículas al sistema sin crear objetos `Particula`
+
+        Args:
+            - x0 (np.array) : Posiciones iniciales (k, 3) o (3,)
+            - v0 (np.array) : Velocidades iniciales (k, 3) o (3,)
+            - masa (np.array) : Masas (k,) o escalar
+            - coef_restitucion (np.array) : Coeficientes de restitución (k,) o escalar
+            - color (np.array) : Colores (k, 3) o (3,)
+            - vida (np.array) : Tiempos de vida (k,) o escalar, inf no mueren
         """
-        Aplica un array de fuerzas a cada partícula del sistema
-        
+        x0 = np.atleast_2d(x0)
+        v0 = np.atleast_2d(v0)
+        k = max(len(x0), len(v0), np.size(masa), np.size(coef_restitucion),
+                len(np.atleast_2d(color)), np.size(vida))
+
+        inicio, fin = self.n, self.n + k
+        if fin > self.capacidad:
+            if self.capacidad_fija:
+                raise ValueError(f"No caben {k} partículas más, capacidad {self.capacidad} y hay {self.n}")
+            self._reservar(max(fin, 2 * self.capacidad))
+
+        self._y[inicio:fin, :3] = x0
+        self._y[inicio:fin, 3:] = v0
+        self._F[inicio:fin] = 0.0
+        self._m[inicio:fin] = masa
+        self._e[inicio:fin] = coef_restitucion
+        self._color[inicio:fin] = color
+        self._edad[inicio:fin] = 0.0
+        self._vida[inicio:fin] = vida
+
+        self.n = fin
+        self._vistas.extend([None] * k)
+
+    def _derivada(self, y:np.array, out:np.array=None):
+        """
+        Calcula la derivada del estado de todas las partículas. La aceleración
+        se toma de `self._a`, calculada una vez al inicio de cada paso
+
         Args:
-            - fuerzas (np.array): Array de fuerzas de forma (n_particulas, 3)
-                                  donde cada fila corresponde a la fuerza [Fx, Fy, Fz]
-                                  que actúa sobre cada partícula
+           - y (np.array): Estado (N, 6) [x, y, z, vx, vy, vz]
+           - out (np.array): Arreglo (N, 6) donde escribir la derivada, si es
+                             None se reserva uno nuevo
+
+        Returns:
+           - np.array: Derivada (N, 6) [vx, vy, vz, ax, ay, az]
+        """
+        if out is None:
+            out = np.empty_like(y)
+        out[:, :3] = y[:, 3:]
+        out[:, 3:] = self._a[:self.n]
+        if self.precision.etapa is not None:
+            self.precision.etapa(out)
+        return out
+
+    def _derivada_etapa(self, y:np.array, out:np.array):
+        """
+        Derivada del solver adaptativo. Los campos se evalúan sobre el estado
+        de cada etapa, así el error estimado incluye la variación de las
+        fuerzas durante el subpaso. Las fuerzas de `aplicar_fuerzas` se
+        toman fijas durante el paso
+
+        Args:
+           - y (np.array): Estado (N, 6) de la etapa
+           - out (np.array): Arreglo (N, 6) donde escribir la derivada
+        """
+        inicio = perf_counter()
+        F = out[:, 3:]
+        F[:] = self.F
+        for campo in self.campos:
+            campo.aplicar(y, self.m, F)
+        self._t_campos += perf_counter() - inicio
+        F /= self.m[:, None]
+        out[:, :3] = y[:, 3:]
+        if self.precision.etapa is not None:
+            self.precision.etapa(out)
+
+    def _scratch(self, metodo_lote:callable) -> np.array:
         """
-        for particula in self.particulas:
-            particula.forcesSum(fuerzas)
+        Buffers de trabajo del método por lotes para las partículas activas.
+        Se reservan una vez por capacidad y método
+
+        Args:
+            - metodo_lote (function) : Método por lotes de Solvers
+
+        Returns:
+            - np.array: Buffers (etapas, N, 6)
+        """
+        if self._buffers is None or self._buffers[0] is not metodo_lote:
+            self._buffers = (metodo_lote, Solvers.buffers(metodo_lote, (self.capacidad, 6), self.dtype))
+        return self._buffers[1][:, :self.n]
+
+    def _scratch_adaptativo(self) -> np.array:
+        """
+        Buffers del solver adaptativo: las etapas de Dormand-Prince más el
+        estado candidato y la estimación del error
+
+        Returns:
+            - np.array: Buffers (etapas + 2, N, 6)
+        """
+        metodo_lote = Solvers.dormand_prince_lote
+        if self._buffers is None or self._buffers[0] is not metodo_lote:
+            etapas = Solvers.buffers(metodo_lote, (self.capacidad, 6), self.dtype)
+            extra = np.empty((2, self.capacidad, 6), dtype=self.dtype)
+            self._buffers = (metodo_lote, np.concatenate((etapas, extra)))
+        return self._buffers[1][:, :self.n]
+
+    def aplicar_fuerzas(self, fuerzas: np.array, indices: np.array = None):
+        """
+        Suma fuerzas a las partículas del sistema. Las fuerzas se acumulan
+        hasta el siguiente paso, así se puede llamar varias veces
+
+        Sin `indices` la fuerza es densa: un array (n_particulas, 3) con la
+        fuerza [Fx, Fy, Fz] de cada partícula, o una sola fuerza (3,) o (1, 3)
+        que se aplica a todas
+
+        Con `indices` la fuerza es dispersa: fuerzas[k] se suma a la partícula
+        indices[k]. Los índices repetidos se acumulan, así por ejemplo un
+        resorte entre i y j se aplica con indices=[i, j] y fuerzas=[f, -f]
+
+        Args:
+            - fuerzas (np.array): Fuerzas (n_particulas, 3), (3,) o (1, 3), o
+                                  (k, 3) con `indices`
+            - indices (np.array): Índices (k,) de las partículas que reciben
+                                  cada fuerza, None para fuerzas densas
+        """
+        inicio = perf_counter()
+        fuerzas = np.asarray(fuerzas)
+        if indices is None:
+            if fuerzas.shape not in ((3,), (1, 3), (self.n, 3)):
+                raise ValueError(f"Se esperaban fuerzas (3,), (1, 3) o ({self.n}, 3), no {fuerzas.shape}")
+            self.F[:] += fuerzas
+        else:
+            indices = np.asarray(indices)
+            k = indices.size
+            if indices.ndim != 1 or fuerzas.shape not in ((3,), (k, 3)):
+                raise ValueError(f"Se esperaban indices (k,) y fuerzas (k, 3), no {indices.shape} y {fuerzas.shape}")
+            # Una lista vacía llega como float64, solo se rechazan los índices no enteros
+            if k and indices.dtype.kind not in "iu":
+                raise ValueError(f"Los índices deben ser enteros, no {indices.dtype}")
+            if k and (indices.min() < 0 or indices.max() >= self.n):
+                raise ValueError(f"Índices fuera de rango para {self.n} partículas")
+            indices = indices.astype(np.intp, copy=False)
+            fuerzas = np.broadcast_to(fuerzas, (k, 3))
+            for eje in range(3):
+                self.F[:, eje] += np.bincount(indices, fuerzas[:, eje], self.n)
+        self._t_fuerzas += perf_counter() - inicio
 
     def aplicar_posiciones(self):
         """
-        Calcula las posiciones con un metodo de integración definido
+        Calcula las posiciones con un metodo de integración definido. Los
+        campos de fuerza se evalúan una vez con el estado al inicio del paso,
+        salvo con el solver adaptativo, que los evalúa en cada etapa
+        """
+        for emisor in self.emisores:
+            emisor.emitir(self, self.dt)
+        if self.n == 0:
+            return
+
+        metodo_lote = Solvers.lote(self.solver)
+        adaptativo = metodo_lote is Solvers.dormand_prince_lote
+        inicio = perf_counter()
+        if not adaptativo:
+            for campo in self.campos:
+                campo.aplicar(self.y, self.m, self.F)
+        t_campos = perf_counter()
+        self.tiempos["campos"] = t_campos - inicio
+        self.tiempos["fuerzas"] = self._t_fuerzas
+        self._t_fuerzas = 0.0
+
+        inicio = t_campos
+        fase = None
+        if self.backend == "numba":
+            # Con limites y sin colisiones el mismo recorrido cuenta los choques
+            fase = "contados" if self.limites is not None and not self.colisiones else None
+            Kernels.avanzar(metodo_lote, self.y, self.F, self.m, self.dt,
+                            self.limites if fase else None, self._conteo[:self.n])
+        elif adaptativo:
+            self._t_campos = 0.0
+            self._integrar_adaptativo()
+            self.F[:] = 0.0
+            # Los campos se evaluaron dentro de la integración, en cada etapa
+            self.tiempos["campos"] = self._t_campos
+            inicio += self._t_campos
+        else:
+            np.divide(self.F, self.m[:, None], out=self._a[:self.n])
+            if self._dominios is not None:
+                # Sin colisiones cada proceso aplica también la frontera a su franja
+                fase = "completo" if self.limites is not None and not self.colisiones else "integrar"
+                self._dominios.repartir(self)
+                _, choques = self._dominios.paso(self, fase, self.dt)
+                self.choques_pared += choques
+            elif metodo_lote is not None:
+                metodo_lote(self._derivada, self.y, self.dt, self.y, self._scratch(metodo_lote))
+            else:
+                self.y[:] = self.solver(self._derivada, self.y, self.dt)
+            self.F[:] = 0.0
+        t_integracion = perf_counter()
+
+        if self.colisiones:
+            self._colisiones()
+        t_colisiones = perf_counter()
+
+        if self.limites is not None and not adaptativo and fase != "completo":
+            self._frontera(contados=fase == "contados")
+        t_frontera = perf_counter()
+
+        if self.precision.salida is not None:
+            self.precision.salida(self.y)
+        t_redondeo = perf_counter()
+
+        self.tiempos["integracion"] = t_integracion - inicio
+        self.tiempos["colisiones"] = t_colisiones - t_integracion
+        self.tiempos["frontera"] = t_frontera - t_colisiones
+        self.tiempos["redondeo"] = t_redondeo - t_frontera
+
+        self.edad[:] += self.dt
+        self._eliminar_muertas()
+
+        self.pasos += 1
+        for observador in self.observadores:
+            observador(self)
+
+    def _eliminar_muertas(self):
+        """
+        Elimina las partículas que cumplieron su vida. Los huecos que quedan
+        entre las vivas se llenan con las últimas vivas, así las vivas siguen
+        ocupando las primeras filas. Las vistas `Particula` se mueven con su
+        fila y las de las muertas quedan sueltas con su último estado
+        """
+        muertas = np.flatnonzero(self.edad >= self.vida)
+        k = len(muertas)
+        if k == 0:
+            return
+
+        n = self.n - k
+        huecos = muertas[muertas < n]
+        cola = np.arange(n, self.n)
+        movidas = cola[self.edad[n:] < self.vida[n:]]
+
+        for i in muertas.tolist():
+            if self._vistas[i] is not None:
+                self._vistas[i]._desvincular()
+        for nombre in ("_y", "_F", "_m", "_e", "_color", "_edad", "_vida"):
+            arreglo = getattr(self, nombre)
+            arreglo[huecos] = arreglo[movidas]
+        for hueco, movida in zip(huecos.tolist(), movidas.tolist()):
+            vista = self._vistas[movida]
+            self._vistas[hueco] = vista
+            if vista is not None:
+                vista._vincular(self, hueco)
+
+        del self._vistas[n:]
+        self.n = n
+        self.muertas += k
+
+    def _integrar_adaptativo(self):
+        """
+        Avanza el sistema un `dt` completo con subpasos de Dormand-Prince 5(4).
+        Cada subpaso se acepta si el error local
+        escalado es menor a 1 y, con limites, si ninguna partícula atravesó
+        una pared más de `tolerancia_pared`. El tamaño del siguiente subpaso
+        se ajusta con el error, así el paso crece en vuelo libre, hasta
+        `h_max`, y se achica en los choques. La frontera se aplica después
+        de cada subpaso aceptado
+
+        El último subpaso se recorta al final del `dt`, así el estado
+        siempre corresponde al tiempo del paso. El tamaño propuesto se
+        conserva para el siguiente paso, que puede ser mayor que `dt`
+        """
+        buffers = self._scratch_adaptativo()
+        etapas, y_nuevo, error = buffers[:-2], buffers[-2], buffers[-1]
+        escala = etapas[0]
+
+        if self.limites is not None:
+            limites = np.asarray(self.limites, dtype=self.dtype).reshape(3, 2)
+            exceso = etapas[1][:, :3]
+
+        restante = self.dt
+        rechazo_previo = False
+        while restante > 0.0:
+            h = self.h
+            if self.limites is not None and self.tolerancia_pared is not None:
+                h = max(self.h_min, min(h, self._tiempo_a_pared(limites)))
+            # Margen relativo para no dejar un resto de redondeo como subpaso
+            recortado = h >= restante * (1.0 - 1e-9)
+            if recortado:
+                h = restante
+            Solvers.dormand_prince_lote(self._derivada_etapa, self.y, h, y_nuevo, etapas, error)
+
+            # Error escalado: |error| / (atol + rtol * max(|y|, |y_nuevo|))
+            np.abs(self.y, out=escala)
+            np.maximum(escala, np.abs(y_nuevo, out=etapas[1]), out=escala)
+            escala *= self.rtol
+            escala += self.atol
+            np.abs(error, out=error)
+            error /= escala
+            norma = float(error.max())
+
+            # Penetración en las paredes: el paso se acorta para resolver el choque
+            factor_pared = 1.0
+            if self.limites is not None and self.tolerancia_pared is not None:
+                pos = y_nuevo[:, :3]
+                np.subtract(limites[:, 0], pos, out=exceso)
+                penetracion = float(exceso.max())
+                np.subtract(pos, limites[:, 1], out=exceso)
+                penetracion = max(penetracion, float(exceso.max()))
+                if penetracion > self.tolerancia_pared:
+                    factor_pared = self.tolerancia_pared / penetracion
+
+            aceptado = (norma <= 1.0 and factor_pared == 1.0) or h <= self.h_min
+            if aceptado:
+                self.y[:] = y_nuevo
+                if self.limites is not None:
+                    self._frontera()
+                restante = 0.0 if recortado else restante - h
+                self.pasos_aceptados += 1
+            else:
+                self.pasos_rechazados += 1
+
+            # Controlador estándar de orden 5 con factor de seguridad
+            factor = 5.0 if norma == 0.0 else min(5.0, max(0.2, 0.9 * norma ** -0.2))
+            if factor_pared < 1.0:
+                factor = min(factor, 0.9 * factor_pared)
+            elif rechazo_previo:
+                # Tras un rechazo el paso no crece, evita oscilar entre rechazos
+                factor = min(factor, 1.0)
+            rechazo_previo = not aceptado
+            nuevo = h * factor
+            # Un subpaso recortado por el final del dt no achica el siguiente
+            if aceptado and recortado:
+                nuevo = max(nuevo, self.h)
+            self.h = min(self.h_max, max(self.h_min, nuevo))
+
+    def _tiempo_a_pared(self, limites:np.array) -> float:
+        """
+        Estima, con la velocidad actual, el tiempo que tarda la primera
+        partícula en atravesar una pared más de `tolerancia_pared`
+
+        Args:
+            - limites (np.array) : Limites (3, 2) con [min, max] por eje
+
+        Returns:
+            - float: Tiempo estimado, inf si ninguna partícula se acerca a una pared
+        """
+        pos = self.y[:, :3]
+        vel = self.y[:, 3:]
+        distancia = np.where(vel > 0.0, limites[:, 1] - pos, pos - limites[:, 0])
+        distancia += self.tolerancia_pared
+        rapidez = np.abs(vel)
+        tiempos = np.divide(distancia, rapidez, out=np.full_like(distancia, np.inf), where=rapidez > 0.0)
+        return float(tiempos.min())
+
+    def _colisiones(self):
+        """
+        Resuelve los contactos entre partículas con una rejilla uniforme
+        reconstruida en cada paso
+        """
+        self.contactos = colisiones(self.y, self.m, self.e, self.rng)
+
+    def _frontera(self, contados:bool=False):
+        """
+        Aplica la colisión con los limites del mundo a todas las partículas
+        en un solo paso vectorizado
+
+        Args:
+            - contados (bool) : Con el backend numba, si el paso ya contó los choques
+        """
+        if self.backend == "numba":
+            choques = Kernels.frontera(self.y, self.e, self.limites, self.rng, self._conteo[:self.n], contados)
+        elif self._dominios is not None:
+            _, choques = self._dominios.paso(self, "frontera", self.dt)
+        else:
+            choques = frontera(self.y, self.e, self.limites, self.rng)
+        self.choques_pared += choques
+
+    def save_checkpoint(self, ruta:str):
+        """
+        Guarda el estado del sistema en un punto de control: los arreglos de
+        las partículas, el tiempo, el solver, la configuración, el estado del
+        generador aleatorio, los campos y los emisores. Las vistas
+        `Particula` y los observadores no se guardan. Ver Checkpoint
+
+        Args:
+            - ruta (str) : Archivo de destino
+        """
+        Checkpoint.guardar(self, ruta)
+
+    @classmethod
+    def load_checkpoint(cls, ruta:str, backend:str="numpy") -> "System":
+        """
+        Carga un sistema guardado con `save_checkpoint`. Los arreglos se
+        mapean desde el archivo sin copiarlos, así cargar no depende del
+        número de partículas. La simulación sigue igual que si no se
+        hubiera detenido
+
+        Args:
+            - ruta (str) : Archivo del punto de control
+            - backend (str) : "numpy", "numba" o "auto", ver System
+
+        Returns:
+            - System: Sistema cargado, en un solo proceso
+        """
+        return Checkpoint.cargar(cls, ruta, backend)
+
+    def cerrar(self):
+        """
+        Detiene los procesos de trabajo y libera la memoria compartida. Solo
+        hace falta con procesos > 1, también se hace al destruir el sistema.
+        El estado se copia a memoria propia y el sistema sigue funcionando
+        en un solo proceso
         """
-        for particula in self.particulas:
-            particula.step(self.solver, self.limites, self.dt)
+        if self._dominios is None:
+            return
+        for nombre in (*COMPARTIDOS, "_indices"):
+            setattr(self, nombre, getattr(self, nombre).copy())
+        self._dominios.cerrar()
+        self._dominios = None
 
     def time_tic(self):
-        self.time += self.dt
\ No newline at end of file
+        self.time += self.dt
@@ -0,0 +1,164 @@
+import threading
+from time import perf_counter, sleep
+
+import numpy as np
+
+from ParticleSimulation.System import System
+from ParticleSimulation.Collisions import radio as radio_particula
+
+class Instantanea:
+    """
+    Copia de lo que Render necesita de un paso del sistema, en float32
+    """
+    def __init__(self, capacidad:int=0):
+        self.n = 0
+        self.paso = 0
+        self.tiempos = {}
+        self._reservar(capacidad)
+
+    def _reservar(self, capacidad:int):
+        self.capacidad = capacidad
+        self._posiciones = np.zeros((capacidad, 3), dtype=np.float32)
+        self._radios = np.zeros(capacidad, dtype=np.float32)
+        self._colores = np.zeros((capacidad, 3), dtype=np.float32)
+
+    def copiar(self, sistema:System):
+        """
+        Copia el estado actual del sistema en los arreglos de la instantánea
+        """
+        n = sistema.n
+        if n > self.capacidad:
+            self._reservar(max(n, 2 * self.capacidad))
+        self.n = n
+        self.paso = sistema.pasos
+        self.tiempos = dict(sistema.tiempos)
+        self._posiciones[:n] = sistema.y[:, :3]
+        self._radios[:n] = radio_particula(sistema.m)
+        self._colores[:n] = sistema.color
+
+    @property
+    def posiciones(self) -> np.array:
+        return self._posiciones[:self.n]
+
+    @property
+    def radios(self) -> np.array:
+        return self._radios[:self.n]
+
+    @property
+    def colores(self) -> np.array:
+        return self._colores[:self.n]
+
+class BufferTriple:
+    """
+    Intercambio de instantáneas entre el hilo de simulación y el de dibujo
+
+    Hay tres instantáneas: la que escribe la simulación, la última completa y
+    la que está leyendo Render. Publicar y tomar solo intercambian referencias
+    bajo un candado, así ningún lado espera a que el otro termine de copiar o
+    de dibujar
+
+    Contadores:
+        - publicadas : Instantáneas escritas por la simulación
+        - descartadas : Instantáneas reemplazadas antes de que Render las leyera
+        - repetidas : Cuadros en los que Render no tenía una instantánea nueva
+    """
+    def __init__(self):
+        self._escritura = Instantanea()
+        self._lista = Instantanea()
+        self._lectura = Instantanea()
+        self._nueva = False
+        self._candado = threading.Lock()
+
+        self.publicadas = 0
+        self.descartadas = 0
+        self.repetidas = 0
+
+    def publicar(self, sistema:System):
+        """
+        Copia el sistema y lo deja como la última instantánea completa.
+        Solo la llama el hilo de simulación
+        """
+        self._escritura.copiar(sistema)
+        with self._candado:
+            self._escritura, self._lista = self._lista, self._escritura
+            if self._nueva:
+                self.descartadas += 1
+            self._nueva = True
+            self.publicadas += 1
+
+    def tomar(self) -> Instantanea:
+        """
+        Última instantánea completa. Solo la llama el hilo de dibujo, la
+        instantánea no cambia hasta la siguiente llamada
+        """
+        with self._candado:
+            if self._nueva:
+                self._lectura, self._lista = self._lista, self._lectura
+                self._nueva = False
+            else:
+                self.repetidas += 1
+        return self._lectura
+
+class SimulacionEnHilo:
+    """
+    Avanza un System en un hilo propio y publica cada paso en un BufferTriple
+
+    Mientras el hilo corre el sistema no se debe tocar desde afuera, Render
+    lee solo las instantáneas. NumPy suelta el GIL en las operaciones sobre
+    arreglos grandes, así que la simulación y el dibujo se solapan
+    """
+    def __init__(self, sistema:System, fuerzas:np.ndarray|None=None, hz:float|None=None):
+        """
+        Args:
+            - sistema (System) : Sistema a simular
+            - fuerzas (np.array | None) : Fuerzas que se aplican en cada paso, ver
+                                          System.aplicar_fuerzas. Los campos del
+                                          sistema se aplican de todos modos
+            - hz (float | None) : Pasos por segundo de reloj. None simula tan rápido como se pueda
+        """
+        self.sistema = sistema
+        self.fuerzas = fuerzas
+        self.hz = hz
+        self.buffer = BufferTriple()
+        self.buffer.publicar(sistema)
+
+        self.pasos_por_segundo = 0.0
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="Simulacion", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def _bucle(self):
+        periodo = 0.0 if self.hz is None else 1.0 / self.hz
+        siguiente = perf_counter()
+        inicio_medida, pasos_medida = siguiente, 0
+
+        while not self._detener.is_set():
+            if self.fuerzas is not None:
+                self.sistema.aplicar_fuerzas(self.fuerzas)
+            self.sistema.aplicar_posiciones()
+            self.buffer.publicar(self.sistema)
+
+            ahora = perf_counter()
+            pasos_medida += 1
+            if ahora - inicio_medida >= 0.5:
+                self.pasos_por_segundo = pasos_medida / (ahora - inicio_medida)
+                inicio_medida, pasos_medida = ahora, 0
+
+            if periodo > 0.0:
+                siguiente += periodo
+                espera = siguiente - ahora
+                if espera > 0.0:
+                    sleep(espera)
+                else:
+                    # Atrasado: no se intenta recuperar los pasos perdidos
+                    siguiente = ahora
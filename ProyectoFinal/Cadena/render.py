@@ -4,7 +4,8 @@ from panda3d.core import NodePath, AmbientLight, DirectionalLight, Vec3, Vec4
 from panda3d.core import ClockObject, PerlinNoise2, LineSegs
 from direct.task import Task
 
-from Cadena.link import Link
+from ProyectoFinal.Cadena.link import Link
+from ParticleSimulation.Camera import planos_frustum, dentro_frustum, vista_proyeccion_panda
 
 class PandaRender(ShowBase):
     """
@@ -26,6 +27,10 @@ class PandaRender(ShowBase):
         # Dictionary to store line connections between objects
         # Estructura: {(obj, parent): (LineSegs, NodePath)}
         self.connection_lines = {}
+        # Radio de la esfera que envuelve cada modelo y visibilidad del último cuadro
+        self.radios = {}
+        self.visibles = {}
+        self.stats = {"visibles": 0, "ocultos": 0}
         
         # Set up camera
         self.camera.setPos(0, -20, 10)
@@ -80,6 +85,14 @@ class PandaRender(ShowBase):
         
         # Store reference
         self.tracked_objects[obj] = model
+        # Esfera que envuelve el modelo, respecto a su origen y ya escalada
+        limites = model.getBounds()
+        if limites.isEmpty():
+            self.radios[obj] = scale
+        else:
+            centro = limites.getCenter()
+            self.radios[obj] = scale * (np.linalg.norm([centro[0], centro[1], centro[2]]) + limites.getRadius())
+        self.visibles[obj] = True
         
         # Create connection line if object has a parent1
         if hasattr(obj, 'parent1') and obj.parent1 is not None:
@@ -142,6 +155,8 @@ class PandaRender(ShowBase):
         if obj in self.tracked_objects:
             self.tracked_objects[obj].removeNode()
             del self.tracked_objects[obj]
+            del self.radios[obj]
+            del self.visibles[obj]
         
         # Remove all connection lines associated with this object
         keys_to_remove = [key for key in self.connection_lines if obj in key]
@@ -151,20 +166,51 @@ class PandaRender(ShowBase):
             del self.connection_lines[key]
     
     def update_objects(self, task):
-        """Update all tracked objects' positions (called every frame)"""
-        for obj, model in self.tracked_objects.items():
-            # Update position based on object's current xyz attributes
-            model.setPos(obj.x[0], obj.x[1], obj.x[2])
-            
+        """
+        Update all tracked objects' positions (called every frame)
+
+        Los objetos fuera del volumen de visión se ocultan y no se
+        actualizan, igual que las líneas cuyos dos extremos están ocultos
+        """
+        if not self.tracked_objects:
+            return Task.cont
+
+        objetos = list(self.tracked_objects)
+        posiciones = np.array([obj.x[:3] for obj in objetos], dtype=float)
+        radios = np.array([self.radios[obj] for obj in objetos])
+        mascara = dentro_frustum(planos_frustum(vista_proyeccion_panda(self)), posiciones, radios)
+        self.stats["visibles"] = int(np.count_nonzero(mascara))
+        self.stats["ocultos"] = len(objetos) - self.stats["visibles"]
+
+        for obj, visible, (x, y, z) in zip(objetos, mascara.tolist(), posiciones.tolist()):
+            model = self.tracked_objects[obj]
+            if visible != self.visibles[obj]:
+                if visible:
+                    model.show()
+                else:
+                    model.hide()
+                self.visibles[obj] = visible
+            if visible:
+                # Update position based on object's current xyz attributes
+                model.setPos(x, y, z)
+
+        for obj in objetos:
             # Update connection line if object has parent1
             if hasattr(obj, 'parent1') and obj.parent1 is not None:
-                self._update_connection_line(obj, obj.parent1)
+                self._actualizar_linea_visible(obj, obj.parent1)
 
             # Update connection line if object has parent2
             if hasattr(obj, 'parent2') and obj.parent2 is not None:
-                self._update_connection_line(obj, obj.parent2)
+                self._actualizar_linea_visible(obj, obj.parent2)
             
         return Task.cont
+
+    def _actualizar_linea_visible(self, obj:Link, parent:Link):
+        """Rehace la línea si alguno de sus extremos se ve, si no la oculta"""
+        if self.visibles.get(obj, False) or self.visibles.get(parent, False):
+            self._update_connection_line(obj, parent)
+        elif (obj, parent) in self.connection_lines:
+            self.connection_lines[(obj, parent)][1].hide()
     
     def setup_camera(self):
         """Configure camera position and orientation."""
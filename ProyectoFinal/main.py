@@ -1,8 +1,10 @@
 import numpy as np
+from pathlib import Path
 
-from Cadena.link import Link
-from Cadena.render import PandaRender
+from ProyectoFinal.Cadena.link import Link
+from ProyectoFinal.Cadena.render import PandaRender
 from direct.task import Task
+from panda3d.core import Filename
 
 # Constantes
 dt = 0.01
@@ -24,7 +26,8 @@ renderer = PandaRender()
 renderer.setup_camera_controls()
 
 # Add objects to renderer with different colors
-MODELS_PATH:str = "./3dModels/"
+# Relativa a este archivo, se ejecuta desde la raíz del repositorio con python -m ProyectoFinal.main
+MODELS_PATH:str = Filename.fromOsSpecific(str(Path(__file__).resolve().parent / "3dModels")).getFullpath() + "/"
 
 renderer.add_object(linkPin1, color=(0, 1, 0, 1), model_path=MODELS_PATH + "sphere.glb", scale=0.4)
 renderer.add_object(linkPin2, color=(0, 1, 0, 1), model_path=MODELS_PATH + "sphere.glb", scale=0.4)
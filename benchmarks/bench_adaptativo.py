@@ -0,0 +1,98 @@
+"""
+Verificación del solver adaptativo (System con Solvers.dormand_prince)
+
+Una partícula pasa cerca de un Atractor con núcleo pequeño, donde la fuerza
+cambia mucho en un dt. Para cada rtol se integra la misma órbita y se compara
+con una referencia de Runge-Kutta 4 con paso fijo muy pequeño. Al bajar rtol
+el resultado debe cambiar, el controlador debe rechazar subpasos y el error
+debe bajar; si no, el script termina con error
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_adaptativo
+    python -m benchmarks.bench_adaptativo --rtol 1e-3 1e-6 1e-9 --dt 0.5 --pasos 20
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from ParticleSimulation.Forces import Atractor
+from ParticleSimulation.Solvers import Solvers
+from ParticleSimulation.System import System
+
+X0 = [100.0, 0.0, 0.0]
+V0 = [0.0, 20.0, 0.0]
+
+def atractor() -> Atractor:
+    return Atractor([0.0, 0.0, 0.0], 1e6, suavizado=10.0)
+
+def referencia(tiempo:float, dt:float) -> np.array:
+    """
+    Estado de la partícula en `tiempo` con Runge-Kutta 4 de paso fijo,
+    evaluando el campo en cada etapa
+
+    Returns:
+        - np.array: Estado (6,)
+    """
+    campo = atractor()
+    m = np.ones(1)
+    def derivada(y):
+        F = np.zeros((1, 3))
+        campo.aplicar(y, m, F)
+        return np.concatenate((y[:, 3:], F / m[:, None]), axis=1)
+
+    pasos = max(1, round(tiempo / dt))
+    y = np.array([X0 + V0])
+    for _ in range(pasos):
+        y = Solvers.runge_kutta_4(derivada, y, tiempo / pasos)
+    return y[0]
+
+def correr(rtol:float, atol:float, dt:float, pasos:int) -> dict:
+    sistema = System(Solvers.dormand_prince, dt, rtol=rtol, atol=atol)
+    sistema.agregar_particulas(X0, V0, 1.0)
+    sistema.agregar_campo(atractor())
+    for _ in range(pasos):
+        sistema.aplicar_posiciones()
+    return {
+        "rtol": rtol,
+        "estado": sistema.y[0].copy(),
+        "aceptados": sistema.pasos_aceptados,
+        "rechazados": sistema.pasos_rechazados,
+    }
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Verificación del solver adaptativo")
+    parser.add_argument("--rtol", type=float, nargs="+", default=[1e-3, 1e-6, 1e-9])
+    parser.add_argument("--atol", type=float, default=1e-6)
+    parser.add_argument("--dt", type=float, default=0.5)
+    parser.add_argument("--pasos", type=int, default=20)
+    parser.add_argument("--dt-referencia", type=float, default=1e-4)
+    return parser.parse_args()
+
+def main():
+    args = _argumentos()
+    corridas = [correr(rtol, args.atol, args.dt, args.pasos) for rtol in sorted(args.rtol, reverse=True)]
+
+    print(f"{'rtol':>8} {'aceptados':>9} {'rechazados':>10} {'x':>12} {'y':>12} {'error':>10}")
+    for corrida in corridas:
+        esperado = referencia(args.dt * args.pasos, args.dt_referencia)
+        corrida["error"] = float(np.linalg.norm(corrida["estado"][:3] - esperado[:3]))
+        x, y = corrida["estado"][:2]
+        print(f"{corrida['rtol']:>8.0e} {corrida['aceptados']:>9} {corrida['rechazados']:>10} "
+              f"{x:>12.4f} {y:>12.4f} {corrida['error']:>10.2e}")
+
+    fallas = []
+    for floja, estricta in zip(corridas, corridas[1:]):
+        if np.array_equal(floja["estado"], estricta["estado"]):
+            fallas.append(f"rtol {floja['rtol']:g} y {estricta['rtol']:g} dan el mismo resultado")
+        if estricta["error"] >= floja["error"]:
+            fallas.append(f"el error no baja de rtol {floja['rtol']:g} a {estricta['rtol']:g}")
+    if not any(corrida["rechazados"] for corrida in corridas):
+        fallas.append("el controlador no rechazó ningún subpaso")
+
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    sys.exit(1 if fallas else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de la gravitación mutua: Barnes-Hut contra suma directa
+
+Para cada cantidad de partículas y ángulo de apertura mide el tiempo de
+calcular las aceleraciones y el error relativo de Barnes-Hut respecto a la
+suma directa. La suma directa es O(N^2), por encima de --max-directa solo se
+mide Barnes-Hut
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_barnes_hut
+    python -m benchmarks.bench_barnes_hut --particulas 1000 10000 --theta 0.3 0.5 0.8
+"""
+import argparse
+import json
+from time import perf_counter
+
+import numpy as np
+
+from ParticleSimulation.BarnesHut import aceleraciones_barnes_hut, aceleraciones_directas
+from benchmarks.bench_particulas import _entorno
+
+def distribucion(n:int, semilla:int) -> tuple:
+    """
+    Nube de Plummer aproximada: un núcleo denso y un halo, como un cúmulo,
+    con masas entre 1 y 1000 como en las escenas de ejemplo
+
+    Returns:
+        - (np.array, np.array): Posiciones (N, 3) y masas (N,)
+    """
+    rng = np.random.default_rng(semilla)
+    radio = 100.0 / np.sqrt(rng.uniform(0.01, 1.0, n) ** (-2.0 / 3.0) - 1.0 + 1e-9)
+    direccion = rng.normal(size=(n, 3))
+    direccion /= np.linalg.norm(direccion, axis=1, keepdims=True)
+    return np.minimum(radio, 5000.0)[:, None] * direccion, rng.integers(1, 1001, n).astype(np.float64)
+
+def cronometrar(funcion, repeticiones:int):
+    """
+    Mejor tiempo de `repeticiones` llamadas y el resultado de la última
+    """
+    mejor = np.inf
+    for _ in range(repeticiones):
+        inicio = perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, perf_counter() - inicio)
+    return mejor, resultado
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark de Barnes-Hut")
+    parser.add_argument("--particulas", type=int, nargs="+", default=[1000, 3000, 10000, 30000])
+    parser.add_argument("--theta", type=float, nargs="+", default=[0.3, 0.5, 0.7, 1.0])
+    parser.add_argument("--suavizado", type=float, default=1.0)
+    parser.add_argument("--max-directa", type=int, default=10000,
+                        help="N máximo con el que se calcula la suma directa")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="bench_barnes_hut.json")
+    return parser.parse_args()
+
+def main():
+    args = _argumentos()
+    resultados = []
+
+    print(f"{'N':>8} {'theta':>6} {'directa ms':>11} {'BH ms':>10} {'aceleracion':>11} "
+          f"{'err mediana':>12} {'err p99':>10} {'err max':>10}")
+    for n in args.particulas:
+        pos, m = distribucion(n, args.semilla)
+        directa = None
+        t_directa = None
+        if n <= args.max_directa:
+            t_directa, directa = cronometrar(
+                lambda: aceleraciones_directas(pos, m, suavizado=args.suavizado), args.repeticiones)
+            norma = np.linalg.norm(directa, axis=1)
+
+        for theta in args.theta:
+            t_bh, bh = cronometrar(
+                lambda: aceleraciones_barnes_hut(pos, m, theta=theta, suavizado=args.suavizado),
+                args.repeticiones)
+            fila = {"particulas": n, "theta": theta, "barnes_hut_s": t_bh, "directa_s": t_directa}
+            if directa is not None:
+                error = np.linalg.norm(bh - directa, axis=1) / norma
+                fila.update({
+                    "aceleracion": t_directa / t_bh,
+                    "error_mediana": float(np.median(error)),
+                    "error_p99": float(np.percentile(error, 99)),
+                    "error_max": float(error.max()),
+                })
+            resultados.append(fila)
+
+            if directa is not None:
+                print(f"{n:>8} {theta:>6.2f} {1e3 * t_directa:>11.1f} {1e3 * t_bh:>10.1f} "
+                      f"{fila['aceleracion']:>10.2f}x {fila['error_mediana']:>12.2e} "
+                      f"{fila['error_p99']:>10.2e} {fila['error_max']:>10.2e}")
+            else:
+                print(f"{n:>8} {theta:>6.2f} {'-':>11} {1e3 * t_bh:>10.1f}")
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump({"entorno": _entorno(), "resultados": resultados}, archivo, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Barrido de parámetros de las escenas: escena, solver, dt, partículas y semilla
+
+Cada combinación se simula sin ventana en un proceso de un ProcessPoolExecutor
+con todos los núcleos, durante el mismo tiempo simulado. De cada corrida se
+reporta el rendimiento, la deriva de la energía mecánica y los choques contra
+las paredes, y todo se guarda en una tabla CSV
+
+La semilla de cada corrida es la de la rejilla: corridas con la misma semilla
+parten de las mismas condiciones iniciales, así los solvers y los dt se
+comparan sobre la misma escena, y corridas con semillas distintas son
+independientes. Las paredes (choques inelásticos y sus impulsos aleatorios)
+también cambian la energía, la deriva hay que leerla junto a choques_pared
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_barrido
+    python -m benchmarks.bench_barrido --solvers euler verlet --dt 0.01 0.005 --semillas 0 1 2
+"""
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from time import perf_counter
+
+import numpy as np
+
+from ParticleSimulation.Forces import Gravedad
+from ParticleSimulation.Scenes import ESCENAS, LIMITES, crear_sistema
+from ParticleSimulation.System import System
+from benchmarks.bench_particulas import SOLVERS
+
+COLUMNAS = (
+    "escena", "solver", "dt", "particulas", "semilla", "n", "pasos", "segundos",
+    "particulas_paso_por_s", "energia_inicial", "energia_final", "deriva_relativa",
+    "deriva_maxima", "choques_pared", "fuera_limites",
+)
+
+def energia(sistema:System) -> float:
+    """
+    Energía mecánica del sistema: cinética más la potencial de los campos
+    Gravedad (U = -m g·x). Los demás campos no entran en la cuenta
+    """
+    m = sistema.m.astype(np.float64)
+    y = sistema.y.astype(np.float64)
+    total = 0.5 * float(m @ np.einsum("ij,ij->i", y[:, 3:], y[:, 3:]))
+    for campo in sistema.campos:
+        if isinstance(campo, Gravedad):
+            total -= float(m @ (y[:, :3] @ campo.g))
+    return total
+
+def fuera_limites(sistema:System) -> int:
+    """
+    Partículas fuera de la caja al final de la corrida, debería ser cero
+    """
+    if sistema.limites is None:
+        return 0
+    limites = np.asarray(sistema.limites, dtype=np.float64).reshape(3, 2)
+    pos = sistema.y[:, :3]
+    return int(np.count_nonzero(np.any((pos < limites[:, 0]) | (pos > limites[:, 1]), axis=1)))
+
+def correr(escena:int, solver:str, dt:float, particulas:float, semilla:int, tiempo:float, cada:int) -> dict:
+    """
+    Una corrida del barrido. Se ejecuta en un proceso del pool
+
+    Args:
+        - escena (int) : Número de la escena
+        - solver (str) : Nombre del método en SOLVERS
+        - dt (float) : Delta de tiempo
+        - particulas (float) : Multiplicador de partículas, 1.0 son 1000
+        - semilla (int) : Semilla de la escena y del sistema
+        - tiempo (float) : Tiempo simulado, los pasos son tiempo / dt
+        - cada (int) : La energía se mide cada `cada` pasos para la deriva máxima
+
+    Returns:
+        - dict: Una fila de la tabla, con las llaves de COLUMNAS
+    """
+    # Sin el paso inicial la energía inicial es la misma para todos los solvers y dt
+    sistema = crear_sistema(escena, SOLVERS[solver], dt, particulas, semilla, paso_inicial=False)
+    pasos = max(1, round(tiempo / dt))
+    inicial = energia(sistema)
+    escala = abs(inicial) if inicial != 0.0 else 1.0
+
+    deriva_maxima = 0.0
+    segundos = 0.0
+    for paso in range(1, pasos + 1):
+        inicio = perf_counter()
+        sistema.aplicar_posiciones()
+        segundos += perf_counter() - inicio
+        if paso % cada == 0 or paso == pasos:
+            deriva_maxima = max(deriva_maxima, abs(energia(sistema) - inicial) / escala)
+
+    final = energia(sistema)
+    return {
+        "escena": escena,
+        "solver": solver,
+        "dt": dt,
+        "particulas": particulas,
+        "semilla": semilla,
+        "n": sistema.n,
+        "pasos": pasos,
+        "segundos": segundos,
+        "particulas_paso_por_s": sistema.n * pasos / segundos,
+        "energia_inicial": inicial,
+        "energia_final": final,
+        "deriva_relativa": (final - inicial) / escala,
+        "deriva_maxima": deriva_maxima,
+        "choques_pared": sistema.choques_pared,
+        "fuera_limites": fuera_limites(sistema),
+    }
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Barrido de escenas, solvers y dt")
+    parser.add_argument("--escenas", type=int, nargs="+", choices=list(ESCENAS), default=[1])
+    parser.add_argument("--solvers", nargs="+", choices=list(SOLVERS),
+                        default=["euler", "runge_kutta_4", "verlet"])
+    parser.add_argument("--dt", type=float, nargs="+", default=[0.02, 0.01, 0.005])
+    parser.add_argument("--particulas", type=float, nargs="+", default=[1.0],
+                        help="Multiplicadores de partículas, 1.0 son 1000")
+    parser.add_argument("--semillas", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--tiempo", type=float, default=2.0, help="Tiempo simulado por corrida")
+    parser.add_argument("--cada", type=int, default=10,
+                        help="Pasos entre mediciones de energía para la deriva máxima")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("--salida", default="bench_barrido.csv")
+    return parser.parse_args()
+
+def main():
+    args = _argumentos()
+    rejilla = list(itertools.product(args.escenas, args.solvers, args.dt, args.particulas, args.semillas))
+    print(f"{len(rejilla)} corridas en {args.procesos} procesos, limites {LIMITES}\n")
+    print(f"{'escena':>6} {'solver':>14} {'dt':>8} {'N':>7} {'semilla':>7} {'part-paso/s':>12} "
+          f"{'deriva':>10} {'deriva max':>10} {'choques':>9} {'fuera':>6}")
+
+    filas = []
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        futuros = [pool.submit(correr, *configuracion, args.tiempo, args.cada) for configuracion in rejilla]
+        for futuro in as_completed(futuros):
+            fila = futuro.result()
+            filas.append(fila)
+            print(f"{fila['escena']:>6} {fila['solver']:>14} {fila['dt']:>8g} {fila['n']:>7} "
+                  f"{fila['semilla']:>7} {fila['particulas_paso_por_s']:>12.3e} "
+                  f"{fila['deriva_relativa']:>10.2e} {fila['deriva_maxima']:>10.2e} "
+                  f"{fila['choques_pared']:>9} {fila['fuera_limites']:>6}")
+
+    filas.sort(key=lambda f: tuple(f[c] for c in ("escena", "solver", "dt", "particulas", "semilla")))
+    with open(args.salida, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS)
+        escritor.writeheader()
+        escritor.writerows(filas)
+    print(f"\nResultados guardados en {args.salida}")
+
+if __name__ == "__main__":
+    main()
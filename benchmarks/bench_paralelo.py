@@ -0,0 +1,130 @@
+"""
+Benchmark de la descomposición en franjas (System con procesos > 1)
+
+Para cada cantidad de partículas mide los ms por paso con 1, 2, 4, ...
+procesos hasta el número de núcleos, y reporta la aceleración respecto a un
+proceso y la eficiencia de escalamiento (aceleración / procesos). La
+referencia de un proceso se mide siempre, aunque no esté en --procesos
+
+Antes de medir se verifica que las franjas vacías (menos partículas que
+procesos) y las degeneradas (todas las partículas con la misma x, como en
+las escenas de main.py) avanzan igual que un solo proceso
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_paralelo
+    python -m benchmarks.bench_paralelo --particulas 100000 1000000 --procesos 1 2 4 8
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from ParticleSimulation.Solvers import Solvers
+from ParticleSimulation.System import System
+from benchmarks.bench_particulas import SOLVERS, _entorno, construir, medir
+
+def _procesos_por_defecto() -> list:
+    nucleos = os.cpu_count() or 1
+    procesos = [1]
+    while procesos[-1] * 2 <= nucleos:
+        procesos.append(procesos[-1] * 2)
+    if procesos[-1] != nucleos:
+        procesos.append(nucleos)
+    return procesos
+
+def _misma_x(n:int, procesos:int, pasos:int=5) -> np.array:
+    """
+    Estado después de `pasos` pasos de `n` partículas que salen de x = -900,
+    sin limites para que el resultado no dependa de los impulsos de cada proceso
+    """
+    sistema = System(Solvers.verlet, 0.01, semilla=0, procesos=procesos)
+    velocidades = np.random.default_rng(0).normal(size=(n, 3))
+    sistema.agregar_particulas(np.tile([-900.0, 0.0, 0.0], (n, 1)), velocidades, 1.0)
+    try:
+        for _ in range(pasos):
+            sistema.aplicar_fuerzas([0.0, -980.0, 0.0])
+            sistema.aplicar_posiciones()
+        if sistema._dominios is not None and n >= procesos and sistema._dominios.conteos.max() > -(-n // procesos) + 1:
+            raise AssertionError(f"franjas desbalanceadas {sistema._dominios.conteos}")
+        return sistema.y.copy()
+    finally:
+        sistema.cerrar()
+
+def verificar(procesos:int) -> list:
+    """
+    Franjas vacías y degeneradas contra un solo proceso
+
+    Returns:
+        - list: Descripción de cada falla
+    """
+    fallas = []
+    for n in (1, procesos - 1, 10 * procesos):
+        if n < 1:
+            continue
+        try:
+            if not np.array_equal(_misma_x(n, 1), _misma_x(n, procesos)):
+                fallas.append(f"{n} partículas con la misma x en {procesos} procesos no dan lo mismo que uno")
+        except Exception as error:
+            fallas.append(f"{n} partículas con la misma x en {procesos} procesos: {error!r}")
+    return fallas
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark de System en varios procesos")
+    parser.add_argument("--particulas", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--procesos", type=int, nargs="+", default=_procesos_por_defecto())
+    parser.add_argument("--solver", choices=[s for s in SOLVERS if s != "dormand_prince"],
+                        default="runge_kutta_4")
+    parser.add_argument("--dt", type=float, default=0.01)
+    parser.add_argument("--pasos", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="bench_paralelo.json")
+    return parser.parse_args()
+
+def main():
+    args = _argumentos()
+    resultados = []
+    procesos_medidos = [1] + [procesos for procesos in args.procesos if procesos != 1]
+
+    fallas = verificar(max(2, *args.procesos))
+    for falla in fallas:
+        print(f"FALLA: {falla}")
+    if fallas:
+        sys.exit(1)
+
+    print(f"{'N':>9} {'procesos':>8} {'ms/paso':>9} {'integracion':>11} "
+          f"{'aceleracion':>11} {'eficiencia':>10} {'traspasos/paso':>14}")
+    for n in args.particulas:
+        base = None
+        for procesos in procesos_medidos:
+            sistema = construir(n, SOLVERS[args.solver], args.dt, True, args.semilla, procesos=procesos)
+            try:
+                medida = medir(sistema, args.pasos)
+                traspasos = 0 if sistema._dominios is None else sistema._dominios.traspasos
+            finally:
+                sistema.cerrar()
+
+            if procesos == 1:
+                base = medida["ms_por_paso"]
+            aceleracion = base / medida["ms_por_paso"]
+            fila = {
+                "particulas": n,
+                "procesos": procesos,
+                "solver": args.solver,
+                "aceleracion": aceleracion,
+                "eficiencia": aceleracion / procesos,
+                "traspasos_por_paso": traspasos / (args.pasos + 2),
+                **medida,
+            }
+            resultados.append(fila)
+            print(f"{n:>9} {procesos:>8} {medida['ms_por_paso']:>9.2f} "
+                  f"{medida['fases_ms']['integracion']:>11.2f} {aceleracion:>10.2f}x "
+                  f"{fila['eficiencia']:>10.0%} {fila['traspasos_por_paso']:>14.1f}")
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump({"entorno": _entorno(), "resultados": resultados}, archivo, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+if __name__ == "__main__":
+    main()
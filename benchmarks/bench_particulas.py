@@ -0,0 +1,212 @@
+"""
+Benchmark de ParticleSimulation.System
+
+Recorre cantidades de partículas, métodos numéricos y frontera activada o no,
+mide el tiempo de cada fase del paso y la memoria, y guarda los resultados en
+un archivo JSON para comparar corridas. No necesita pantalla ni OpenGL.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_particulas
+    python -m benchmarks.bench_particulas --particulas 1000 10000 --salida bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+from ParticleSimulation.Forces import Gravedad
+from ParticleSimulation.Scenes import GRAVEDAD
+from ParticleSimulation.Solvers import Solvers
+from ParticleSimulation.System import System
+from ParticleSimulation.Precision import Precision
+
+LIMITES = [-1000, 1000, -1000, 1000, -1000, 1000]
+
+SOLVERS = {
+    "euler": Solvers.euler,
+    "runge_kutta_4": Solvers.runge_kutta_4,
+    "verlet": Solvers.verlet,
+    "dormand_prince": Solvers.dormand_prince,
+}
+
+def construir(
+        n:int,
+        solver:callable,
+        dt:float,
+        con_frontera:bool,
+        semilla:int,
+        precision:str="ninguna",
+        dtype:str="float64",
+        procesos:int=1,
+        backend:str="numpy"
+        ) -> System:
+    """
+    Sistema con `n` partículas distribuidas al azar dentro de la caja, con
+    la misma gravedad que las escenas
+
+    Args:
+        - n (int) : Número de partículas
+        - solver (function) : Método numérico de Solvers
+        - dt (float) : Delta de tiempo
+        - con_frontera (bool) : Si el sistema tiene limites
+        - semilla (int) : Semilla del generador aleatorio
+        - precision (str) : Política de redondeo, ver Precision
+        - dtype (str) : Tipo de dato del estado
+        - procesos (int) : Procesos que integran el sistema
+        - backend (str) : "numpy", "numba" o "auto", ver System
+
+    Returns:
+        - System: Sistema listo para medir
+    """
+    sistema = System(solver, dt, LIMITES if con_frontera else None, semilla=semilla,
+                     precision=precision, dtype=dtype, procesos=procesos,
+                     backend=backend)
+    sistema.agregar_campo(Gravedad(GRAVEDAD))
+    rng = sistema.rng
+    sistema.agregar_particulas(
+        rng.uniform(-1000, 1000, (n, 3)),
+        rng.uniform(-400, 400, (n, 3)),
+        rng.integers(1, 1001, n),
+        rng.uniform(0.5, 1.0, n),
+        rng.random((n, 3)),
+    )
+    return sistema
+
+def medir(sistema:System, pasos:int) -> dict:
+    """
+    Mide `pasos` pasos del sistema. Primero hace un paso de calentamiento
+    para que los buffers ya estén reservados
+
+    Args:
+        - sistema (System) : Sistema a medir
+        - pasos (int) : Número de pasos medidos
+
+    Returns:
+        - dict: Tiempos totales y por fase (ms por paso) y memoria (bytes)
+    """
+    sistema.aplicar_posiciones()
+
+    fases = dict.fromkeys(sistema.tiempos, 0.0)
+    inicio = perf_counter()
+    for _ in range(pasos):
+        sistema.aplicar_posiciones()
+        for fase, tiempo in sistema.tiempos.items():
+            fases[fase] += tiempo
+    total = perf_counter() - inicio
+
+    # Memoria temporal de un paso, medida aparte para no afectar los tiempos
+    tracemalloc.start()
+    sistema.aplicar_posiciones()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "pasos": pasos,
+        "tiempo_total_s": total,
+        "ms_por_paso": 1e3 * total / pasos,
+        "pasos_por_s": pasos / total,
+        "particulas_paso_por_s": sistema.n * pasos / total,
+        "fases_ms": {fase: 1e3 * tiempo / pasos for fase, tiempo in fases.items()},
+        "memoria_estado_bytes": sistema.nbytes,
+        "memoria_pico_paso_bytes": pico,
+        "subpasos_aceptados": sistema.pasos_aceptados,
+        "subpasos_rechazados": sistema.pasos_rechazados,
+    }
+
+def _entorno() -> dict:
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "procesador": platform.processor(),
+        "nucleos": os.cpu_count(),
+    }
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Benchmark de ParticleSimulation")
+    parser.add_argument("--particulas", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--solvers", nargs="+", choices=list(SOLVERS), default=list(SOLVERS))
+    parser.add_argument("--frontera", nargs="+", choices=["si", "no"], default=["si", "no"])
+    parser.add_argument("--dtype", nargs="+", choices=["float64", "float32"], default=["float64", "float32"])
+    parser.add_argument("--dt", type=float, default=0.01)
+    parser.add_argument("--presupuesto", type=float, default=2e7,
+                        help="Partículas-paso medidas por configuración")
+    parser.add_argument("--pasos-min", type=int, default=3)
+    parser.add_argument("--precision", choices=Precision.MODOS, default="ninguna")
+    parser.add_argument("--backend", choices=["numpy", "numba", "auto"], default="numpy",
+                        help="Con auto, los solvers sin núcleo compilado usan numpy")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default="bench_particulas.json")
+    return parser.parse_args()
+
+def comparar_dtype(resultados:list) -> list:
+    """
+    Compara cada configuración en float32 contra la misma en float64
+
+    Args:
+        - resultados (list) : Resultados de `medir` con su configuración
+
+    Returns:
+        - list: Memoria ahorrada y aumento de pasos/s por configuración
+    """
+    def llave(r):
+        return (r["particulas"], r["solver"], r["frontera"])
+
+    base = {llave(r): r for r in resultados if r["dtype"] == "float64"}
+    comparacion = []
+    for r in resultados:
+        r64 = base.get(llave(r))
+        if r["dtype"] != "float32" or r64 is None:
+            continue
+        comparacion.append({
+            "particulas": r["particulas"],
+            "solver": r["solver"],
+            "frontera": r["frontera"],
+            "memoria_ahorrada_bytes": r64["memoria_estado_bytes"] - r["memoria_estado_bytes"],
+            "memoria_relativa": r["memoria_estado_bytes"] / r64["memoria_estado_bytes"],
+            "aceleracion_pasos_por_s": r["pasos_por_s"] / r64["pasos_por_s"],
+        })
+    return comparacion
+
+def main():
+    args = _argumentos()
+    resultados = []
+
+    print(f"{'N':>9} {'solver':>14} {'frontera':>8} {'dtype':>8} {'ms/paso':>10} {'part-paso/s':>12}  fases (ms)")
+    for n in args.particulas:
+        for nombre in args.solvers:
+            for frontera in args.frontera:
+                for dtype in args.dtype:
+                    sistema = construir(n, SOLVERS[nombre], args.dt, frontera == "si", args.semilla,
+                                        args.precision, dtype, backend=args.backend)
+                    pasos = max(args.pasos_min, int(args.presupuesto // n))
+                    medida = medir(sistema, pasos)
+                    resultados.append({"particulas": n, "solver": nombre, "frontera": frontera == "si",
+                                       "dtype": dtype, "precision": args.precision,
+                                       "backend": sistema.backend, **medida})
+
+                    fases = " ".join(f"{f}={t:.2f}" for f, t in medida["fases_ms"].items())
+                    print(f"{n:>9} {nombre:>14} {frontera:>8} {dtype:>8} {medida['ms_por_paso']:>10.3f} "
+                          f"{medida['particulas_paso_por_s']:>12.3e}  {fases}")
+
+    comparacion = comparar_dtype(resultados)
+    if comparacion:
+        print(f"\n{'N':>9} {'solver':>14} {'frontera':>8} {'memoria ahorrada':>18} {'pasos/s f32/f64':>16}")
+        for c in comparacion:
+            frontera = "si" if c["frontera"] else "no"
+            print(f"{c['particulas']:>9} {c['solver']:>14} {frontera:>8} "
+                  f"{c['memoria_ahorrada_bytes'] / 2**20:>15.2f} MB {c['aceleracion_pasos_por_s']:>15.2f}x")
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump({"entorno": _entorno(), "resultados": resultados, "comparacion_dtype": comparacion},
+                  archivo, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
+import argparse
 import numpy as np
-from random import randint as rng
-from random import random as rngf
+from time import perf_counter, sleep
 
 from ParticleSimulation.Particle import Particula
 from ParticleSimulation.Solvers import Solvers
 from ParticleSimulation.System import System
-from ParticleSimulation.Render import Render
+from ParticleSimulation.Precision import Precision
+from ParticleSimulation.Scenes import crear_sistema
+from ParticleSimulation.Recorder import Grabador
+from ParticleSimulation.Threaded import SimulacionEnHilo
+from ParticleSimulation.Rasterizer import ExportadorCuadros
 
 from Terminal import print_wasd, print_banner
 
@@ -17,6 +21,8 @@ def auxSelectMetodo(n):
             return Solvers.runge_kutta_4
         case 3:
             return Solvers.verlet
+        case 4:
+            return Solvers.dormand_prince
 
 def simpleSimulation():
     END = 10.0
@@ -35,224 +41,173 @@ def simpleSimulation():
         print(test)
         time += h
 
-def newSimulation_1(n:int, delta:float, nParticles:float):
-    METODO = auxSelectMetodo(n)
-    DT = delta
-
-    limites = [-1000, 1000, -1000, 1000, -1000, 1000]
-    gravedad = [0.0, -98000, 0.0]
-
-    sistema = System(METODO, DT, limites)
-    
-    x0 = np.array([20, 0, 20])
-
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([rng(0,400), rng(0,200), 0])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [0.0, color_val, 0.0]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-    
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([-rng(0,400), rng(0,200), 0])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val, 0.0, 0.0]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([0.0, rng(0,200), rng(0,100)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val, color_val, color_val]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-        
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([0.0, rng(0,200), -rng(0,100)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val*0.3, color_val*0.3, color_val]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-
-    sistema.aplicar_posiciones()
-    
-    render = Render(sistema, ancho=800, alto=600)
-    render.inicializar()
-
-    # Bucle principal controlado manualmente
-    while True:
-        #print(sistema.time)
-        #sistema.time_tic()
-
-        # Aplica fuerzas y actualiza el sistema
-        fuerzas = np.array([gravedad])  # gravedad
-        sistema.aplicar_fuerzas(fuerzas)
-        sistema.aplicar_posiciones()
-        
-        # Actualiza la visualización
-        render.actualizar_frame()
-
-def newSimulation_2(n:int, delta:float, nParticles:float):
-    METODO = auxSelectMetodo(n)
-    DT = delta
-
-    limites = [-1000, 1000, -1000, 1000, -1000, 1000]
-    gravedad = [0.0, -98000, 0.0]
-
-    sistema = System(METODO, DT, limites)
-    
-    x0 = np.array([20, 0, 20])
-
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([rng(0,200), rng(0,200), rng(0,200)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [0.0, color_val, 0.0]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-    
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([-rng(0,100), rng(0,200), rng(0,100)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val, 0.0, 0.0]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([-rng(0,200), rng(0,200), rng(0,200)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val, color_val, color_val]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-        
-    for _ in range(int(np.round(250 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        v0 = np.array([rng(0,100), rng(0,200), -rng(0,100)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val*0.3, color_val*0.3, color_val]
-
-        p = Particula(x0, v0, m, 1.0, color)
-        sistema.agregar_particula(p)
-
-    sistema.aplicar_posiciones()
-    
-    render = Render(sistema, ancho=800, alto=600)
-    render.inicializar()
-
-    # Bucle principal controlado manualmente
-    while True:
-        #print(sistema.time)
-        #sistema.time_tic()
-
-        # Aplica fuerzas y actualiza el sistema
-        fuerzas = np.array([gravedad])  # gravedad
-        sistema.aplicar_fuerzas(fuerzas)
-        sistema.aplicar_posiciones()
-        
-        # Actualiza la visualización
-        render.actualizar_frame()
-
-def newSimulation_3(n:int, delta:float, nParticles:float):
-    METODO = auxSelectMetodo(n)
-    DT = delta
-
-    limites = [-1000, 1000, -1000, 1000, -1000, 1000]
-    gravedad = [0.0, -98000, 0.0]
-
-    sistema = System(METODO, DT, limites)
-    
-    for _ in range(int(np.round(100 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        x0 = np.array([-100, 500, -100])
-        v0 = np.array([0,0,0])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [0.0, color_val, 0.0]
-
-        coef_res = rngf() * 0.5 +0.5
-
-        p = Particula(x0, v0, m, coef_res, color)
-        sistema.agregar_particula(p)
-    
-    for _ in range(int(np.round(300 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        x0 = np.array([0, 0, 0])
-        v0 = np.array([rng(0,400) - 200, rng(0,1000), rng(0,800)-400])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val, 0.0, 0.0]
-
-        coef_res = rngf() * 0.5
-
-        p = Particula(x0, v0, m, coef_res, color)
-        sistema.agregar_particula(p)
-
-    for _ in range(int(np.round(300 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        x0 = np.array([100, 0, 100])
-        v0 = np.array([-rng(0,200), rng(0,100), rng(0,200)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val, color_val, color_val]
-
-        coef_res = 0.5
-
-        p = Particula(x0, v0, m, coef_res, color)
-        sistema.agregar_particula(p)
-        
-    for _ in range(int(np.round(300 * nParticles, decimals=0))):
-        m = rng(1,1000)
-        x0 = np.array([0, 0, 100])
-        v0 = np.array([rng(0,200), rng(0,100), rng(0,200)])
-        
-        color_val = rngf() * 0.7 + 0.3
-        color = [color_val*0.3, color_val*0.3, color_val]
-
-        coef_res = 0.5
-
-        p = Particula(x0, v0, m, coef_res, color)
-        sistema.agregar_particula(p)
+def _bucle_render(sistema:System, hz:float|None=None, fps:float=60.0, esferas:bool=False):
+    """
+    Bucle principal con visualización OpenGL. Render se importa aquí para
+    que el modo sin ventana no necesite OpenGL
+
+    La simulación corre en su propio hilo a `hz` pasos por segundo (None es
+    un paso por cuadro, como el bucle sin hilo, y 0 es tan rápido como se
+    pueda) y la ventana se redibuja a `fps` cuadros por segundo con la
+    última instantánea publicada. Con `esferas` las partículas se dibujan
+    como esferas con niveles de detalle en vez de point sprites
+    """
+    from ParticleSimulation.Render import Render
 
-    sistema.aplicar_posiciones()
-    
-    render = Render(sistema, ancho=800, alto=600)
+    if hz is None:
+        hz = fps
+    simulacion = SimulacionEnHilo(sistema, hz=hz if hz > 0.0 else None)
+    render = Render(sistema, ancho=800, alto=600, sprites=not esferas, buffer=simulacion.buffer)
     render.inicializar()
+    simulacion.iniciar()
 
     # Bucle principal controlado manualmente
-    while True:
-        #print(sistema.time)
-        #sistema.time_tic()
-
-        # Aplica fuerzas y actualiza el sistema
-        fuerzas = np.array([gravedad])  # gravedad
-        sistema.aplicar_fuerzas(fuerzas)
+    periodo = 1.0 / fps
+    try:
+        while True:
+            inicio = perf_counter()
+            render.actualizar_frame()
+            espera = periodo - (perf_counter() - inicio)
+            if espera > 0.0:
+                sleep(espera)
+    finally:
+        simulacion.detener()
+        buffer = simulacion.buffer
+        print(f"Pasos publicados: {buffer.publicadas}, sin dibujar: {buffer.descartadas}, "
+              f"cuadros repetidos: {buffer.repetidas}")
+
+def newSimulation_1(n:int, delta:float, nParticles:float, hz:float|None=None, fps:float=60.0, esferas:bool=False):
+    sistema = crear_sistema(1, auxSelectMetodo(n), delta, nParticles)
+    _bucle_render(sistema, hz, fps, esferas)
+
+def newSimulation_2(n:int, delta:float, nParticles:float, hz:float|None=None, fps:float=60.0, esferas:bool=False):
+    sistema = crear_sistema(2, auxSelectMetodo(n), delta, nParticles)
+    _bucle_render(sistema, hz, fps, esferas)
+
+def newSimulation_3(n:int, delta:float, nParticles:float, hz:float|None=None, fps:float=60.0, esferas:bool=False):
+    sistema = crear_sistema(3, auxSelectMetodo(n), delta, nParticles)
+    _bucle_render(sistema, hz, fps, esferas)
+
+def simulacion_headless(
+        simulacion:int,
+        n:int,
+        delta:float,
+        nParticles:float,
+        pasos:int,
+        semilla:int|None=None,
+        precision:str="ninguna",
+        dtype:str="float64",
+        grabar:str|None=None,
+        grabar_cada:int=1,
+        exportar:str|None=None,
+        exportar_cada:int=1,
+        guardar:str|None=None,
+        reanudar:str|None=None
+        ):
+    """
+    Ejecuta una simulación sin ventana durante un número fijo de pasos
+    y reporta su rendimiento
+
+    Args:
+        - simulacion (int) : Escena (1, 2 o 3)
+        - n (int) : Método numérico (1 Euler, 2 Runge Kutta, 3 Verlet,
+                    4 Dormand-Prince adaptativo)
+        - delta (float) : Delta de tiempo
+        - nParticles (float) : Multiplicador de partículas, 1.0 son 1000
+        - pasos (int) : Número de pasos a simular
+        - semilla (int | None) : Semilla del generador aleatorio
+        - precision (str) : Política de redondeo, ver Precision
+        - dtype (str) : Tipo de dato del estado, "float32" o "float64"
+        - grabar (str | None) : Archivo .npy donde se graba la trayectoria
+        - grabar_cada (int) : Se graba un cuadro cada `grabar_cada` pasos
+        - exportar (str | None) : Carpeta donde se guardan imágenes PNG de la simulación
+        - exportar_cada (int) : Se guarda una imagen cada `exportar_cada` pasos
+        - guardar (str | None) : Archivo donde se guarda un punto de control al terminar
+        - reanudar (str | None) : Punto de control desde el que se sigue la
+                                  simulación, en vez de crear la escena
+    """
+    if reanudar is not None:
+        sistema = System.load_checkpoint(reanudar)
+    else:
+        sistema = crear_sistema(simulacion, auxSelectMetodo(n), delta, nParticles, semilla, precision, dtype)
+    grabador = None
+    if grabar is not None:
+        grabador = Grabador(sistema, grabar, -(-pasos // grabar_cada), cada=grabar_cada)
+    exportador = None
+    if exportar is not None:
+        exportador = ExportadorCuadros(sistema, exportar, cada=exportar_cada)
+
+    inicio = perf_counter()
+    for _ in range(pasos):
         sistema.aplicar_posiciones()
-        
-        # Actualiza la visualización
-        render.actualizar_frame()
+    total = perf_counter() - inicio
+    if grabador is not None:
+        grabador.cerrar()
+    if guardar is not None:
+        sistema.save_checkpoint(guardar)
+
+    print(f"Particulas:            {sistema.n}")
+    print(f"Pasos:                 {pasos}")
+    print(f"Tiempo total:          {total:.3f} s")
+    print(f"Pasos/s:               {pasos / total:.1f}")
+    print(f"Particulas-paso/s:     {sistema.n * pasos / total:.3e}")
+    if sistema.solver is Solvers.dormand_prince:
+        print(f"Subpasos aceptados:    {sistema.pasos_aceptados}")
+        print(f"Subpasos rechazados:   {sistema.pasos_rechazados}")
+    if grabador is not None:
+        print(f"Cuadros grabados:      {grabador.grabados} en {grabar}")
+    if exportador is not None:
+        print(f"Imagenes exportadas:   {exportador.cuadros} en {exportar}")
+    if guardar is not None:
+        print(f"Punto de control:      {guardar} (paso {sistema.pasos})")
+
+def _argumentos():
+    """
+    Argumentos de línea de comandos del modo sin ventana
+    """
+    parser = argparse.ArgumentParser(description="Simulación de partículas")
+    parser.add_argument("--headless", action="store_true",
+                        help="Simula sin ventana y reporta el rendimiento")
+    parser.add_argument("--simulacion", type=int, choices=[1, 2, 3], default=1)
+    parser.add_argument("--metodo", type=int, choices=[1, 2, 3, 4], default=1,
+                        help="1 Euler, 2 Runge Kutta, 3 Verlet, 4 Dormand-Prince adaptativo")
+    parser.add_argument("--particulas", type=float, default=1.0,
+                        help="Multiplicador de partículas, 1.0 son 1000")
+    parser.add_argument("--dt", type=float, default=0.01)
+    parser.add_argument("--pasos", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--precision", choices=Precision.MODOS, default="ninguna",
+                        help="Redondeo numérico, 'clase' redondea cada etapa a 2 decimales")
+    parser.add_argument("--dtype", choices=["float32", "float64"], default="float64")
+    parser.add_argument("--grabar", default=None,
+                        help="Archivo .npy donde se graba la trayectoria")
+    parser.add_argument("--grabar-cada", type=int, default=1)
+    parser.add_argument("--exportar", default=None,
+                        help="Carpeta donde se guardan imágenes PNG, sin OpenGL")
+    parser.add_argument("--exportar-cada", type=int, default=1)
+    parser.add_argument("--guardar", default=None,
+                        help="Archivo donde se guarda un punto de control al terminar")
+    parser.add_argument("--reanudar", default=None,
+                        help="Punto de control desde el que se sigue una simulación guardada")
+    parser.add_argument("--hz", type=float, default=None,
+                        help="Pasos de simulación por segundo con ventana, por defecto igual a --fps. "
+                             "0 simula sin límite")
+    parser.add_argument("--fps", type=float, default=60.0,
+                        help="Cuadros por segundo de la ventana")
+    parser.add_argument("--esferas", action="store_true",
+                        help="Dibuja esferas con niveles de detalle en vez de point sprites")
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = _argumentos()
+    if args.headless:
+        if (args.particulas < 0.0) or (args.dt >= 1) or (args.dt <= 0) or (args.pasos < 1) or (args.grabar_cada < 1) or (args.exportar_cada < 1):
+            raise SystemExit("Error detectado: Valor fuera del rango esperado")
+        simulacion_headless(args.simulacion, args.metodo, args.dt, args.particulas, args.pasos, args.semilla, args.precision, args.dtype,
+                            args.grabar, args.grabar_cada, args.exportar, args.exportar_cada,
+                            args.guardar, args.reanudar)
+        raise SystemExit(0)
+
     titulo = " Práctica ejercicios de Sistema de partículas "
     texto = """ Integrantes
     Sofía Marín : Sergio Méndez : Sergio Palacios 
@@ -272,10 +227,10 @@ if __name__ == "__main__":
         
         print("\n\n")
         print("Metodo Numerico")
-        print("1. Euler \n2. Runge Kutta  \n3. Verlet \n")
+        print("1. Euler \n2. Runge Kutta  \n3. Verlet \n4. Dormand-Prince (paso adaptativo) \n")
         
         metodo = int(input("Metodo seleccionado: "))
-        if (not isinstance(metodo, int)) or (metodo > 3) or (metodo < 1):
+        if (not isinstance(metodo, int)) or (metodo > 4) or (metodo < 1):
             raise ValueError("Opcion no disponible")
         
         print("\n\n")
@@ -297,11 +252,11 @@ if __name__ == "__main__":
         
         match simulacion:
             case 1:
-                newSimulation_1(metodo, dt, particulas)
+                newSimulation_1(metodo, dt, particulas, args.hz, args.fps, args.esferas)
             case 2:
-                newSimulation_2(metodo, dt, particulas)
+                newSimulation_2(metodo, dt, particulas, args.hz, args.fps, args.esferas)
             case 3:
-                newSimulation_3(metodo, dt, particulas)
+                newSimulation_3(metodo, dt, particulas, args.hz, args.fps, args.esferas)
 
     except ValueError as e:
         print(f"Error detectado: {e}")
\ No newline at end of file